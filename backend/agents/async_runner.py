@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from core.schemas import NegotiationOutcome, TranscriptTurn, UserRequest
+from core.providers_loader import get_provider
+from core.provider_stats import record_call, turn_timeout_for
+from core.tracing import span
+from simulation.receptionist import build_receptionist_context_message, generate_receptionist_response
+
+from agents.factory import create_receptionist_conversation_async, create_voice_agent_async
+from agents.live_sessions import get_live_sessions
+from agents.outcome import OutcomeTracker, extract_outcome
+
+logger = logging.getLogger(__name__)
+
+
+class _Wakeup:
+    """Wakes the runner when a reply arrives or the outcome settles, from any thread."""
+
+    def __init__(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+
+    def notify(self, *_: Any) -> None:
+        self._loop.call_soon_threadsafe(self._event.set)
+
+    async def wait_for(
+        self,
+        responses: list[str],
+        count: int,
+        timeout: float,
+        settled: Any,
+    ) -> None:
+        deadline = self._loop.time() + timeout
+        while len(responses) < count and not settled.is_set():
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                return
+            self._event.clear()
+            if len(responses) >= count or settled.is_set():
+                return
+            try:
+                await asyncio.wait_for(self._event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return
+
+
+async def _wait_connected(conversation: Any, timeout: float) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not getattr(conversation, "_ws", None) and loop.time() < deadline:
+        await asyncio.sleep(0.05)
+
+
+async def _end(conversation: Any) -> None:
+    try:
+        await conversation.end_session()
+        await asyncio.wait_for(conversation.wait_for_session_end(), 5.0)
+    except Exception:
+        pass
+
+
+async def run_agent_async(
+    provider_id: str,
+    providers_path: Path | str,
+    user_request: UserRequest,
+    task_id: Optional[str] = None,
+    api_key: Optional[str] = None,
+    agent_id: Optional[str] = None,
+    max_turns: int = 8,
+    turn_timeout_seconds: float = 30.0,
+    on_outcome: Optional[Callable[[NegotiationOutcome], None]] = None,
+    call_stats: Optional[dict] = None,
+) -> tuple[list[dict], str | None, list[TranscriptTurn]]:
+    """
+    Asyncio-native run_agent_sync: both sessions are driven from the calling
+    event loop, so a swarm needs no thread per conversation.
+    """
+    tool_calls_log: list[dict] = []
+    transcript: list[TranscriptTurn] = []
+    last_agent_message: Optional[str] = None
+    first_reply: Optional[float] = None
+    timed_out = False
+    call_started = time.monotonic()
+    path = Path(providers_path) if not isinstance(providers_path, Path) else providers_path
+    provider = get_provider(path, provider_id)
+    wakeup = _Wakeup()
+
+    def on_settled(outcome: NegotiationOutcome) -> None:
+        wakeup.notify()
+        if on_outcome:
+            on_outcome(outcome)
+
+    tracker = OutcomeTracker(provider_id, on_settled=on_settled)
+    settled = tracker.settled
+
+    conversation = create_voice_agent_async(
+        provider_id=provider_id,
+        providers_path=path,
+        task_id=task_id,
+        tool_calls_log=tool_calls_log,
+        api_key=api_key,
+        agent_id=agent_id,
+        on_agent_response=wakeup.notify,
+        on_tool_call=tracker.observe,
+    )
+    agent_responses = conversation._agent_responses
+    live = get_live_sessions().register(task_id, provider_id) if task_id else None
+
+    async def send_to_agent(text: str) -> None:
+        # Messages injected since the agent's last turn go first, as context for this one.
+        if live is not None:
+            for injection in live.pending():
+                await conversation.send_contextual_update(injection.text)
+                live.delivered(injection)
+        await conversation.send_user_message(text)
+
+    use_two_agents = provider is not None
+    recipient_conversation = None
+    receptionist_responses: list[str] = []
+    if use_two_agents:
+        try:
+            recipient_conversation = create_receptionist_conversation_async(
+                provider=provider,
+                providers_path=path,
+                api_key=api_key,
+                agent_id=agent_id,
+                on_receptionist_response=wakeup.notify,
+            )
+            receptionist_responses = recipient_conversation._receptionist_responses
+        except Exception as e:
+            logger.warning("Could not create recipient conversation, falling back to scripted receptionist: %s", e)
+            use_two_agents = False
+
+    with span("session_start", "session", two_agents=use_two_agents):
+        await conversation.start_session()
+        if recipient_conversation:
+            try:
+                await recipient_conversation.start_session()
+            except Exception as e:
+                logger.warning("Could not start recipient session, falling back to scripted receptionist: %s", e)
+                use_two_agents = False
+                recipient_conversation = None
+        await _wait_connected(conversation, 2.0)
+        if recipient_conversation:
+            await _wait_connected(recipient_conversation, 2.0)
+
+    try:
+        initial_user_message = (
+            f"{user_request.message} You are calling the dental office for provider {provider_id}"
+            + (f" ({provider.name})." if provider else ".")
+        )
+        await send_to_agent(initial_user_message)
+        sent_at = time.monotonic()
+
+        if use_two_agents and recipient_conversation:
+            for turn in range(max_turns):
+                with span("agent_turn", "turn", turn=turn):
+                    await wakeup.wait_for(agent_responses, turn + 1, turn_timeout_seconds, settled)
+                if len(agent_responses) <= turn:
+                    timed_out = not settled.is_set()
+                    break
+                agent_text = agent_responses[turn]
+                transcript.append(TranscriptTurn(role="agent", text=agent_text))
+                if not agent_text.strip() or settled.is_set():
+                    break
+                context_message = build_receptionist_context_message(
+                    provider,
+                    agent_text,
+                    from_date=datetime.utcnow(),
+                    days_ahead=14,
+                    duration_minutes=30,
+                )
+                with span("receptionist_turn", "turn", turn=turn):
+                    await recipient_conversation.send_user_message(context_message)
+                    asked_at = time.monotonic()
+                    await wakeup.wait_for(receptionist_responses, turn + 1, turn_timeout_seconds, settled)
+                if len(receptionist_responses) <= turn:
+                    timed_out = not settled.is_set()
+                    break
+                if first_reply is None:
+                    first_reply = time.monotonic() - asked_at
+                receptionist_reply = receptionist_responses[turn]
+                transcript.append(TranscriptTurn(role="receptionist", text=receptionist_reply))
+                if not receptionist_reply.strip() or settled.is_set():
+                    break
+                await send_to_agent(receptionist_reply)
+            if not settled.is_set():
+                with span("tail_wait", "session"):
+                    await asyncio.sleep(2.0)
+            if agent_responses:
+                last_agent_message = agent_responses[-1]
+                if transcript and transcript[-1].role != "agent":
+                    transcript.append(TranscriptTurn(role="agent", text=last_agent_message))
+        else:
+            for turn in range(max_turns - 1):
+                with span("agent_turn", "turn", turn=turn):
+                    await wakeup.wait_for(agent_responses, turn + 1, turn_timeout_seconds, settled)
+                if len(agent_responses) <= turn:
+                    timed_out = not settled.is_set()
+                    break
+                agent_text = agent_responses[turn]
+                transcript.append(TranscriptTurn(role="agent", text=agent_text))
+                if first_reply is None:
+                    first_reply = time.monotonic() - sent_at
+                if not agent_text or not provider or settled.is_set():
+                    break
+                with span("receptionist_turn", "turn", turn=turn, scripted=True):
+                    receptionist_reply = generate_receptionist_response(
+                        provider,
+                        agent_text,
+                        context={"from_date": None, "days_ahead": 14},
+                    )
+                await send_to_agent(receptionist_reply)
+                transcript.append(TranscriptTurn(role="receptionist", text=receptionist_reply))
+            if not settled.is_set():
+                with span("tail_wait", "session"):
+                    await asyncio.sleep(3.0)
+            if agent_responses:
+                last_agent_message = agent_responses[-1]
+                if not transcript or transcript[-1].role != "agent":
+                    transcript.append(TranscriptTurn(role="agent", text=last_agent_message))
+    except RuntimeError as e:
+        logger.warning("Conversation send/wait error: %s", e)
+    finally:
+        if live is not None:
+            get_live_sessions().unregister(live)
+        with span("session_end", "session"):
+            await _end(conversation)
+            if recipient_conversation:
+                await _end(recipient_conversation)
+
+    if call_stats is not None:
+        call_stats.update(
+            first_reply_seconds=first_reply,
+            timed_out=timed_out,
+            duration_seconds=time.monotonic() - call_started,
+        )
+    return tool_calls_log, last_agent_message, transcript
+
+
+async def run_agent_and_extract_outcome_async(
+    provider_id: str,
+    providers_path: Path | str,
+    user_request: UserRequest,
+    task_id: Optional[str] = None,
+    api_key: Optional[str] = None,
+    agent_id: Optional[str] = None,
+    on_outcome: Optional[Callable[[NegotiationOutcome], None]] = None,
+    turn_timeout_seconds: Optional[float] = None,
+) -> tuple[NegotiationOutcome, list[dict], list[TranscriptTurn]]:
+    if turn_timeout_seconds is None:
+        turn_timeout_seconds = turn_timeout_for(provider_id)
+    call_stats: dict = {}
+    with span("provider_call", "call", provider_id=provider_id, turn_timeout=turn_timeout_seconds) as call_args:
+        tool_calls_log, last_message, transcript = await run_agent_async(
+            provider_id=provider_id,
+            providers_path=providers_path,
+            user_request=user_request,
+            task_id=task_id,
+            api_key=api_key,
+            agent_id=agent_id,
+            on_outcome=on_outcome,
+            turn_timeout_seconds=turn_timeout_seconds,
+            call_stats=call_stats,
+        )
+        outcome = extract_outcome(provider_id, tool_calls_log, last_message, transcript)
+        call_args["turns"] = len(transcript)
+        call_args["tool_calls"] = len(tool_calls_log)
+        call_args["has_slot"] = outcome.proposed_slot is not None
+        call_args["timed_out"] = call_stats.get("timed_out", False)
+    record_call(provider_id, call_stats, len(transcript), outcome.proposed_slot is not None)
+    return outcome, tool_calls_log, transcript
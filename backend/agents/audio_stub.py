@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Callable
+from typing import Awaitable, Callable
 
 try:
     from elevenlabs.conversational_ai.conversation import AudioInterface as _AudioInterface
@@ -20,3 +20,23 @@ class StubAudioInterface(_AudioInterface):
 
     def interrupt(self) -> None:
         pass
+
+
+try:
+    from elevenlabs.conversational_ai.conversation import AsyncAudioInterface as _AsyncAudioInterface
+except ImportError:
+    _AsyncAudioInterface = object
+
+
+class AsyncStubAudioInterface(_AsyncAudioInterface):
+    async def start(self, input_callback: Callable[[bytes], Awaitable[None]]) -> None:
+        self._input_callback = input_callback
+
+    async def stop(self) -> None:
+        self._input_callback = None
+
+    async def output(self, audio: bytes) -> None:
+        pass
+
+    async def interrupt(self) -> None:
+        pass
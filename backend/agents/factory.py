@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from pathlib import Path
-from typing import Any, Callable, Optional
+from typing import Any, Awaitable, Callable, Optional
 
 from app.config import get_settings
+from core.executors import TOOLS, get_executor, run_in
 from core.providers_loader import get_provider
 from core.schemas import Provider
 from tools.registry import build_tool_registry, register_client_tools
+from agents.session_pool import get_client, get_session_pool, is_session_pool_enabled
 
 logger = logging.getLogger(__name__)
 
@@ -20,15 +23,45 @@ def _get_conversation():
     from elevenlabs.conversational_ai.conversation import Conversation, ClientTools
     return Conversation, ClientTools
 
+def _get_async_conversation():
+    from elevenlabs.conversational_ai.conversation import AsyncConversation, ClientTools
+    return AsyncConversation, ClientTools
+
+
+def _use_offline_backend() -> bool:
+    return (getattr(get_settings(), "conversation_backend", None) or "elevenlabs").lower() == "offline"
+
+
+def _offline_delay() -> float:
+    return float(getattr(get_settings(), "offline_response_delay_seconds", 0.0) or 0.0)
+
+
+def _receptionist_agent_id(agent_id: Optional[str]) -> str:
+    settings = get_settings()
+    return getattr(settings, "elevenlabs_receptionist_agent_id", None) or agent_id or "default"
+
+
+def _new_client_tools(ClientTools: Any) -> Any:
+    client_tools = ClientTools()
+    # Sync handlers run on the shared tools bulkhead rather than a pool per conversation.
+    client_tools.thread_pool = get_executor(TOOLS)
+    return client_tools
+
 
 def create_client_tools_for_agent(
     providers_path: Path,
     task_id: Optional[str],
     tool_calls_log: list,
+    on_tool_call: Optional[Callable[[dict], None]] = None,
 ) -> Any:
     Conversation, ClientTools = _get_conversation()
-    registry = build_tool_registry(providers_path, task_id=task_id, tool_calls_log=tool_calls_log)
-    client_tools = ClientTools()
+    registry = build_tool_registry(
+        providers_path,
+        task_id=task_id,
+        tool_calls_log=tool_calls_log,
+        on_tool_call=on_tool_call,
+    )
+    client_tools = _new_client_tools(ClientTools)
     register_client_tools(client_tools, registry, is_async=False)
     return client_tools
 
@@ -41,15 +74,8 @@ def create_voice_agent(
     api_key: Optional[str] = None,
     agent_id: Optional[str] = None,
     on_agent_response: Optional[Callable[[str], None]] = None,
+    on_tool_call: Optional[Callable[[dict], None]] = None,
 ) -> Any:
-    ElevenLabs = _get_elevenlabs()
-    Conversation, ClientTools = _get_conversation()
-    from agents.audio_stub import StubAudioInterface
-
-    client = ElevenLabs(api_key=api_key or "")
-    client_tools = create_client_tools_for_agent(providers_path, task_id, tool_calls_log)
-    client_tools.start()
-
     agent_responses: list[str] = []
 
     def _on_response(text: str) -> None:
@@ -57,15 +83,42 @@ def create_voice_agent(
         if on_agent_response:
             on_agent_response(text)
 
-    audio = StubAudioInterface()
-    conversation = Conversation(
-        client=client,
-        agent_id=agent_id or "default",
-        requires_auth=bool(api_key),
-        audio_interface=audio,
-        client_tools=client_tools,
-        callback_agent_response=_on_response,
-    )
+    if _use_offline_backend():
+        from agents.offline import OfflineAgentBrain, OfflineConversation
+        registry = build_tool_registry(
+            providers_path,
+            task_id=task_id,
+            tool_calls_log=tool_calls_log,
+            on_tool_call=on_tool_call,
+        )
+        brain = OfflineAgentBrain(provider_id, registry)
+        conversation = OfflineConversation(brain.reply, _on_response, delay_seconds=_offline_delay())
+    elif is_session_pool_enabled():
+        registry = build_tool_registry(
+            providers_path,
+            task_id=task_id,
+            tool_calls_log=tool_calls_log,
+            on_tool_call=on_tool_call,
+        )
+        session = get_session_pool().acquire(agent_id or "default", api_key, True, _on_response, registry)
+        conversation = session.conversation
+    else:
+        Conversation, ClientTools = _get_conversation()
+        from agents.audio_stub import StubAudioInterface
+
+        client = get_client(api_key)
+        client_tools = create_client_tools_for_agent(providers_path, task_id, tool_calls_log, on_tool_call=on_tool_call)
+        client_tools.start()
+
+        audio = StubAudioInterface()
+        conversation = Conversation(
+            client=client,
+            agent_id=agent_id or "default",
+            requires_auth=bool(api_key),
+            audio_interface=audio,
+            client_tools=client_tools,
+            callback_agent_response=_on_response,
+        )
     conversation._agent_responses = agent_responses
     conversation._tool_calls_log = tool_calls_log
     conversation._provider_id = provider_id
@@ -79,33 +132,135 @@ def create_receptionist_conversation(
     agent_id: Optional[str] = None,
     on_receptionist_response: Optional[Callable[[str], None]] = None,
 ) -> Any:
-    ElevenLabs = _get_elevenlabs()
-    Conversation, ClientTools = _get_conversation()
-    from agents.audio_stub import StubAudioInterface
+    receptionist_responses: list[str] = []
 
-    settings = get_settings()
-    receptionist_agent_id = getattr(settings, "elevenlabs_receptionist_agent_id", None) or agent_id or "default"
+    def _on_response(text: str) -> None:
+        receptionist_responses.append(text)
+        if on_receptionist_response:
+            on_receptionist_response(text)
 
-    client_tools = ClientTools()
-    register_client_tools(client_tools, {}, is_async=False)
-    client_tools.start()
+    if _use_offline_backend():
+        from agents.offline import OfflineConversation, receptionist_reply
+        conversation = OfflineConversation(receptionist_reply, _on_response, delay_seconds=_offline_delay())
+    elif is_session_pool_enabled():
+        session = get_session_pool().acquire(_receptionist_agent_id(agent_id), api_key, False, _on_response)
+        conversation = session.conversation
+    else:
+        Conversation, ClientTools = _get_conversation()
+        from agents.audio_stub import StubAudioInterface
+
+        client_tools = _new_client_tools(ClientTools)
+        register_client_tools(client_tools, {}, is_async=False)
+        client_tools.start()
+
+        client = get_client(api_key)
+        audio = StubAudioInterface()
+        conversation = Conversation(
+            client=client,
+            agent_id=_receptionist_agent_id(agent_id),
+            requires_auth=bool(api_key),
+            audio_interface=audio,
+            client_tools=client_tools,
+            callback_agent_response=_on_response,
+        )
+    conversation._receptionist_responses = receptionist_responses
+    return conversation
+
+
+def _async_tool(fn: Callable[[dict], dict]) -> Callable[[dict], Awaitable[dict]]:
+    # Tools are CPU-only unless Google Calendar is configured; only then do they leave the event loop.
+    from integrations.google_calendar import is_google_calendar_configured
 
+    async def handler(params: dict) -> dict:
+        if is_google_calendar_configured():
+            return await run_in(TOOLS, fn, params)
+        return fn(params)
+    return handler
+
+
+def create_voice_agent_async(
+    provider_id: str,
+    providers_path: Path,
+    task_id: Optional[str],
+    tool_calls_log: list,
+    api_key: Optional[str] = None,
+    agent_id: Optional[str] = None,
+    on_agent_response: Optional[Callable[[str], None]] = None,
+    on_tool_call: Optional[Callable[[dict], None]] = None,
+) -> Any:
+    """Asyncio counterpart of create_voice_agent; must be called on the running event loop."""
+    agent_responses: list[str] = []
+
+    async def _on_response(text: str) -> None:
+        agent_responses.append(text)
+        if on_agent_response:
+            on_agent_response(text)
+
+    registry = build_tool_registry(
+        providers_path,
+        task_id=task_id,
+        tool_calls_log=tool_calls_log,
+        on_tool_call=on_tool_call,
+    )
+    if _use_offline_backend():
+        from agents.offline import AsyncOfflineConversation, OfflineAgentBrain
+        brain = OfflineAgentBrain(provider_id, registry)
+        conversation = AsyncOfflineConversation(brain.reply, _on_response, delay_seconds=_offline_delay())
+    else:
+        AsyncConversation, ClientTools = _get_async_conversation()
+        from agents.audio_stub import AsyncStubAudioInterface
+
+        client_tools = ClientTools(loop=asyncio.get_running_loop())
+        register_client_tools(
+            client_tools,
+            {name: _async_tool(fn) for name, fn in registry.items()},
+            is_async=True,
+        )
+        client_tools.start()
+        conversation = AsyncConversation(
+            client=get_client(api_key),
+            agent_id=agent_id or "default",
+            requires_auth=bool(api_key),
+            audio_interface=AsyncStubAudioInterface(),
+            client_tools=client_tools,
+            callback_agent_response=_on_response,
+        )
+    conversation._agent_responses = agent_responses
+    conversation._tool_calls_log = tool_calls_log
+    conversation._provider_id = provider_id
+    return conversation
+
+
+def create_receptionist_conversation_async(
+    provider: Provider,
+    providers_path: Path,
+    api_key: Optional[str] = None,
+    agent_id: Optional[str] = None,
+    on_receptionist_response: Optional[Callable[[str], None]] = None,
+) -> Any:
     receptionist_responses: list[str] = []
 
-    def _on_response(text: str) -> None:
+    async def _on_response(text: str) -> None:
         receptionist_responses.append(text)
         if on_receptionist_response:
             on_receptionist_response(text)
 
-    client = ElevenLabs(api_key=api_key or "")
-    audio = StubAudioInterface()
-    conversation = Conversation(
-        client=client,
-        agent_id=receptionist_agent_id,
-        requires_auth=bool(api_key),
-        audio_interface=audio,
-        client_tools=client_tools,
-        callback_agent_response=_on_response,
-    )
+    if _use_offline_backend():
+        from agents.offline import AsyncOfflineConversation, receptionist_reply
+        conversation = AsyncOfflineConversation(receptionist_reply, _on_response, delay_seconds=_offline_delay())
+    else:
+        AsyncConversation, ClientTools = _get_async_conversation()
+        from agents.audio_stub import AsyncStubAudioInterface
+
+        client_tools = ClientTools(loop=asyncio.get_running_loop())
+        client_tools.start()
+        conversation = AsyncConversation(
+            client=get_client(api_key),
+            agent_id=_receptionist_agent_id(agent_id),
+            requires_auth=bool(api_key),
+            audio_interface=AsyncStubAudioInterface(),
+            client_tools=client_tools,
+            callback_agent_response=_on_response,
+        )
     conversation._receptionist_responses = receptionist_responses
     return conversation
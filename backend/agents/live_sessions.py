@@ -0,0 +1,190 @@
+"""
+Registry of running conversations, for injecting user messages into live calls.
+
+Each runner registers a `LiveSession` under (task_id, provider_id) for the
+length of its call. POST /messages adds an `Injection` to the task: aimed at
+one provider's call, or at every call of the task (a swarm). The runners
+deliver pending injections themselves, as contextual updates, just before they
+next send the agent a message, so delivery happens on the runner's own thread
+or task (the SDK sessions are not shared across threads) and within one turn.
+
+An injection is acknowledged once every call that was live when it arrived
+has delivered it, or ended without doing so. Calls that start later in the
+same task (hedges, refills) still receive task-wide injections. A task's
+injections are dropped when the task finishes.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Optional
+
+
+class Injection:
+    def __init__(self, task_id: str, text: str, provider_id: Optional[str], targets: set[str]) -> None:
+        self.id = uuid.uuid4().hex[:12]
+        self.task_id = task_id
+        self.text = text
+        self.provider_id = provider_id
+        self.created_at = datetime.utcnow()
+        self._created = time.monotonic()
+        self.targets = set(targets)
+        self.delivered: dict[str, float] = {}
+        self.undelivered: set[str] = set()
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = []
+        self._lock = threading.Lock()
+
+    def applies_to(self, provider_id: str) -> bool:
+        return self.provider_id is None or self.provider_id == provider_id
+
+    @property
+    def acknowledged(self) -> bool:
+        return self.targets <= (set(self.delivered) | self.undelivered)
+
+    def _settle(self, provider_id: str, delivered: bool) -> None:
+        with self._lock:
+            if provider_id in self.delivered or provider_id in self.undelivered:
+                return
+            if delivered:
+                self.delivered[provider_id] = round(time.monotonic() - self._created, 4)
+            else:
+                self.undelivered.add(provider_id)
+            waiters = list(self._waiters) if self.acknowledged else []
+            if waiters:
+                self._waiters.clear()
+        for loop, fut in waiters:
+            loop.call_soon_threadsafe(_resolve, fut)
+
+    async def wait(self, timeout: float) -> bool:
+        """True once acknowledged; False when `timeout` runs out first."""
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future[None] = loop.create_future()
+        with self._lock:
+            if self.acknowledged:
+                return True
+            self._waiters.append((loop, fut))
+        try:
+            await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "message_id": self.id,
+                "task_id": self.task_id,
+                "provider_id": self.provider_id,
+                "created_at": self.created_at.isoformat(),
+                "acknowledged": self.acknowledged,
+                "delivered": dict(self.delivered),
+                "pending": sorted(self.targets - set(self.delivered) - self.undelivered),
+                "undelivered": sorted(self.undelivered),
+            }
+
+
+def _resolve(fut: asyncio.Future[None]) -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
+class LiveSession:
+    """One running call; only its runner calls `pending` and `delivered`."""
+
+    def __init__(self, registry: "LiveSessionRegistry", task_id: str, provider_id: str) -> None:
+        self.registry = registry
+        self.task_id = task_id
+        self.provider_id = provider_id
+        self.started_at = datetime.utcnow()
+        self.deliveries = 0
+
+    def pending(self) -> list[Injection]:
+        """Injections for this call not yet delivered, oldest first."""
+        return [
+            inj for inj in self.registry.injections(self.task_id)
+            if inj.applies_to(self.provider_id)
+            and self.provider_id not in inj.delivered
+            and self.provider_id not in inj.undelivered
+        ]
+
+    def delivered(self, injection: Injection) -> None:
+        self.deliveries += 1
+        injection._settle(self.provider_id, True)
+
+
+class LiveSessionRegistry:
+    def __init__(self, max_injections_per_task: int = 50) -> None:
+        self.max_injections_per_task = max_injections_per_task
+        self._sessions: dict[str, dict[str, LiveSession]] = {}
+        self._injections: dict[str, list[Injection]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"registered": 0, "injected": 0, "delivered": 0}
+
+    def register(self, task_id: str, provider_id: str) -> LiveSession:
+        session = LiveSession(self, task_id, provider_id)
+        with self._lock:
+            self._sessions.setdefault(task_id, {})[provider_id] = session
+            self.stats["registered"] += 1
+        return session
+
+    def unregister(self, session: LiveSession) -> None:
+        """Drop a finished call; injections it never delivered are marked undelivered for it."""
+        with self._lock:
+            sessions = self._sessions.get(session.task_id, {})
+            if sessions.get(session.provider_id) is session:
+                del sessions[session.provider_id]
+                if not sessions:
+                    del self._sessions[session.task_id]
+        self.stats["delivered"] += session.deliveries
+        for injection in session.pending():
+            injection._settle(session.provider_id, False)
+
+    def sessions(self, task_id: str) -> list[LiveSession]:
+        with self._lock:
+            return list(self._sessions.get(task_id, {}).values())
+
+    def injections(self, task_id: str) -> list[Injection]:
+        with self._lock:
+            return list(self._injections.get(task_id, ()))
+
+    def inject(self, task_id: str, text: str, provider_id: Optional[str] = None) -> Injection:
+        """
+        Queue `text` for the task's calls (or one provider's). Raises
+        OverflowError once the task has `max_injections_per_task` messages.
+        """
+        with self._lock:
+            live = set(self._sessions.get(task_id, {}))
+            targets = live if provider_id is None else live & {provider_id}
+            injections = self._injections.setdefault(task_id, [])
+            if len(injections) >= self.max_injections_per_task:
+                raise OverflowError(f"Task {task_id} already has {len(injections)} injected messages")
+            injection = Injection(task_id, text, provider_id, targets)
+            injections.append(injection)
+            self.stats["injected"] += 1
+        return injection
+
+    def close_task(self, task_id: str) -> None:
+        """The task finished: whatever was never delivered stays undelivered."""
+        with self._lock:
+            injections = self._injections.pop(task_id, [])
+        for injection in injections:
+            for pid in injection.targets:
+                injection._settle(pid, False)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "tasks": len(self._sessions),
+                "sessions": sum(len(s) for s in self._sessions.values()),
+                **self.stats,
+            }
+
+
+_registry = LiveSessionRegistry()
+
+
+def get_live_sessions() -> LiveSessionRegistry:
+    return _registry
@@ -0,0 +1,159 @@
+"""
+Offline stand-ins for ElevenLabs conversations (CONVERSATION_BACKEND=offline).
+
+The stand-in agent negotiates deterministically: it asks for availability,
+validates each offered slot with the real tool registry and confirms the first
+valid one.
+The stand-in receptionist reads back the slots from its context message.
+Both expose the same surface the runners use from the SDK's Conversation and
+AsyncConversation, so load tests and local runs exercise the real runner,
+tools and outcome extraction without network access.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from agents.outcome import parse_offered_slots
+from core import profiling
+
+
+class OfflineAgentBrain:
+    def __init__(self, provider_id: str, tools: dict[str, Callable[[dict], dict]]) -> None:
+        self.provider_id = provider_id
+        self.tools = tools
+        self.confirmed_slot: Optional[datetime] = None
+        self.turns = 0
+
+    def _call(self, name: str, params: dict) -> dict:
+        fn = self.tools.get(name)
+        if fn is None:
+            return {"ok": False, "error": f"Tool {name} not registered"}
+        return fn(params) or {}
+
+    def reply(self, message: str) -> str:
+        self.turns += 1
+        if self.turns == 1:
+            return "Hello, I'm calling to book a dental check-up. What availability do you have over the next two weeks?"
+        if self.confirmed_slot is not None:
+            return "Thank you, goodbye."
+        offered = parse_offered_slots(message)
+        if not offered:
+            return "I understand. Sorry we couldn't find a time, thank you for your help."
+        valid = [
+            slot for slot in offered[:3]
+            if self._call("validate_slot", {"provider_id": self.provider_id, "slot_iso": slot.isoformat()}).get("valid")
+        ]
+        for slot in valid:
+            slot_iso = slot.isoformat()
+            booked = self._call("confirm_slot", {"provider_id": self.provider_id, "slot_iso": slot_iso})
+            if booked.get("ok"):
+                self.confirmed_slot = slot
+                return f"Perfect, please book me for {slot.strftime('%A %Y-%m-%d at %H:%M')}. Thank you!"
+        return "None of those work for me, unfortunately. Sorry, thank you for your time."
+
+
+def receptionist_reply(context_message: str) -> str:
+    caller = context_message.split("The caller just said:", 1)[-1].lower()
+    if "book me for" in caller or "goodbye" in caller:
+        return "You're all set, we'll see you then. Goodbye!"
+    if "sorry" in caller:
+        return "No problem, have a nice day."
+    offered = parse_offered_slots(context_message.split("The caller just said:", 1)[0])
+    if not offered:
+        return "I'm sorry, we don't have any availability in that period."
+    slot_strs = [s.strftime("%A %Y-%m-%d at %H:%M") for s in offered[:3]]
+    return f"We have: {', '.join(slot_strs)}. Which do you prefer?"
+
+
+class OfflineConversation:
+    """Blocking stand-in: the reply is produced on the caller's thread after `delay_seconds`."""
+
+    def __init__(
+        self,
+        respond: Callable[[str], str],
+        callback_agent_response: Optional[Callable[[str], None]] = None,
+        delay_seconds: float = 0.0,
+    ) -> None:
+        self._respond = respond
+        self._callback = callback_agent_response
+        self._delay = delay_seconds
+        self._ws: Any = None
+        self._conversation_id: Optional[str] = None
+
+    def start_session(self) -> None:
+        self._ws = True
+        self._conversation_id = f"offline-{id(self):x}"
+
+    def send_user_message(self, text: str) -> None:
+        if not self._ws:
+            raise RuntimeError("Session not started or websocket not connected.")
+        if self._delay > 0:
+            time.sleep(self._delay)
+        reply = self._respond(text)
+        if self._callback:
+            self._callback(reply)
+
+    def send_contextual_update(self, text: str) -> None:
+        if not self._ws:
+            raise RuntimeError("Session not started or websocket not connected.")
+
+    def end_session(self) -> None:
+        self._ws = None
+
+    def wait_for_session_end(self) -> Optional[str]:
+        return self._conversation_id
+
+
+class AsyncOfflineConversation:
+    """Asyncio stand-in: replies arrive from a background task after `delay_seconds`, like the SDK."""
+
+    def __init__(
+        self,
+        respond: Callable[[str], str],
+        callback_agent_response: Optional[Callable[[str], Any]] = None,
+        delay_seconds: float = 0.0,
+    ) -> None:
+        self._respond = respond
+        self._callback = callback_agent_response
+        self._delay = delay_seconds
+        self._ws: Any = None
+        self._conversation_id: Optional[str] = None
+        self._pending: set[asyncio.Task] = set()
+
+    async def start_session(self) -> None:
+        self._ws = True
+        self._conversation_id = f"offline-{id(self):x}"
+
+    async def _deliver(self, text: str) -> None:
+        if self._delay > 0:
+            await asyncio.sleep(self._delay)
+        if not self._ws:
+            return
+        reply = self._respond(text)
+        if self._callback:
+            await self._callback(reply)
+
+    async def send_user_message(self, text: str) -> None:
+        if not self._ws:
+            raise RuntimeError("Session not started or websocket not connected.")
+        task = asyncio.create_task(self._deliver(text))
+        profiling.adopt(task)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def send_contextual_update(self, text: str) -> None:
+        if not self._ws:
+            raise RuntimeError("Session not started or websocket not connected.")
+
+    async def end_session(self) -> None:
+        self._ws = None
+        for task in list(self._pending):
+            task.cancel()
+
+    async def wait_for_session_end(self) -> Optional[str]:
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        return self._conversation_id
@@ -1,51 +1,163 @@
 from __future__ import annotations
 
+import re
+import threading
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, Callable, Iterable, Optional
 
-from core.schemas import NegotiationOutcome
+from core.schemas import NegotiationOutcome, OfferedSlot, SlotSource, TranscriptTurn
+
+# Tool errors after which the call cannot produce a booking, so there is no point continuing.
+DEFINITIVE_ERRORS = ("Provider not found",)
+
+# confirm_slot lost the slot to another task; the agent can still try another one.
+SLOT_CONFLICT_ERRORS = ("Slot already taken",)
+
+SLOT_CONFIDENCE = {SlotSource.OFFERED: 0.5, SlotSource.VALIDATED: 0.85, SlotSource.CONFIRMED: 1.0}
+
+# The way receptionists read out slots (see build_receptionist_context_message).
+SLOT_PATTERN = re.compile(
+    r"(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday) (\d{4}-\d{2}-\d{2}) at (\d{2}:\d{2})"
+)
+
+
+def parse_offered_slots(text: str) -> list[datetime]:
+    slots: list[datetime] = []
+    for _, day, hm in SLOT_PATTERN.findall(text or ""):
+        try:
+            slots.append(datetime.fromisoformat(f"{day}T{hm}:00"))
+        except ValueError:
+            continue
+    return slots
+
+
+def _parse_slot(value: Any) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except (ValueError, TypeError):
+        return None
+
+
+class OutcomeTracker:
+    """
+    Builds a NegotiationOutcome incrementally from tool-log entries as they are appended.
+    `settled` is set once the call is decided: a slot was confirmed, or the
+    tools reported a definitive rejection. Every slot seen is kept in
+    `offered_slots`, at the confidence of the furthest step it reached; slots
+    a tool reported unavailable are dropped.
+    """
+
+    def __init__(
+        self,
+        provider_id: str,
+        on_settled: Optional[Callable[[NegotiationOutcome], None]] = None,
+    ) -> None:
+        self.provider_id = provider_id
+        self.proposed_slot: Optional[datetime] = None
+        self.confidence = 0.5
+        self.rejection_reasons: list[str] = []
+        self.tool_calls_count = 0
+        self.confirmed = False
+        self.offered: dict[datetime, OfferedSlot] = {}
+        self.settled = threading.Event()
+        self._on_settled = on_settled
+        self._lock = threading.Lock()
+
+    def _note_slot(self, slot: datetime, source: SlotSource) -> None:
+        key = slot.replace(tzinfo=None)
+        current = self.offered.get(key)
+        if current is None or SLOT_CONFIDENCE[source] > current.confidence:
+            self.offered[key] = OfferedSlot(slot=slot, confidence=SLOT_CONFIDENCE[source], source=source)
+
+    def _drop_slot(self, slot: datetime) -> None:
+        """Forget a slot that turned out to be taken; fall back to the best validated one left."""
+        key = slot.replace(tzinfo=None)
+        self.offered.pop(key, None)
+        if self.confirmed or self.proposed_slot is None or self.proposed_slot.replace(tzinfo=None) != key:
+            return
+        validated = [s for s in self.offered.values() if s.source == SlotSource.VALIDATED]
+        if validated:
+            best = min(validated, key=lambda s: s.slot.replace(tzinfo=None))
+            self.proposed_slot = best.slot
+        else:
+            self.proposed_slot = None
+            self.confidence = 0.5
+
+    def observe_offers(self, text: str) -> None:
+        """Record slots read out by the receptionist."""
+        slots = parse_offered_slots(text)
+        with self._lock:
+            for slot in slots:
+                self._note_slot(slot, SlotSource.OFFERED)
+
+    def observe(self, entry: dict[str, Any]) -> None:
+        tool = entry.get("tool") or entry.get("tool_name")
+        result = entry.get("result") or {}
+        decided = False
+        with self._lock:
+            self.tool_calls_count += 1
+            if isinstance(result, dict):
+                if tool == "validate_slot" and result.get("valid") and result.get("slot_iso"):
+                    slot = _parse_slot(result["slot_iso"])
+                    if slot is not None:
+                        self._note_slot(slot, SlotSource.VALIDATED)
+                        if not self.confirmed:
+                            self.proposed_slot = slot
+                            self.confidence = 0.85
+                if tool == "validate_slot" and result.get("ok") and not result.get("valid") and result.get("slot_iso"):
+                    slot = _parse_slot(result["slot_iso"])
+                    if slot is not None:
+                        self._drop_slot(slot)
+                if tool == "confirm_slot" and result.get("ok") and result.get("slot_iso"):
+                    slot = _parse_slot(result["slot_iso"])
+                    if slot is not None:
+                        self._note_slot(slot, SlotSource.CONFIRMED)
+                        self.proposed_slot = slot
+                        self.confidence = 1.0
+                        self.confirmed = True
+                if not result.get("ok") and result.get("error"):
+                    error = str(result.get("error"))
+                    self.rejection_reasons.append(error)
+                    if tool == "confirm_slot" and error in SLOT_CONFLICT_ERRORS and result.get("slot_iso"):
+                        slot = _parse_slot(result["slot_iso"])
+                        if slot is not None:
+                            self._drop_slot(slot)
+                    if error in DEFINITIVE_ERRORS:
+                        decided = True
+            decided = (decided or self.confirmed) and not self.settled.is_set()
+            if decided:
+                self.settled.set()
+        if decided and self._on_settled:
+            self._on_settled(self.outcome())
+
+    def outcome(self, agent_final_message: Optional[str] = None) -> NegotiationOutcome:
+        with self._lock:
+            rejection_reasons = list(self.rejection_reasons)
+            if agent_final_message and "sorry" in agent_final_message.lower() and not self.proposed_slot:
+                rejection_reasons.append("Agent reported inability to book.")
+            return NegotiationOutcome(
+                provider_id=self.provider_id,
+                proposed_slot=self.proposed_slot,
+                confidence_score=min(1.0, max(0.0, self.confidence)),
+                offered_slots=sorted(self.offered.values(), key=lambda s: (-s.confidence, s.slot.replace(tzinfo=None))),
+                rejection_reasons=rejection_reasons[:5],
+                raw_metadata={
+                    "tool_calls_count": self.tool_calls_count,
+                    "settled": self.settled.is_set(),
+                },
+            )
 
 
 def extract_outcome(
     provider_id: str,
     tool_calls_log: list[dict[str, Any]],
     agent_final_message: Optional[str] = None,
+    transcript: Optional[Iterable[TranscriptTurn]] = None,
 ) -> NegotiationOutcome:
-    proposed_slot: Optional[datetime] = None
-    confidence = 0.5
-    rejection_reasons: list[str] = []
-
+    tracker = OutcomeTracker(provider_id)
+    for turn in transcript or ():
+        if turn.role == "receptionist":
+            tracker.observe_offers(turn.text)
     for entry in tool_calls_log:
-        tool = entry.get("tool") or entry.get("tool_name")
-        params = entry.get("params") or {}
-        result = entry.get("result") or {}
-        if isinstance(result, dict):
-            if tool == "validate_slot" and result.get("valid") and result.get("slot_iso"):
-                try:
-                    proposed_slot = datetime.fromisoformat(
-                        str(result["slot_iso"]).replace("Z", "+00:00")
-                    )
-                    confidence = 0.85
-                except (ValueError, TypeError):
-                    pass
-            if tool == "confirm_slot" and result.get("ok") and result.get("slot_iso"):
-                try:
-                    proposed_slot = datetime.fromisoformat(
-                        str(result["slot_iso"]).replace("Z", "+00:00")
-                    )
-                    confidence = 1.0
-                except (ValueError, TypeError):
-                    pass
-            if not result.get("ok") and result.get("error"):
-                rejection_reasons.append(str(result.get("error")))
-
-    if agent_final_message and "sorry" in agent_final_message.lower() and not proposed_slot:
-        rejection_reasons.append("Agent reported inability to book.")
-
-    return NegotiationOutcome(
-        provider_id=provider_id,
-        proposed_slot=proposed_slot,
-        confidence_score=min(1.0, max(0.0, confidence)),
-        rejection_reasons=rejection_reasons[:5],
-        raw_metadata={"tool_calls_count": len(tool_calls_log)},
-    )
+        tracker.observe(entry)
+    return tracker.outcome(agent_final_message)
@@ -0,0 +1,377 @@
+"""
+Record live negotiations and replay them offline.
+
+With RECORDING_DIR set, every run of `run_agent_sync` made through
+`run_agent_and_extract_outcome` keeps a `CallRecorder`. It records the
+messages sent to and received from the agent and the receptionist, and every
+tool call with its params and result, each stamped with seconds since the
+call started. Tool results are where integration responses (calendar
+freebusy) reach a negotiation, so they carry those as well. Each call is
+written to one JSON file under RECORDING_DIR/<date>/.
+
+`replay_call` runs a recording back through `run_agent_sync` and
+`extract_outcome`. Stand-in conversations replay the recorded agent and
+receptionist turns, and re-issue the recorded tool calls through the tool
+registry, each after the delay it had after the message that triggered it,
+divided by `speed` (0 = no waiting). By default the registry answers from
+the recording, so a replay touches neither the network nor the ledger;
+`live_tools=True` runs the real tools instead and reports where their
+results differ from the recorded ones.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from app.config import get_settings
+from core.schemas import NegotiationOutcome, TranscriptTurn, UserRequest
+from tools.registry import build_tool_registry
+
+logger = logging.getLogger(__name__)
+
+RECORDING_VERSION = 1
+
+# Event kinds: what the runner sent, and what came back on each side.
+TO_AGENT = "to_agent"
+AGENT = "agent"
+TO_RECEPTIONIST = "to_receptionist"
+RECEPTIONIST = "receptionist"
+TOOL = "tool"
+USER_UPDATE = "user_update"
+
+
+def _outcome_json(outcome: NegotiationOutcome) -> dict[str, Any]:
+    return outcome.model_dump(mode="json", exclude={"transcript"})
+
+
+class CallRecorder:
+    """Timeline of one call; thread-safe, since SDK callbacks and tool handlers run on their own threads."""
+
+    def __init__(
+        self,
+        provider_id: str,
+        user_request: UserRequest,
+        task_id: Optional[str] = None,
+        providers_path: Optional[Path | str] = None,
+        turn_timeout_seconds: Optional[float] = None,
+    ) -> None:
+        self.started = time.monotonic()
+        self.meta: dict[str, Any] = {
+            "version": RECORDING_VERSION,
+            "recorded_at": datetime.utcnow().isoformat(),
+            "provider_id": provider_id,
+            "task_id": task_id,
+            "providers_path": str(providers_path) if providers_path is not None else None,
+            "user_request": user_request.model_dump(mode="json"),
+            "turn_timeout_seconds": turn_timeout_seconds,
+        }
+        self.events: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def note(self, kind: str, **fields: Any) -> None:
+        event = {"t": round(time.monotonic() - self.started, 4), "kind": kind, **fields}
+        with self._lock:
+            self.events.append(event)
+
+    def note_tool(self, entry: dict[str, Any]) -> None:
+        self.note(TOOL, tool=entry.get("tool"), params=entry.get("params"), result=entry.get("result"))
+
+    def recording(
+        self,
+        outcome: NegotiationOutcome,
+        transcript: list[TranscriptTurn],
+        call_stats: Optional[dict[str, Any]] = None,
+    ) -> dict[str, Any]:
+        with self._lock:
+            events = list(self.events)
+        return {
+            **self.meta,
+            "duration_seconds": round(time.monotonic() - self.started, 4),
+            "call_stats": dict(call_stats or {}),
+            "events": events,
+            "transcript": [t.model_dump() for t in transcript],
+            "outcome": _outcome_json(outcome),
+        }
+
+    def save(
+        self,
+        root: Path,
+        outcome: NegotiationOutcome,
+        transcript: list[TranscriptTurn],
+        call_stats: Optional[dict[str, Any]] = None,
+    ) -> Optional[Path]:
+        """Write the recording under `root`/<date>/; a failed write is logged, never raised."""
+        recording = self.recording(outcome, transcript, call_stats)
+        day = recording["recorded_at"][:10]
+        name = f"{recording['recorded_at'][11:19].replace(':', '')}-{self.meta['provider_id']}-{uuid.uuid4().hex[:8]}.json"
+        path = Path(root) / day / name
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(recording, default=str), encoding="utf-8")
+        except OSError as e:
+            logger.warning("Could not write call recording %s: %s", path, e)
+            return None
+        return path
+
+
+def start_recording(
+    provider_id: str,
+    user_request: UserRequest,
+    task_id: Optional[str] = None,
+    providers_path: Optional[Path | str] = None,
+    turn_timeout_seconds: Optional[float] = None,
+) -> Optional[CallRecorder]:
+    """A recorder for a live call, or None when RECORDING_DIR is not set."""
+    if not getattr(get_settings(), "recording_dir", None):
+        return None
+    return CallRecorder(provider_id, user_request, task_id, providers_path, turn_timeout_seconds)
+
+
+def save_recording(
+    recorder: Optional[CallRecorder],
+    outcome: NegotiationOutcome,
+    transcript: list[TranscriptTurn],
+    call_stats: Optional[dict[str, Any]] = None,
+) -> Optional[Path]:
+    root = getattr(get_settings(), "recording_dir", None)
+    if recorder is None or not root:
+        return None
+    return recorder.save(Path(root), outcome, transcript, call_stats)
+
+
+def load_recording(path: Path | str) -> dict[str, Any]:
+    recording = json.loads(Path(path).read_text(encoding="utf-8"))
+    if recording.get("version") != RECORDING_VERSION:
+        raise ValueError(f"{path}: unsupported recording version {recording.get('version')!r}")
+    return recording
+
+
+def iter_recording_paths(paths: list[Path | str]) -> list[Path]:
+    """Recording files named directly or found (recursively) under the given directories, sorted."""
+    found: list[Path] = []
+    for p in map(Path, paths):
+        found.extend(sorted(p.rglob("*.json")) if p.is_dir() else [p])
+    return found
+
+
+def _segments(events: list[dict[str, Any]], trigger: str, kinds: tuple[str, ...]) -> list[list[dict[str, Any]]]:
+    """
+    Events of `kinds` grouped by the `trigger` send that preceded them, each
+    with `dt`, its delay after that send. Events before the first send join
+    the first group.
+    """
+    segments: list[list[dict[str, Any]]] = []
+    sent_at = 0.0
+    early: list[dict[str, Any]] = []
+    for event in events:
+        if event["kind"] == trigger:
+            segments.append(early)
+            early = []
+            sent_at = event["t"]
+        elif event["kind"] in kinds:
+            target = segments[-1] if segments else early
+            target.append({**event, "dt": max(0.0, event["t"] - sent_at)})
+    if early:
+        segments.append(early)
+    return segments
+
+
+class ReplayConversation:
+    """
+    Blocking stand-in for a Conversation: the n-th send_user_message replays
+    the n-th recorded group of replies and tool calls, on the caller's thread.
+    """
+
+    def __init__(
+        self,
+        call: "CallReplay",
+        segments: list[list[dict[str, Any]]],
+        callback: Callable[[str], None],
+        tools: Optional[dict[str, Callable[[dict], dict]]] = None,
+    ) -> None:
+        self._call = call
+        self._segments = segments
+        self._callback = callback
+        self._tools = tools or {}
+        self._next = 0
+        self._ws: Any = None
+        self._conversation_id: Optional[str] = None
+
+    def start_session(self) -> None:
+        self._ws = True
+        self._conversation_id = f"replay-{id(self):x}"
+
+    def send_user_message(self, text: str) -> None:
+        if not self._ws:
+            raise RuntimeError("Session not started or websocket not connected.")
+        segment = self._segments[self._next] if self._next < len(self._segments) else []
+        self._next += 1
+        sent = time.monotonic()
+        for event in segment:
+            self._call.wait_until(sent, event["dt"])
+            if event["kind"] == TOOL:
+                self._call.call_tool(self._tools, event)
+            else:
+                self._callback(event["text"])
+
+    def send_contextual_update(self, text: str) -> None:
+        if not self._ws:
+            raise RuntimeError("Session not started or websocket not connected.")
+
+    def end_session(self) -> None:
+        self._ws = None
+
+    def wait_for_session_end(self) -> Optional[str]:
+        return self._conversation_id
+
+
+class CallReplay:
+    """Replays one recording; run_agent_sync takes it as `replay` in place of the conversation factory."""
+
+    def __init__(self, recording: dict[str, Any], speed: float = 1.0, live_tools: bool = False) -> None:
+        self.recording = recording
+        self.speed = max(0.0, speed)
+        self.live_tools = live_tools
+        self.tool_mismatches: list[dict[str, Any]] = []
+        self._answers: dict[tuple[str, str], deque[Any]] = {}
+        for event in recording.get("events", ()):
+            if event["kind"] == TOOL:
+                self._answers.setdefault(self._key(event["tool"], event.get("params")), deque()).append(event.get("result"))
+
+    @staticmethod
+    def _key(tool: str, params: Any) -> tuple[str, str]:
+        return tool, json.dumps(params, sort_keys=True, default=str)
+
+    @property
+    def warm(self) -> bool:
+        return bool(self.recording.get("warm"))
+
+    def sleep(self, seconds: float) -> None:
+        if self.speed > 0:
+            time.sleep(seconds / self.speed)
+
+    def wait_until(self, since: float, dt: float) -> None:
+        if self.speed > 0:
+            remaining = since + dt / self.speed - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def answer(self, tool: str, params: dict) -> dict:
+        """The recorded result for this call (in recorded order when repeated)."""
+        answers = self._answers.get(self._key(tool, params))
+        if not answers:
+            return {"ok": False, "error": f"No recorded result for {tool}"}
+        return answers.popleft()
+
+    def call_tool(self, tools: dict[str, Callable[[dict], dict]], event: dict[str, Any]) -> None:
+        fn = tools.get(event["tool"])
+        if fn is None:
+            self.tool_mismatches.append({"tool": event["tool"], "params": event.get("params"), "error": "Tool not registered"})
+            return
+        result = fn(dict(event.get("params") or {}))
+        if self.live_tools and result != event.get("result"):
+            self.tool_mismatches.append({
+                "tool": event["tool"],
+                "params": event.get("params"),
+                "recorded": event.get("result"),
+                "replayed": result,
+            })
+
+    def voice_agent(
+        self,
+        providers_path: Path,
+        task_id: Optional[str],
+        tool_calls_log: list,
+        on_agent_response: Callable[[str], None],
+        on_tool_call: Optional[Callable[[dict], None]] = None,
+    ) -> ReplayConversation:
+        agent_responses: list[str] = []
+
+        def _on_response(text: str) -> None:
+            agent_responses.append(text)
+            on_agent_response(text)
+
+        tools = build_tool_registry(
+            providers_path,
+            task_id=task_id,
+            tool_calls_log=tool_calls_log,
+            on_tool_call=on_tool_call,
+            recorded=None if self.live_tools else self.answer,
+        )
+        conversation = ReplayConversation(self, _segments(self.recording["events"], TO_AGENT, (AGENT, TOOL)), _on_response, tools)
+        conversation._agent_responses = agent_responses
+        return conversation
+
+    def receptionist(self, on_receptionist_response: Optional[Callable[[str], None]] = None) -> ReplayConversation:
+        receptionist_responses: list[str] = []
+
+        def _on_response(text: str) -> None:
+            receptionist_responses.append(text)
+            if on_receptionist_response:
+                on_receptionist_response(text)
+
+        conversation = ReplayConversation(self, _segments(self.recording["events"], TO_RECEPTIONIST, (RECEPTIONIST,)), _on_response)
+        conversation._receptionist_responses = receptionist_responses
+        return conversation
+
+
+def replay_call(
+    recording: dict[str, Any],
+    providers_path: Optional[Path | str] = None,
+    speed: float = 1.0,
+    live_tools: bool = False,
+) -> dict[str, Any]:
+    """
+    Run a recording through the runner, tools and extract_outcome and compare
+    the outcome with the recorded one. `speed` 1.0 keeps the recorded pace;
+    0 replays as fast as possible.
+    """
+    from agents.outcome import extract_outcome
+    from agents.runner import run_agent_sync
+
+    provider_id = recording["provider_id"]
+    path = providers_path or recording.get("providers_path") or getattr(get_settings(), "providers_json_path", None)
+    call = CallReplay(recording, speed=speed, live_tools=live_tools)
+    call_stats: dict[str, Any] = {}
+    started = time.monotonic()
+    tool_calls_log, last_message, transcript = run_agent_sync(
+        provider_id=provider_id,
+        providers_path=path,
+        user_request=UserRequest.model_validate(recording["user_request"]),
+        task_id=recording.get("task_id") or f"replay-{uuid.uuid4().hex[:8]}",
+        turn_timeout_seconds=float(recording.get("turn_timeout_seconds") or 30.0),
+        call_stats=call_stats,
+        replay=call,
+    )
+    outcome = extract_outcome(provider_id, tool_calls_log, last_message, transcript)
+    replayed = _outcome_json(outcome)
+    recorded = recording.get("outcome") or {}
+    recorded_transcript = [(t["role"], t["text"]) for t in recording.get("transcript", ())]
+    return {
+        "provider_id": provider_id,
+        "recorded_at": recording.get("recorded_at"),
+        "speed": speed,
+        "live_tools": live_tools,
+        "duration_seconds": round(time.monotonic() - started, 4),
+        "recorded_duration_seconds": recording.get("duration_seconds"),
+        "outcome_matches": _comparable(replayed) == _comparable(recorded),
+        "transcript_matches": [(t.role, t.text) for t in transcript] == recorded_transcript,
+        "tool_calls": len(tool_calls_log),
+        "recorded_tool_calls": sum(1 for e in recording.get("events", ()) if e["kind"] == TOOL),
+        "tool_mismatches": call.tool_mismatches,
+        "outcome": replayed,
+        "recorded_outcome": recorded,
+        "call_stats": call_stats,
+    }
+
+
+def _comparable(outcome: dict[str, Any]) -> dict[str, Any]:
+    """Outcome fields a replay should reproduce (raw_metadata carries counters that may legitimately differ)."""
+    return {k: outcome.get(k) for k in ("proposed_slot", "confidence_score", "offered_slots", "rejection_reasons")}
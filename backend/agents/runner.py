@@ -1,21 +1,31 @@
 from __future__ import annotations
 
 import logging
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 from core.schemas import NegotiationOutcome, TranscriptTurn, UserRequest
 from core.providers_loader import get_provider
+from core.provider_stats import record_call, turn_timeout_for
+from core.tracing import span
 from simulation.receptionist import build_receptionist_context_message, generate_receptionist_response
 
 from agents.factory import create_receptionist_conversation, create_voice_agent
-from agents.outcome import extract_outcome
+from agents.live_sessions import get_live_sessions
+from agents.outcome import OutcomeTracker, extract_outcome
+from agents.replay import AGENT, RECEPTIONIST, TO_AGENT, TO_RECEPTIONIST, USER_UPDATE, CallRecorder, CallReplay, save_recording, start_recording
+from agents.session_pool import release_conversation
 
 logger = logging.getLogger(__name__)
 
 
+def _is_pooled(conversation) -> bool:
+    return getattr(conversation, "_pool_session", None) is not None
+
+
 def run_agent_sync(
     provider_id: str,
     providers_path: str,
@@ -25,72 +35,144 @@ def run_agent_sync(
     agent_id: Optional[str] = None,
     max_turns: int = 8,
     turn_timeout_seconds: float = 30.0,
+    on_outcome: Optional[Callable[[NegotiationOutcome], None]] = None,
+    call_stats: Optional[dict] = None,
+    recorder: Optional[CallRecorder] = None,
+    replay: Optional[CallReplay] = None,
+    stop: Optional[threading.Event] = None,
 ) -> tuple[list[dict], str | None, list[TranscriptTurn]]:
+    """
+    One negotiation, driven from the calling thread. `recorder` captures its
+    timeline; `replay` stands in for the conversation factory (see agents.replay).
+    Setting `stop` (e.g. a swarm cancelling the call) hangs up at the next wait.
+    """
     tool_calls_log: list[dict] = []
+    # Settles on confirm_slot or a definitive rejection; the loops below then hang up early.
+    tracker = OutcomeTracker(provider_id, on_settled=on_outcome)
+    settled = tracker.settled
     transcript: list[TranscriptTurn] = []
     last_agent_message: Optional[str] = None
+    first_reply: Optional[float] = None
+    timed_out = False
+    call_started = time.monotonic()
     path = Path(providers_path) if not isinstance(providers_path, Path) else providers_path
     provider = get_provider(path, provider_id)
+    if replay is not None:
+        sleep = replay.sleep
+    else:
+        sleep = stop.wait if stop is not None else time.sleep
+
+    def done() -> bool:
+        return settled.is_set() or (stop is not None and stop.is_set())
 
     def on_response(text: str) -> None:
         nonlocal last_agent_message
         last_agent_message = text
+        if recorder is not None:
+            recorder.note(AGENT, text=text)
+
+    def on_receptionist_response(text: str) -> None:
+        if recorder is not None:
+            recorder.note(RECEPTIONIST, text=text)
+
+    def on_tool_call(entry: dict) -> None:
+        if recorder is not None:
+            recorder.note_tool(entry)
+        tracker.observe(entry)
+
+    def send(conv, kind: str, text: str) -> None:
+        if kind == TO_AGENT:
+            deliver_injected()
+        if recorder is not None:
+            recorder.note(kind, text=text)
+        conv.send_user_message(text)
 
-    conversation = create_voice_agent(
-        provider_id=provider_id,
-        providers_path=path,
-        task_id=task_id,
-        tool_calls_log=tool_calls_log,
-        api_key=api_key,
-        agent_id=agent_id,
-        on_agent_response=on_response,
-    )
+    if replay is not None:
+        conversation = replay.voice_agent(path, task_id, tool_calls_log, on_response, on_tool_call)
+    else:
+        conversation = create_voice_agent(
+            provider_id=provider_id,
+            providers_path=path,
+            task_id=task_id,
+            tool_calls_log=tool_calls_log,
+            api_key=api_key,
+            agent_id=agent_id,
+            on_agent_response=on_response,
+            on_tool_call=on_tool_call,
+        )
     agent_responses = conversation._agent_responses
+    live = get_live_sessions().register(task_id, provider_id) if task_id and replay is None else None
+
+    def deliver_injected() -> None:
+        """Hand the agent any messages injected for this call since its last turn."""
+        if live is None:
+            return
+        for injection in live.pending():
+            conversation.send_contextual_update(injection.text)
+            live.delivered(injection)
+            if recorder is not None:
+                recorder.note(USER_UPDATE, text=injection.text)
 
-    use_two_agents = provider is not None
+    # A replay always has a recorded receptionist side, scripted or not.
+    use_two_agents = provider is not None or replay is not None
     recipient_conversation = None
     receptionist_responses: list[str] = []
     if use_two_agents:
         try:
-            recipient_conversation = create_receptionist_conversation(
-                provider=provider,
-                providers_path=path,
-                api_key=api_key,
-                agent_id=agent_id,
-            )
+            if replay is not None:
+                recipient_conversation = replay.receptionist(on_receptionist_response)
+            else:
+                recipient_conversation = create_receptionist_conversation(
+                    provider=provider,
+                    providers_path=path,
+                    api_key=api_key,
+                    agent_id=agent_id,
+                    on_receptionist_response=on_receptionist_response,
+                )
             receptionist_responses = recipient_conversation._receptionist_responses
         except Exception as e:
             logger.warning("Could not create recipient conversation, falling back to scripted receptionist: %s", e)
             use_two_agents = False
 
-    conversation.start_session()
-    if recipient_conversation:
-        try:
-            recipient_conversation.start_session()
-        except Exception as e:
-            logger.warning("Could not start recipient session, falling back to scripted receptionist: %s", e)
-            use_two_agents = False
-            recipient_conversation = None
+    conversations = [conversation] + ([recipient_conversation] if recipient_conversation else [])
+    warm = replay.warm if replay is not None else all(_is_pooled(c) for c in conversations)
+    if recorder is not None:
+        recorder.meta.update(warm=warm, two_agents=use_two_agents)
+    with span("session_start", "session", two_agents=use_two_agents, warm=warm):
+        if not _is_pooled(conversation):
+            conversation.start_session()
+        if recipient_conversation and not _is_pooled(recipient_conversation):
+            try:
+                recipient_conversation.start_session()
+            except Exception as e:
+                logger.warning("Could not start recipient session, falling back to scripted receptionist: %s", e)
+                use_two_agents = False
+                recipient_conversation = None
 
-    time.sleep(2.0)
+        # Pooled sessions were started and health-checked by the pool.
+        if not warm and not done():
+            sleep(2.0)
 
     try:
         initial_user_message = (
             f"{user_request.message} You are calling the dental office for provider {provider_id}"
             + (f" ({provider.name})." if provider else ".")
         )
-        conversation.send_user_message(initial_user_message)
+        send(conversation, TO_AGENT, initial_user_message)
+        sent_at = time.monotonic()
 
         if use_two_agents and recipient_conversation:
             for turn in range(max_turns):
-                deadline = time.monotonic() + turn_timeout_seconds
-                while time.monotonic() < deadline and len(agent_responses) <= turn:
-                    time.sleep(0.3)
+                with span("agent_turn", "turn", turn=turn):
+                    deadline = time.monotonic() + turn_timeout_seconds
+                    while time.monotonic() < deadline and len(agent_responses) <= turn and not done():
+                        settled.wait(0.3)
                 if len(agent_responses) <= turn:
+                    timed_out = not done()
                     break
                 agent_text = agent_responses[turn]
                 transcript.append(TranscriptTurn(role="agent", text=agent_text))
-                if not agent_text.strip():
+                if not agent_text.strip() or done():
                     break
                 context_message = build_receptionist_context_message(
                     provider,
@@ -98,42 +180,59 @@ def run_agent_sync(
                     from_date=datetime.utcnow(),
                     days_ahead=14,
                     duration_minutes=30,
-                )
-                recipient_conversation.send_user_message(context_message)
-                deadline = time.monotonic() + turn_timeout_seconds
-                while time.monotonic() < deadline and len(receptionist_responses) <= turn:
-                    time.sleep(0.3)
+                ) if provider is not None else agent_text
+                with span("receptionist_turn", "turn", turn=turn):
+                    send(recipient_conversation, TO_RECEPTIONIST, context_message)
+                    asked_at = time.monotonic()
+                    deadline = time.monotonic() + turn_timeout_seconds
+                    while time.monotonic() < deadline and len(receptionist_responses) <= turn and not done():
+                        settled.wait(0.3)
                 if len(receptionist_responses) <= turn:
+                    timed_out = not done()
                     break
+                if first_reply is None:
+                    first_reply = time.monotonic() - asked_at
                 receptionist_reply = receptionist_responses[turn]
                 transcript.append(TranscriptTurn(role="receptionist", text=receptionist_reply))
-                if not receptionist_reply.strip():
+                if not receptionist_reply.strip() or done():
                     break
-                conversation.send_user_message(receptionist_reply)
-            time.sleep(2.0)
+                send(conversation, TO_AGENT, receptionist_reply)
+            if not done():
+                with span("tail_wait", "session"):
+                    sleep(2.0)
             if agent_responses:
                 last_agent_message = agent_responses[-1]
                 if transcript and transcript[-1].role != "agent":
                     transcript.append(TranscriptTurn(role="agent", text=last_agent_message))
         else:
             for turn in range(max_turns - 1):
-                deadline = time.monotonic() + turn_timeout_seconds
-                while time.monotonic() < deadline and len(agent_responses) <= turn:
-                    time.sleep(0.3)
+                with span("agent_turn", "turn", turn=turn):
+                    deadline = time.monotonic() + turn_timeout_seconds
+                    while time.monotonic() < deadline and len(agent_responses) <= turn and not done():
+                        settled.wait(0.3)
                 if len(agent_responses) <= turn:
+                    timed_out = not done()
                     break
                 agent_text = agent_responses[turn]
                 transcript.append(TranscriptTurn(role="agent", text=agent_text))
-                if not agent_text or not provider:
+                if first_reply is None:
+                    first_reply = time.monotonic() - sent_at
+                if not agent_text or not provider or done():
                     break
-                receptionist_reply = generate_receptionist_response(
-                    provider,
-                    agent_text,
-                    context={"from_date": None, "days_ahead": 14},
-                )
-                conversation.send_user_message(receptionist_reply)
+                with span("receptionist_turn", "turn", turn=turn, scripted=True):
+                    receptionist_reply = generate_receptionist_response(
+                        provider,
+                        agent_text,
+                        context={"from_date": None, "days_ahead": 14},
+                    )
+                if recorder is not None:
+                    recorder.note(TO_RECEPTIONIST, text=agent_text)
+                    recorder.note(RECEPTIONIST, text=receptionist_reply)
+                send(conversation, TO_AGENT, receptionist_reply)
                 transcript.append(TranscriptTurn(role="receptionist", text=receptionist_reply))
-            time.sleep(3.0)
+            if not done():
+                with span("tail_wait", "session"):
+                    sleep(3.0)
             if agent_responses:
                 last_agent_message = agent_responses[-1]
                 if not transcript or transcript[-1].role != "agent":
@@ -141,18 +240,28 @@ def run_agent_sync(
     except RuntimeError as e:
         logger.warning("Conversation send/wait error: %s", e)
     finally:
-        conversation.end_session()
-        try:
-            conversation.wait_for_session_end()
-        except Exception:
-            pass
-        if recipient_conversation:
-            try:
-                recipient_conversation.end_session()
-                recipient_conversation.wait_for_session_end()
-            except Exception:
-                pass
+        if live is not None:
+            get_live_sessions().unregister(live)
+        with span("session_end", "session"):
+            if not release_conversation(conversation):
+                conversation.end_session()
+                try:
+                    conversation.wait_for_session_end()
+                except Exception:
+                    pass
+            if recipient_conversation and not release_conversation(recipient_conversation):
+                try:
+                    recipient_conversation.end_session()
+                    recipient_conversation.wait_for_session_end()
+                except Exception:
+                    pass
 
+    if call_stats is not None:
+        call_stats.update(
+            first_reply_seconds=first_reply,
+            timed_out=timed_out,
+            duration_seconds=time.monotonic() - call_started,
+        )
     return tool_calls_log, last_agent_message, transcript
 
 
@@ -163,14 +272,35 @@ def run_agent_and_extract_outcome(
     task_id: Optional[str] = None,
     api_key: Optional[str] = None,
     agent_id: Optional[str] = None,
+    on_outcome: Optional[Callable[[NegotiationOutcome], None]] = None,
+    turn_timeout_seconds: Optional[float] = None,
+    stop: Optional[threading.Event] = None,
 ) -> tuple[NegotiationOutcome, list[dict], list[TranscriptTurn]]:
-    tool_calls_log, last_message, transcript = run_agent_sync(
-        provider_id=provider_id,
-        providers_path=providers_path,
-        user_request=user_request,
-        task_id=task_id,
-        api_key=api_key,
-        agent_id=agent_id,
-    )
-    outcome = extract_outcome(provider_id, tool_calls_log, last_message)
+    if turn_timeout_seconds is None:
+        turn_timeout_seconds = turn_timeout_for(provider_id)
+    call_stats: dict = {}
+    recorder = start_recording(provider_id, user_request, task_id, providers_path, turn_timeout_seconds)
+    with span("provider_call", "call", provider_id=provider_id, turn_timeout=turn_timeout_seconds) as call_args:
+        tool_calls_log, last_message, transcript = run_agent_sync(
+            provider_id=provider_id,
+            providers_path=providers_path,
+            user_request=user_request,
+            task_id=task_id,
+            api_key=api_key,
+            agent_id=agent_id,
+            on_outcome=on_outcome,
+            turn_timeout_seconds=turn_timeout_seconds,
+            call_stats=call_stats,
+            recorder=recorder,
+            stop=stop,
+        )
+        outcome = extract_outcome(provider_id, tool_calls_log, last_message, transcript)
+        call_args["turns"] = len(transcript)
+        call_args["tool_calls"] = len(tool_calls_log)
+        call_args["has_slot"] = outcome.proposed_slot is not None
+        call_args["timed_out"] = call_stats.get("timed_out", False)
+    if stop is None or not stop.is_set():
+        # A call hung up by its caller says nothing about how responsive the practice is.
+        record_call(provider_id, call_stats, len(transcript), outcome.proposed_slot is not None)
+    save_recording(recorder, outcome, transcript, call_stats)
     return outcome, tool_calls_log, transcript
@@ -0,0 +1,400 @@
+"""
+Warm pool of ElevenLabs clients, tool runtimes and pre-started conversations.
+
+Creating a Conversation per provider call used to build a new ElevenLabs client,
+start a ClientTools event-loop thread, open the websocket and then sleep so the
+session could come up. The pool keeps:
+
+- one ElevenLabs client per API key,
+- one shared tool runtime (event-loop thread plus executor) that every pooled
+  ClientTools dispatches through,
+- per agent_id, a few conversations already started and health-checked. Each
+  is leased to one call, then recycled or ended.
+
+Callbacks and tool handlers are rebound per lease, so a warm session can serve
+any provider call. A session serves up to SESSION_POOL_MAX_USES calls; since
+an agent session remembers its previous conversation, each reuse opens with a
+contextual update telling the agent a new call has started. A session released
+with a reply still outstanding (a call hung up early or cancelled) is closed
+rather than recycled, and each lease ignores replies that arrive before its
+own first message, so a late reply never reaches the next call. Idle sessions are
+evicted after SESSION_POOL_MAX_IDLE_SECONDS without a lease, and an agent id
+nobody has acquired for SESSION_POOL_KEY_TTL_SECONDS is no longer refilled.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+from app.config import get_settings
+from core.executors import TOOLS, get_executor
+
+logger = logging.getLogger(__name__)
+
+AGENT_TOOL_NAMES = (
+    "check_availability",
+    "get_busy_windows",
+    "provider_lookup",
+    "list_providers",
+    "get_distance",
+    "validate_slot",
+    "confirm_slot",
+)
+
+# Sent to a recycled session before its next call.
+NEW_CALL_NOTE = (
+    "The previous call has ended. A new, unrelated call is starting now; "
+    "disregard any provider, slot or booking from earlier conversations."
+)
+
+_clients: dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key: Optional[str]) -> Any:
+    """One ElevenLabs client (and its HTTP connection pool) per API key."""
+    key = api_key or ""
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                from elevenlabs.client import ElevenLabs
+                client = ElevenLabs(api_key=key)
+                _clients[key] = client
+    return client
+
+
+class _ToolRuntime:
+    """A single event-loop thread and executor shared by every pooled ClientTools."""
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.executor = get_executor(TOOLS)
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True, name="session-pool-tools")
+        self._thread.start()
+
+
+_runtime: Optional[_ToolRuntime] = None
+_runtime_lock = threading.Lock()
+_pooled_tools_cls: Any = None
+
+
+def _get_runtime() -> _ToolRuntime:
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = _ToolRuntime()
+    return _runtime
+
+
+def _pooled_client_tools() -> Any:
+    """A ClientTools bound to the shared runtime; stopping it leaves the runtime running."""
+    global _pooled_tools_cls
+    if _pooled_tools_cls is None:
+        from elevenlabs.conversational_ai.conversation import ClientTools
+
+        class PooledClientTools(ClientTools):
+            def _schedule_coroutine(self, coro):
+                return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+            def stop(self):
+                pass
+
+        _pooled_tools_cls = PooledClientTools
+    runtime = _get_runtime()
+    tools = _pooled_tools_cls(loop=runtime.loop)
+    tools.thread_pool = runtime.executor
+    tools.start()
+    return tools
+
+
+class PooledSession:
+    """A started Conversation whose callbacks and tool handlers are rebound per lease."""
+
+    def __init__(self, agent_id: str, api_key: Optional[str], with_tools: bool) -> None:
+        from elevenlabs.conversational_ai.conversation import Conversation
+        from agents.audio_stub import StubAudioInterface
+
+        self.agent_id = agent_id
+        self.api_key = api_key or ""
+        self.with_tools = with_tools
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.uses = 0
+        # Lease number; replies are passed on only once the current lease has sent a message.
+        self.generation = 0
+        self._sent_generation = 0
+        self.awaiting_reply = False
+        self.on_response: Optional[Callable[[str], None]] = None
+        self.tools: dict[str, Callable[[dict], Any]] = {}
+        client_tools = _pooled_client_tools()
+        if with_tools:
+            for name in AGENT_TOOL_NAMES:
+                client_tools.register(name, self._dispatcher(name), is_async=False)
+        self.conversation = Conversation(
+            client=get_client(api_key),
+            agent_id=agent_id,
+            requires_auth=bool(api_key),
+            audio_interface=StubAudioInterface(),
+            client_tools=client_tools,
+            callback_agent_response=self._on_response,
+        )
+        self.conversation._pool_session = self
+        send = self.conversation.send_user_message
+
+        def send_user_message(text: str) -> None:
+            self._sent_generation = self.generation
+            self.awaiting_reply = True
+            send(text)
+
+        self.conversation.send_user_message = send_user_message
+        self.conversation.start_session()
+
+    def _on_response(self, text: str) -> None:
+        if self._sent_generation != self.generation:
+            # Left over from an earlier lease (or the session's greeting): not this call's reply.
+            logger.debug("Dropping stale reply on pooled session for agent %s", self.agent_id)
+            return
+        self.awaiting_reply = False
+        callback = self.on_response
+        if callback is not None:
+            callback(text)
+
+    def _dispatcher(self, name: str) -> Callable[[dict], Any]:
+        def dispatch(params: dict) -> Any:
+            fn = self.tools.get(name)
+            if fn is None:
+                return {"ok": False, "error": f"Tool {name} not available"}
+            return fn(params)
+        return dispatch
+
+    def is_connected(self) -> bool:
+        return getattr(self.conversation, "_ws", None) is not None
+
+    def healthy(self, max_idle_seconds: float) -> bool:
+        conv = self.conversation
+        thread = getattr(conv, "_thread", None)
+        if thread is None or not thread.is_alive() or conv._should_stop.is_set():
+            return False
+        return time.monotonic() - self.last_used <= max_idle_seconds
+
+    def bind(self, on_response: Optional[Callable[[str], None]], tools: dict[str, Callable[[dict], Any]]) -> None:
+        if self.uses:
+            try:
+                self.conversation.send_contextual_update(NEW_CALL_NOTE)
+            except Exception as e:
+                logger.debug("Could not reset recycled session for agent %s: %s", self.agent_id, e)
+        self.uses += 1
+        self.generation += 1
+        self.awaiting_reply = False
+        self.tools = tools
+        self.on_response = on_response
+
+    def unbind(self) -> None:
+        self.on_response = None
+        self.tools = {}
+        self.last_used = time.monotonic()
+
+    def close(self) -> None:
+        self.unbind()
+        try:
+            self.conversation.end_session()
+            self.conversation.wait_for_session_end()
+        except Exception:
+            pass
+
+
+class SessionPool:
+    def __init__(
+        self,
+        min_idle: int,
+        max_idle_seconds: float,
+        max_uses: int,
+        key_ttl_seconds: float = 600.0,
+        connect_timeout_seconds: float = 5.0,
+        maintenance_interval_seconds: float = 5.0,
+    ) -> None:
+        self.min_idle = max(0, min_idle)
+        self.max_idle_seconds = max_idle_seconds
+        self.max_uses = max(1, max_uses)
+        self.key_ttl_seconds = key_ttl_seconds
+        self.connect_timeout_seconds = connect_timeout_seconds
+        self.maintenance_interval_seconds = maintenance_interval_seconds
+        self._idle: dict[tuple[str, str, bool], deque[PooledSession]] = {}
+        # Last acquire (or explicit prewarm) per key; keys past key_ttl_seconds are not refilled.
+        self._demand: dict[tuple[str, str, bool], float] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "created": 0, "recycled": 0, "evicted": 0, "discarded": 0}
+        self._maintainer: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _key(self, agent_id: str, api_key: Optional[str], with_tools: bool) -> tuple[str, str, bool]:
+        return agent_id, api_key or "", with_tools
+
+    def _create(self, key: tuple[str, str, bool]) -> PooledSession:
+        session = PooledSession(agent_id=key[0], api_key=key[1], with_tools=key[2])
+        deadline = time.monotonic() + self.connect_timeout_seconds
+        while not session.is_connected() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        with self._lock:
+            self._stats["created"] += 1
+        return session
+
+    def acquire(
+        self,
+        agent_id: str,
+        api_key: Optional[str],
+        with_tools: bool,
+        on_response: Optional[Callable[[str], None]],
+        tools: Optional[dict[str, Callable[[dict], Any]]] = None,
+    ) -> PooledSession:
+        key = self._key(agent_id, api_key, with_tools)
+        session: Optional[PooledSession] = None
+        with self._lock:
+            self._demand[key] = time.monotonic()
+            idle = self._idle.setdefault(key, deque())
+            while idle:
+                candidate = idle.popleft()
+                if candidate.healthy(self.max_idle_seconds):
+                    session = candidate
+                    break
+                self._stats["evicted"] += 1
+                threading.Thread(target=candidate.close, daemon=True).start()
+            self._stats["hits" if session else "misses"] += 1
+        if session is None:
+            session = self._create(key)
+        session.bind(on_response, tools or {})
+        self._ensure_maintainer()
+        return session
+
+    def release(self, session: PooledSession) -> None:
+        session.unbind()
+        key = self._key(session.agent_id, session.api_key, session.with_tools)
+        if session.awaiting_reply:
+            # Hung up mid-turn: the reply (and the agent's memory of the call) would leak into the next lease.
+            with self._lock:
+                self._stats["discarded"] += 1
+        elif session.uses < self.max_uses and session.healthy(self.max_idle_seconds):
+            with self._lock:
+                self._idle.setdefault(key, deque()).append(session)
+                self._stats["recycled"] += 1
+            return
+        session.close()
+
+    def prewarm(self, agent_id: str, api_key: Optional[str], with_tools: bool, count: Optional[int] = None) -> int:
+        key = self._key(agent_id, api_key, with_tools)
+        with self._lock:
+            self._demand[key] = time.monotonic()
+        created = self._refill(key, count)
+        self._ensure_maintainer()
+        return created
+
+    def _refill(self, key: tuple[str, str, bool], count: Optional[int] = None) -> int:
+        with self._lock:
+            missing = (count if count is not None else self.min_idle) - len(self._idle.setdefault(key, deque()))
+        created = 0
+        for _ in range(max(0, missing)):
+            session = self._create(key)
+            with self._lock:
+                self._idle[key].append(session)
+            created += 1
+        return created
+
+    def _maintain_once(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            keys: list[tuple[str, str, bool]] = []
+            stale: list[PooledSession] = []
+            for key in list(self._idle.keys()):
+                idle = self._idle[key]
+                if now - self._demand.get(key, 0.0) > self.key_ttl_seconds:
+                    # Nobody has asked for this agent lately: let its sessions go instead of refilling.
+                    stale.extend(idle)
+                    del self._idle[key]
+                    self._demand.pop(key, None)
+                    continue
+                healthy = deque(s for s in idle if s.healthy(self.max_idle_seconds))
+                stale.extend(s for s in idle if s not in healthy)
+                self._idle[key] = healthy
+                keys.append(key)
+            self._stats["evicted"] += len(stale)
+        for session in stale:
+            session.close()
+        for key in keys:
+            try:
+                self._refill(key)
+            except Exception as e:
+                logger.warning("Session pool refill for agent %s failed: %s", key[0], e)
+
+    def _ensure_maintainer(self) -> None:
+        if self._maintainer is not None and self._maintainer.is_alive():
+            return
+
+        def run() -> None:
+            while not self._stop.wait(self.maintenance_interval_seconds):
+                self._maintain_once()
+
+        self._maintainer = threading.Thread(target=run, daemon=True, name="session-pool-maintainer")
+        self._maintainer.start()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "idle": {f"{k[0]}{':tools' if k[2] else ''}": len(v) for k, v in self._idle.items()},
+            }
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._lock:
+            sessions = [s for idle in self._idle.values() for s in idle]
+            self._idle.clear()
+        for session in sessions:
+            session.close()
+
+
+_pool: Optional[SessionPool] = None
+_pool_lock = threading.Lock()
+
+
+def is_session_pool_enabled() -> bool:
+    s = get_settings()
+    backend = (getattr(s, "conversation_backend", None) or "elevenlabs").lower()
+    return bool(getattr(s, "session_pool_enabled", False)) and backend != "offline"
+
+
+def get_session_pool() -> SessionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                s = get_settings()
+                _pool = SessionPool(
+                    min_idle=getattr(s, "session_pool_min_idle", 2),
+                    max_idle_seconds=getattr(s, "session_pool_max_idle_seconds", 60.0),
+                    max_uses=getattr(s, "session_pool_max_uses", 4),
+                    key_ttl_seconds=getattr(s, "session_pool_key_ttl_seconds", 600.0),
+                )
+    return _pool
+
+
+def release_conversation(conversation: Any) -> bool:
+    """Return a pooled conversation to its pool. False if it was not pooled."""
+    session = getattr(conversation, "_pool_session", None)
+    if session is None or _pool is None:
+        return False
+    _pool.release(session)
+    return True
+
+
+def close_session_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
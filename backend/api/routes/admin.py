@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from agents.live_sessions import get_live_sessions
+from core.archive import get_archive
+from core.executors import INTEGRATIONS, executor_stats, run_in
+from core.memory import get_allocation_tracker, process_memory, subsystem_sizes, task_sizes
+from core.profiling import get_profiler
+from core.provider_stats import get_provider_stats
+from core.scheduler import get_scheduler
+
+router = APIRouter()
+
+
+@router.get("/executors")
+async def get_executors() -> dict[str, Any]:
+    """Saturation gauges per bulkhead: active threads, queued work, peaks and completed count."""
+    return {"executors": executor_stats()}
+
+
+@router.get("/scheduler")
+async def get_task_scheduler() -> dict[str, Any]:
+    """Task queue depth per priority class, running slots and the run-time estimates used for ETAs."""
+    return get_scheduler().snapshot()
+
+
+@router.get("/live-sessions")
+async def get_live_session_stats() -> dict[str, Any]:
+    """Calls currently registered for message injection, and injection counters."""
+    return get_live_sessions().snapshot()
+
+
+@router.get("/provider-stats")
+async def get_provider_responsiveness() -> dict[str, Any]:
+    """Rolling per-provider stats with the ordering score and skip decision the swarm would use now."""
+    store = get_provider_stats()
+    stats = store.snapshot()
+    for pid, entry in stats.items():
+        entry["score"] = round(store.score(pid), 4)
+        entry["skipped"] = store.should_skip(pid)
+    return {"providers": stats}
+
+
+@router.get("/archive/search")
+async def search_archive(
+    q: Optional[str] = Query(None, description="Words that must all appear"),
+    provider_id: Optional[str] = None,
+    tool: Optional[str] = None,
+    error: Optional[str] = Query(None, description="Words that must all appear in the tool error"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    context: int = Query(2, ge=0, le=20),
+    limit: int = Query(50, ge=1, le=500),
+) -> dict[str, Any]:
+    """Archived transcript turns and tool calls matching every term, newest first, with surrounding context."""
+    archive = get_archive(create=False)
+    if archive is None:
+        raise HTTPException(status_code=503, detail="Transcript archive is not configured (set ARCHIVE_DIR) or could not be opened")
+    try:
+        hits = await run_in(
+            INTEGRATIONS, archive.search, q, provider_id, tool, error, since, until, context, limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"count": len(hits), "hits": hits, "archive": dict(archive.stats)}
+
+
+def _memory_subsystems() -> dict[str, Any]:
+    from agents import live_sessions, session_pool
+    from api.routes.tasks import _tasks
+    from core import archive, ledger, provider_index, provider_stats, providers_loader, slot_index
+    from integrations import freebusy
+
+    def pooled_sessions() -> Any:
+        pool = session_pool._pool
+        return list(pool._idle.values()) if pool is not None else []
+
+    def archive_queue() -> Any:
+        a = archive._archive
+        return list(a._queue.queue) if a is not None else []
+
+    def live_call_registry() -> Any:
+        # Injections keep (loop, future) waiters and sessions point back at the registry;
+        # measure what grows per task without walking into the event loop.
+        registry = live_sessions._registry
+        with registry._lock:
+            sessions = {tid: [(pid, c.started_at, c.deliveries) for pid, c in calls.items()] for tid, calls in registry._sessions.items()}
+            injections = {tid: list(items) for tid, items in registry._injections.items()}
+        return {
+            "sessions": sessions,
+            "injections": {
+                tid: [(i.id, i.text, i.provider_id, i.targets, i.delivered, i.undelivered) for i in items]
+                for tid, items in injections.items()
+            },
+        }
+
+    def freebusy_cache() -> Any:
+        service = freebusy._service
+        return dict(service._cache) if service is not None else {}
+
+    return {
+        "task_store": lambda: _tasks,
+        "provider_registry_cache": lambda: providers_loader._cache,
+        "provider_catalogs": lambda: providers_loader._catalogs,
+        "provider_index": lambda: provider_index._indexes,
+        "slot_index": lambda: slot_index._indexes,
+        "provider_stats": lambda: provider_stats._store,
+        "booking_ledger": lambda: ledger._ledger,
+        "session_pool": pooled_sessions,
+        "live_call_registry": live_call_registry,
+        "freebusy_cache": freebusy_cache,
+        "archive_queue": archive_queue,
+    }
+
+
+def _memory_report(top: int) -> dict[str, Any]:
+    from api.routes.tasks import _tasks
+    return {
+        "process": process_memory(),
+        "subsystems": subsystem_sizes(_memory_subsystems()),
+        "tasks": task_sizes(_tasks, top=top),
+        "tracemalloc": get_allocation_tracker().status(),
+    }
+
+
+@router.get("/memory")
+async def get_memory(top: int = Query(20, ge=1, le=500)) -> dict[str, Any]:
+    """
+    Approximate bytes per subsystem and per task (largest tasks first, split
+    into outcomes, tool log, transcript and trace), plus process RSS.
+    """
+    return await run_in(INTEGRATIONS, _memory_report, top)
+
+
+@router.get("/memory/tracemalloc")
+async def get_tracemalloc() -> dict[str, Any]:
+    return get_allocation_tracker().status()
+
+
+@router.post("/memory/tracemalloc/start")
+async def start_tracemalloc(frames: int = Query(1, ge=1, le=64)) -> dict[str, Any]:
+    """Start tracing allocations; more frames give better sites at a higher overhead."""
+    return get_allocation_tracker().start(frames)
+
+
+@router.post("/memory/tracemalloc/stop")
+async def stop_tracemalloc() -> dict[str, Any]:
+    return get_allocation_tracker().stop()
+
+
+@router.post("/memory/tracemalloc/snapshot")
+async def take_tracemalloc_snapshot() -> dict[str, Any]:
+    try:
+        sid = await run_in(INTEGRATIONS, get_allocation_tracker().snapshot)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"id": sid, **get_allocation_tracker().status()}
+
+
+@router.get("/memory/tracemalloc/top")
+async def get_tracemalloc_top(
+    snapshot: Optional[str] = Query(None, description="Snapshot id; a fresh one when omitted"),
+    top: int = Query(25, ge=1, le=500),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+) -> dict[str, Any]:
+    """Largest allocation sites in one snapshot."""
+    tracker = get_allocation_tracker()
+    try:
+        return await run_in(INTEGRATIONS, tracker.top_sites, snapshot, top, group_by)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown snapshot '{snapshot}'")
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/memory/tracemalloc/diff")
+async def diff_tracemalloc(
+    base: str,
+    current: Optional[str] = Query(None, description="Snapshot id; a fresh one when omitted"),
+    top: int = Query(25, ge=1, le=500),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+) -> dict[str, Any]:
+    """Allocation sites that grew the most between two snapshots."""
+    tracker = get_allocation_tracker()
+    try:
+        return await run_in(INTEGRATIONS, tracker.diff, base, current, top, group_by)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown snapshot {e}")
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/profiles")
+async def list_profiles() -> dict[str, Any]:
+    """Saved profiles, newest first, plus the profiler's rate-cap state."""
+    profiler = get_profiler()
+    profiles = await run_in(INTEGRATIONS, profiler.list)
+    return {"profiles": profiles, "profiler": profiler.snapshot()}
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    format: str = Query("pstats", pattern="^(pstats|collapsed|json)$"),
+) -> FileResponse:
+    """
+    One profile: `pstats` loads with pstats.Stats, `collapsed` is folded
+    stacks for flamegraph.pl or speedscope, `json` is the summary.
+    """
+    path = get_profiler().path(profile_id, format)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Unknown profile '{profile_id}'")
+    media_type = {"pstats": "application/octet-stream", "collapsed": "text/plain", "json": "application/json"}[format]
+    return FileResponse(path, media_type=media_type, filename=path.name)
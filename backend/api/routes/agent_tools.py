@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Optional
 
@@ -26,6 +26,9 @@ class AvailabilityRequest(BaseModel):
     time_min_iso: Optional[str] = Field(None, description="Start of window (ISO datetime)")
     time_max_iso: Optional[str] = Field(None, description="End of window (ISO datetime)")
     duration_minutes: int = Field(30, ge=15, le=120, description="Slot duration in minutes")
+    provider_ids: Optional[list[str]] = Field(
+        None, description="Answer for these providers' calendars instead of the user's (one batched lookup)"
+    )
 
 
 class UserWeightingRequest(BaseModel):
@@ -40,10 +43,9 @@ def _providers_path() -> Path:
 
 @router.post("/rating", response_model=dict)
 async def tool_rating(body: RatingRequest) -> dict[str, Any]:
-    from integrations.google_places import get_place_rating_by_place_id, get_provider_rating
+    from integrations.google_places import get_place_rating_by_place_id_async, get_provider_rating
     if body.place_id:
-        out = get_place_rating_by_place_id(body.place_id)
-        return out
+        return await get_place_rating_by_place_id_async(body.place_id)
     if body.provider_id:
         return get_provider_rating(body.provider_id, _providers_path())
     return {"ok": False, "error": "Provide provider_id or place_id"}
@@ -51,8 +53,8 @@ async def tool_rating(body: RatingRequest) -> dict[str, Any]:
 
 @router.post("/distance", response_model=dict)
 async def tool_distance(body: DistanceRequest) -> dict[str, Any]:
-    from integrations.google_maps_distance import get_provider_distance
-    return get_provider_distance(
+    from integrations.google_maps_distance import get_provider_distance_async
+    return await get_provider_distance_async(
         body.provider_id,
         origin=body.origin,
         providers_path=_providers_path(),
@@ -61,7 +63,7 @@ async def tool_distance(body: DistanceRequest) -> dict[str, Any]:
 
 @router.post("/availability", response_model=dict)
 async def tool_availability(body: AvailabilityRequest) -> dict[str, Any]:
-    from integrations.google_calendar import get_freebusy, get_available_slots
+    from integrations.google_calendar import get_available_slots_async
     now = datetime.utcnow()
     time_min = now
     time_max = now + timedelta(days=14)
@@ -75,10 +77,64 @@ async def tool_availability(body: AvailabilityRequest) -> dict[str, Any]:
             time_max = datetime.fromisoformat(body.time_max_iso.replace("Z", "+00:00"))
         except (ValueError, TypeError):
             pass
-    slots = get_available_slots(time_min, time_max, duration_minutes=body.duration_minutes)
+    if body.provider_ids:
+        providers = await _provider_availability(body.provider_ids, time_min, time_max, body.duration_minutes)
+        return {"ok": True, "providers": providers, "time_min": time_min.isoformat(), "time_max": time_max.isoformat()}
+    slots = await get_available_slots_async(time_min, time_max, duration_minutes=body.duration_minutes)
     return {"ok": True, "slots": slots, "time_min": time_min.isoformat(), "time_max": time_max.isoformat()}
 
 
+async def _provider_availability(
+    provider_ids: list[str],
+    time_min: datetime,
+    time_max: datetime,
+    duration_minutes: int,
+) -> dict[str, Any]:
+    """Open slots per provider: working hours and ledger, minus busy time on the provider's calendar."""
+    from core.executors import INTEGRATIONS, run_in
+    from core.providers_loader import get_providers_by_id
+    from simulation.availability import get_available_slots as provider_slots
+    from tools.calendar import provider_busy_windows_async
+
+    def utc(dt: datetime) -> datetime:
+        return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+    path = _providers_path()
+    busy = (await provider_busy_windows_async(provider_ids, path, time_min, time_max))["providers"]
+    start = utc(time_min).replace(tzinfo=None)
+    end = utc(time_max).replace(tzinfo=None)
+    days = max(1, (end.date() - start.date()).days + 1)
+
+    def open_slots() -> dict[str, Any]:
+        # Registry lookup and slot generation walk every provider's hours and ledger; run off the loop.
+        by_id = get_providers_by_id(path, ids=provider_ids)
+        result: dict[str, Any] = {}
+        for pid in provider_ids:
+            prov = by_id.get(pid)
+            if prov is None:
+                result[pid] = {"slots": [], "error": "Provider not found"}
+                continue
+            windows = [
+                (utc(datetime.fromisoformat(b["start"])), utc(datetime.fromisoformat(b["end"])))
+                for b in busy[pid].get("busy", [])
+            ]
+            slots = []
+            for slot in provider_slots(prov, start, days_ahead=days, duration_minutes=duration_minutes):
+                slot_end = slot + timedelta(minutes=duration_minutes)
+                if slot_end > end:
+                    break
+                s_utc, e_utc = utc(slot), utc(slot_end)
+                if any(b0 < e_utc and s_utc < b1 for b0, b1 in windows):
+                    continue
+                slots.append({"start_iso": slot.isoformat(), "end_iso": slot_end.isoformat()})
+            result[pid] = {"slots": slots[:50], "busy": busy[pid].get("busy", [])}
+            if busy[pid].get("error"):
+                result[pid]["error"] = busy[pid]["error"]
+        return result
+
+    return await run_in(INTEGRATIONS, open_slots)
+
+
 @router.post("/user-weighting", response_model=dict)
 async def tool_user_weighting(body: UserWeightingRequest) -> dict[str, Any]:
     get_settings()
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+import asyncio
+import json
+from typing import Any, AsyncIterator, Optional
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from core.schemas import BookedAppointment, ConfirmAppointmentRequest, TaskStatus
+from core.ledger import SlotConflict, get_ledger
+from core.schemas import BookedAppointment, CalendarSyncStatus, ConfirmAppointmentRequest, TaskStatus
+from integrations.calendar_writer import TERMINAL_STATUSES, get_calendar_writer
+from integrations.google_calendar import is_google_calendar_configured
 from api.routes.tasks import _tasks, _tasks_lock
 
 router = APIRouter()
@@ -38,28 +44,85 @@ async def confirm_appointment(body: ConfirmAppointmentRequest) -> ConfirmRespons
             status_code=400,
             detail="Selected provider_id and slot are not in the task shortlist.",
         )
-    calendar_event_id = None
-    calendar_link = None
+    ledger = get_ledger()
     try:
-        from integrations.google_calendar import is_google_calendar_configured, create_event
-        if is_google_calendar_configured():
-            start_iso = body.slot.isoformat()
-            end_iso = (body.slot + timedelta(minutes=30)).isoformat()
-            ev = create_event(start_iso=start_iso, end_iso=end_iso, summary=f"Dental appointment – {body.provider_id}")
-            if ev.get("ok"):
-                calendar_event_id = ev.get("event_id")
-                calendar_link = ev.get("html_link")
-    except Exception:
-        pass
+        ledger.commit(body.provider_id, body.slot, body.task_id)
+    except SlotConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    previous = state.confirmed_appointment
+    if previous and (previous.provider_id, previous.slot) != (body.provider_id, body.slot):
+        ledger.cancel(previous.provider_id, previous.slot, body.task_id)
+    # Calls may have held slots outside the shortlist (e.g. cancelled swarm calls); release them all.
+    ledger.release_holds(body.task_id)
     appointment = BookedAppointment(
         task_id=body.task_id,
         provider_id=body.provider_id,
         slot=body.slot,
-        calendar_event_id=calendar_event_id,
-        calendar_link=calendar_link,
     )
+    if is_google_calendar_configured():
+        # The event is written in the background; poll or stream /{task_id}/calendar for its status.
+        get_calendar_writer().enqueue(appointment)
     async with _tasks_lock:
         state = _tasks.get(body.task_id)
         if state:
             state.confirmed_appointment = appointment
     return ConfirmResponse(ok=True, appointment=appointment)
+
+
+class CalendarSyncResponse(BaseModel):
+    task_id: str
+    status: CalendarSyncStatus
+    calendar_event_id: Optional[str] = None
+    calendar_link: Optional[str] = None
+    attempts: int = 0
+    error: Optional[str] = None
+
+
+def _sync_status(appointment: BookedAppointment) -> CalendarSyncResponse:
+    return CalendarSyncResponse(
+        task_id=appointment.task_id,
+        status=appointment.calendar_sync_status,
+        calendar_event_id=appointment.calendar_event_id,
+        calendar_link=appointment.calendar_link,
+        attempts=appointment.calendar_sync_attempts,
+        error=appointment.calendar_sync_error,
+    )
+
+
+async def _confirmed_appointment(task_id: str) -> BookedAppointment:
+    async with _tasks_lock:
+        state = _tasks.get(task_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if not state.confirmed_appointment:
+        raise HTTPException(status_code=404, detail="Task has no confirmed appointment.")
+    return state.confirmed_appointment
+
+
+@router.get("/{task_id}/calendar", response_model=CalendarSyncResponse)
+async def get_calendar_sync(task_id: str) -> CalendarSyncResponse:
+    return _sync_status(await _confirmed_appointment(task_id))
+
+
+@router.get("/{task_id}/calendar/stream")
+async def stream_calendar_sync(task_id: str, timeout_seconds: float = 60.0) -> StreamingResponse:
+    """Server-sent events: one `data:` line per status change, closed once the sync is final."""
+    appointment = await _confirmed_appointment(task_id)
+
+    async def events() -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max(1.0, timeout_seconds)
+        last: Any = None
+        while True:
+            current = _sync_status(appointment).model_dump(mode="json")
+            if current != last:
+                last = current
+                yield f"data: {json.dumps(current)}\n\n"
+            if appointment.calendar_sync_status in TERMINAL_STATUSES:
+                return
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            await get_calendar_writer().wait_for_change(min(remaining, 15.0))
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from app.config import get_settings
+from core.executors import INTEGRATIONS, run_in
+from core.providers_loader import get_providers_by_id
+from core.schemas import OutboundCallState, OutboundCallStatus
+from integrations.elevenlabs_phone import is_outbound_configured
+from telephony.dialer import get_dialer
+from telephony.twilio_stub import get_simulation_recipient, is_twilio_configured
+
+router = APIRouter()
+
+MAX_PROVIDERS = 1000
+
+
+class DialRequest(BaseModel):
+    provider_ids: list[str] = Field(..., min_length=1, max_length=MAX_PROVIDERS)
+    to_number: Optional[str] = Field(
+        None, description="Call this number for every provider instead of their own (defaults to SIMULATION_CALL_RECIPIENT)"
+    )
+
+
+def _providers_path() -> Path:
+    s = get_settings()
+    p = getattr(s, "providers_json_path", None)
+    return Path(p) if p else Path(__file__).resolve().parent.parent.parent / "data" / "providers.json"
+
+
+@router.post("/", response_model=list[OutboundCallState])
+async def dial(body: DialRequest) -> list[OutboundCallState]:
+    """
+    Place outbound calls to the given providers through the shared dialer,
+    within its calls-per-second and in-flight limits. Providers without a
+    number come back failed without being dialed.
+    """
+    dialer = get_dialer()
+    configured = is_twilio_configured() if dialer.backend == "twilio" else is_outbound_configured()
+    if not configured:
+        raise HTTPException(status_code=503, detail=f"Outbound calls are not configured for the {dialer.backend} backend")
+    override = body.to_number or get_simulation_recipient()
+    by_id = await run_in(INTEGRATIONS, get_providers_by_id, _providers_path(), body.provider_ids)
+    targets: list[tuple[str, str]] = []
+    unreachable: list[OutboundCallState] = []
+    for pid in dict.fromkeys(body.provider_ids):
+        prov = by_id.get(pid)
+        number = (override or prov.phone_number) if prov is not None else None
+        if number:
+            targets.append((pid, number))
+            continue
+        unreachable.append(OutboundCallState(
+            provider_id=pid,
+            to_number="",
+            backend=dialer.backend,
+            status=OutboundCallStatus.FAILED,
+            message="Provider not found" if prov is None else "Provider has no phone number",
+        ))
+    return await dialer.dial_many(targets) + unreachable
+
+
+@router.get("/{provider_id}", response_model=OutboundCallState)
+async def get_call(provider_id: str) -> OutboundCallState:
+    """Latest outbound call placed to this provider."""
+    state = get_dialer().get_call(provider_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="No outbound call for this provider")
+    return state
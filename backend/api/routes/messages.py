@@ -1,30 +1,68 @@
 from __future__ import annotations
 
+from typing import Optional
+
 from fastapi import APIRouter, HTTPException, Request
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
+from agents.live_sessions import get_live_sessions
 from api.routes.tasks import _tasks, _tasks_lock
+from core.schemas import TaskStatus
 
 router = APIRouter()
 
 
 class SendMessageRequest(BaseModel):
     task_id: str
-    message: str
+    message: str = Field(..., min_length=1)
+    provider_id: Optional[str] = Field(None, description="Deliver only to this provider's call; every call of the task when omitted")
+    wait_seconds: float = Field(10.0, ge=0, le=60, description="How long to wait for the live calls to acknowledge")
 
 
 class SendMessageResponse(BaseModel):
     ok: bool
     message: str
+    message_id: Optional[str] = None
+    acknowledged: bool = False
+    delivered: dict[str, float] = Field(default_factory=dict, description="Provider id -> seconds from receipt to delivery")
+    pending: list[str] = Field(default_factory=list)
+    undelivered: list[str] = Field(default_factory=list)
 
 
 @router.post("/", response_model=SendMessageResponse)
 async def send_message(request: Request, body: SendMessageRequest) -> SendMessageResponse:
+    """
+    Inject a user message into the task's live calls. Each call hands it to its
+    agent before the agent's next turn; the response reports which calls did so
+    within `wait_seconds`, and how long each took.
+    """
     async with _tasks_lock:
         state = _tasks.get(body.task_id)
     if not state:
         raise HTTPException(status_code=404, detail="Task not found")
+    if state.status not in (TaskStatus.PENDING, TaskStatus.RUNNING):
+        raise HTTPException(status_code=409, detail=f"Task is {state.status.value}; there is no live call to deliver to")
+    try:
+        injection = get_live_sessions().inject(body.task_id, body.message, body.provider_id)
+    except OverflowError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    if injection.targets and body.wait_seconds > 0:
+        await injection.wait(body.wait_seconds)
+    report = injection.to_dict()
+    if not injection.targets:
+        message = "Queued; it will be delivered when the task's calls start."
+    elif report["pending"]:
+        message = "Queued; not every live call has reached its next turn yet."
+    elif report["delivered"]:
+        message = f"Delivered to {len(report['delivered'])} live call(s)."
+    else:
+        message = "The calls ended before their next turn; not delivered."
     return SendMessageResponse(
-        ok=True,
-        message="Message accepted. Real-time injection into active conversation requires session handle.",
+        ok=bool(report["delivered"] or report["pending"] or not injection.targets),
+        message=message,
+        message_id=report["message_id"],
+        acknowledged=bool(injection.targets) and report["acknowledged"],
+        delivered=report["delivered"],
+        pending=report["pending"],
+        undelivered=report["undelivered"],
     )
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+
+from app.config import get_settings
+from core.executors import INTEGRATIONS, run_in
+from core.provider_index import DEFAULT_FIELDS, SORT_KEYS, InvalidCursor, StaleCursor, get_provider_index
+
+router = APIRouter()
+
+MAX_LIMIT = 500
+
+
+def _providers_path() -> Path:
+    s = get_settings()
+    p = getattr(s, "providers_json_path", None)
+    return Path(p) if p else Path(__file__).resolve().parent.parent.parent / "data" / "providers.json"
+
+
+@router.get("/")
+async def list_providers(
+    request: Request,
+    response: Response,
+    min_rating: Optional[float] = Query(None, ge=0, le=5),
+    max_distance_km: Optional[float] = Query(None, ge=0),
+    region: Optional[str] = None,
+    receptionist_style: Optional[str] = None,
+    open_on: Optional[str] = Query(None, description="Day name, 'weekday' or 'weekend'"),
+    open_at: Optional[datetime] = Query(None, description="Open (by opening hours) at this time"),
+    sort_by: str = Query("id", description=f"One of {', '.join(SORT_KEYS)}"),
+    descending: bool = False,
+    limit: int = Query(50, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=f"Comma-separated; default {','.join(DEFAULT_FIELDS)}"),
+) -> Any:
+    """
+    Filtered, sorted, cursor-paginated providers from the in-memory provider
+    index. The ETag changes with the registry file and the query, so clients
+    can revalidate pages with If-None-Match.
+    """
+    index = get_provider_index(_providers_path())
+    if index.is_stale():
+        await run_in(INTEGRATIONS, index.ensure_built)
+    etag = f'W/"{index.version[0]:x}-{index.version[1]:x}-{zlib.crc32(str(request.query_params).encode()):x}"' if index.version else None
+    if etag is not None and request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    selected = tuple(f.strip() for f in fields.split(",") if f.strip()) if fields else DEFAULT_FIELDS
+    try:
+        page = index.search(
+            min_rating=min_rating,
+            max_distance_km=max_distance_km,
+            region=region,
+            receptionist_style=receptionist_style,
+            open_on=open_on.lower() if open_on else None,
+            open_at=open_at,
+            sort_by=sort_by,
+            descending=descending,
+            limit=limit,
+            cursor=cursor,
+            fields=selected,
+        )
+    except StaleCursor as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if etag is not None:
+        response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return page
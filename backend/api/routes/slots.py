@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.config import get_settings
+from core.executors import INTEGRATIONS, run_in
+from core.providers_loader import get_providers_by_id
+from core.slot_index import get_slot_index, is_slot_index_enabled
+
+router = APIRouter()
+
+
+def _providers_path() -> Path:
+    s = get_settings()
+    p = getattr(s, "providers_json_path", None)
+    return Path(p) if p else Path(__file__).resolve().parent.parent.parent / "data" / "providers.json"
+
+
+@router.get("/search")
+async def search_slots(
+    start: datetime = Query(..., description="Window start (ISO 8601)"),
+    end: Optional[datetime] = Query(None, description="Window end; defaults to one day after start"),
+    min_rating: Optional[float] = Query(None, ge=0, le=5),
+    max_distance_km: Optional[float] = Query(None, gt=0),
+    region: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=1000),
+) -> dict[str, Any]:
+    """
+    Providers with an open slot starting in the window, earliest first, from the
+    slot index. Holds are not indexed, so a hit can still be taken by a task in flight.
+    """
+    if not is_slot_index_enabled():
+        raise HTTPException(status_code=503, detail="Slot index is disabled")
+    end = end or start + timedelta(days=1)
+    if end <= start:
+        raise HTTPException(status_code=422, detail="end must be after start")
+    path = _providers_path()
+    index = get_slot_index(path)
+    if index.is_stale():
+        await run_in(INTEGRATIONS, index.ensure_built)
+    hits = index.query(start, end, min_rating=min_rating, max_distance_km=max_distance_km, region=region, limit=limit)
+    by_id = get_providers_by_id(path, ids=[pid for pid, _ in hits])
+    return {
+        "start": start,
+        "end": end,
+        "count": len(hits),
+        "providers": [
+            {
+                "provider_id": pid,
+                "provider_name": by_id[pid].name if pid in by_id else None,
+                "first_open_bucket": at,
+            }
+            for pid, at in hits
+        ],
+        "index": index.stats(),
+    }
@@ -1,15 +1,27 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import uuid
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Any, Dict
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict
 
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from core.schemas import TaskCreate, TaskMode, TaskState, TaskStatus
-from swarm.controller import run_swarm, run_single_agent
+from agents.live_sessions import get_live_sessions
+from core import profiling
+from core.archive import archive_task
+from core.executors import CONVERSATIONS, get_executor
+from core.ledger import get_ledger
+from core.scheduler import QueueFull, get_scheduler
+from core.schemas import NegotiationOutcome, RankedSlot, TaskCreate, TaskMode, TaskState, TaskStatus
+from core.scoring import VALIDATED_CONFIDENCE
+from core.tracing import Tracer, bind, to_chrome_trace
+from swarm.controller import run_first_acceptable, run_single_agent, run_single_agent_async, run_swarm
 
 router = APIRouter()
 
@@ -23,51 +35,120 @@ class TaskCreateResponse(BaseModel):
     message: str
 
 
-async def _run_task(task_id: str, state: TaskState, settings: Any) -> None:
+def _outcome_publisher(state: TaskState) -> Callable[[NegotiationOutcome], None]:
+    """Publish a settled outcome to the task as soon as a call decides, before the swarm finishes."""
+    loop = asyncio.get_running_loop()
+
+    def publish(outcome: NegotiationOutcome) -> None:
+        state.outcomes = [o for o in state.outcomes if o.provider_id != outcome.provider_id] + [outcome]
+        state.updated_at = datetime.utcnow()
+
+    def on_outcome(outcome: NegotiationOutcome) -> None:
+        loop.call_soon_threadsafe(publish, outcome)
+
+    return on_outcome
+
+
+def _hold_shortlist(task_id: str, shortlist: list[RankedSlot], max_holds: int = 5) -> list[RankedSlot]:
+    """
+    Hold the best validated slot of each provider (at most `max_holds`) for
+    this task and drop the ones someone else has taken meanwhile. Unvalidated
+    offers stay ranked but are never held, so they do not block other tasks,
+    and every other hold the task's calls placed (confirm_slot holds, from
+    cancelled calls too) is released.
+    """
+    ledger = get_ledger()
+    held_providers: set[str] = set()
+    kept: list[RankedSlot] = []
+    for s in shortlist:
+        if s.score >= VALIDATED_CONFIDENCE and s.provider_id not in held_providers and len(held_providers) < max_holds:
+            if ledger.hold(s.provider_id, s.slot, task_id) is None:
+                continue
+            s.held = True
+            held_providers.add(s.provider_id)
+        kept.append(s)
+    ledger.release_holds(task_id, keep={(s.provider_id, s.slot) for s in kept if s.held})
+    for rank, s in enumerate(kept, start=1):
+        s.rank = rank
+    return kept
+
+
+async def _run_task(task_id: str, state: TaskState, settings: Any, profile: bool = False) -> None:
     raw_path = getattr(settings, "providers_json_path", None)
     path = Path(raw_path) if raw_path is not None else Path(__file__).resolve().parent.parent.parent / "data" / "providers.json"
     api_key = getattr(settings, "elevenlabs_api_key", None) or ""
     agent_id = getattr(settings, "elevenlabs_agent_id", None) or ""
+    tracer = Tracer(task_id) if getattr(settings, "tracing_enabled", True) else None
+    if tracer is not None:
+        state.trace = tracer.spans
+    on_outcome = _outcome_publisher(state)
+    async_runner = bool(getattr(settings, "async_runner_enabled", False))
+    max_holds = int(getattr(settings, "shortlist_max_holds", 5))
+    session = profiling.get_profiler().begin(f"task {task_id}") if profile and profiling.is_profiling_enabled() else None
     try:
-        state.status = TaskStatus.RUNNING
-        if state.mode == TaskMode.SWARM:
-            outcomes, shortlist, tool_logs = await run_swarm(
-                providers_path=path,
-                user_request=state.user_request,
-                task_id=task_id,
-                api_key=api_key,
-                agent_id=agent_id,
-                max_agents=getattr(settings, "swarm_max_agents", 15),
-            )
-            state.outcomes = outcomes
-            state.shortlist = shortlist
-            state.tool_calls_log = tool_logs
-        else:
-            providers = __import__("core.providers_loader", fromlist=["load_providers"]).load_providers(path)
-            provider_id = providers[0].id if providers else ""
-            if not provider_id:
-                state.status = TaskStatus.FAILED
-                state.error_message = "No providers configured"
-                return
-            outcome, shortlist, tool_logs, transcript = run_single_agent(
-                provider_id=provider_id,
-                providers_path=path,
-                user_request=state.user_request,
-                task_id=task_id,
-                api_key=api_key,
-                agent_id=agent_id,
-            )
-            state.outcomes = [outcome]
-            state.shortlist = shortlist
-            state.tool_calls_log = tool_logs
-            state.transcript = transcript
-        state.status = TaskStatus.COMPLETED
+        with profiling.activate(session), (
+            tracer.span("task", "task", task_id=task_id, mode=state.mode.value) if tracer else nullcontext()
+        ):
+            state.status = TaskStatus.RUNNING
+            if state.mode in (TaskMode.SWARM, TaskMode.FIRST_ACCEPTABLE):
+                swarm_kwargs = dict(
+                    providers_path=path,
+                    user_request=state.user_request,
+                    task_id=task_id,
+                    api_key=api_key,
+                    agent_id=agent_id,
+                    max_agents=getattr(settings, "swarm_max_agents", 15),
+                    on_outcome=on_outcome,
+                    async_runner=async_runner,
+                    max_concurrent_calls=getattr(settings, "swarm_max_concurrent_calls", None),
+                    on_hedge=state.hedge_decisions.append,
+                )
+                if state.mode == TaskMode.FIRST_ACCEPTABLE:
+                    outcomes, shortlist, tool_logs, found = await run_first_acceptable(**swarm_kwargs)
+                    if found:
+                        state.time_to_result_seconds = round((datetime.utcnow() - state.created_at).total_seconds(), 3)
+                else:
+                    outcomes, shortlist, tool_logs = await run_swarm(**swarm_kwargs)
+                state.outcomes = outcomes
+                state.shortlist = _hold_shortlist(task_id, shortlist, max_holds)
+                state.tool_calls_log = tool_logs
+            else:
+                providers, _ = __import__("core.providers_loader", fromlist=["query_providers"]).query_providers(path, limit=1)
+                provider_id = providers[0].id if providers else ""
+                if not provider_id:
+                    state.status = TaskStatus.FAILED
+                    state.error_message = "No providers configured"
+                    return
+                single_kwargs = dict(
+                    provider_id=provider_id,
+                    providers_path=path,
+                    user_request=state.user_request,
+                    task_id=task_id,
+                    api_key=api_key,
+                    agent_id=agent_id,
+                    on_outcome=on_outcome,
+                )
+                if async_runner:
+                    outcome, shortlist, tool_logs, transcript = await run_single_agent_async(**single_kwargs)
+                else:
+                    outcome, shortlist, tool_logs, transcript = await asyncio.get_running_loop().run_in_executor(
+                        get_executor(CONVERSATIONS), bind(lambda: run_single_agent(**single_kwargs))
+                    )
+                state.outcomes = [outcome]
+                state.shortlist = _hold_shortlist(task_id, shortlist, max_holds)
+                state.tool_calls_log = tool_logs
+                state.transcript = transcript
+            state.status = TaskStatus.COMPLETED
     except Exception as e:
         state.status = TaskStatus.FAILED
         state.error_message = str(e)
+        get_ledger().release_holds(task_id)
     finally:
-        from datetime import datetime
+        if session is not None:
+            state.profile_id = (await profiling.get_profiler().end_async(session))["id"]
+        get_live_sessions().close_task(task_id)
         state.updated_at = datetime.utcnow()
+        archive_task(state)
 
 
 @router.post("/", response_model=TaskCreateResponse)
@@ -79,18 +160,27 @@ async def create_task(request: Request, body: TaskCreate) -> TaskCreateResponse:
         mode=body.user_request.mode,
         user_request=body.user_request,
     )
-    async with _tasks_lock:
-        _tasks[task_id] = state
     settings = getattr(request.app.state, "settings", None)
     if not settings:
         raise HTTPException(status_code=500, detail="App settings not available")
 
-    asyncio.create_task(_run_task(task_id, state, settings))
-    return TaskCreateResponse(
-        task_id=task_id,
-        status=state.status.value,
-        message="Task started. Poll GET /tasks/{task_id} for status and results.",
-    )
+    try:
+        get_scheduler().submit(state, lambda: _run_task(task_id, state, settings, profile=body.profile), tier=body.tier)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except QueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Task queue is full; retry later.",
+            headers={"Retry-After": str(int(e.retry_after + 0.999))},
+        )
+    async with _tasks_lock:
+        _tasks[task_id] = state
+    if state.queue_position is not None:
+        message = f"Task queued at position {state.queue_position}. Poll GET /tasks/{{task_id}} for status and results."
+    else:
+        message = "Task started. Poll GET /tasks/{task_id} for status and results."
+    return TaskCreateResponse(task_id=task_id, status=state.status.value, message=message)
 
 
 @router.get("/{task_id}")
@@ -102,6 +192,52 @@ async def get_task(request: Request, task_id: str) -> TaskState:
     return state
 
 
+def _task_event(state: TaskState) -> dict[str, Any]:
+    return {
+        "task_id": state.task_id,
+        "status": state.status.value,
+        "outcomes": len(state.outcomes),
+        "shortlist": len(state.shortlist),
+        "queue_position": state.queue_position,
+        "estimated_start_at": state.estimated_start_at.isoformat() if state.estimated_start_at else None,
+        "error_message": state.error_message,
+        "updated_at": state.updated_at.isoformat(),
+    }
+
+
+@router.get("/{task_id}/stream")
+async def stream_task(task_id: str, timeout_seconds: float = 300.0) -> StreamingResponse:
+    """Server-sent events: one `data:` line per change in task progress, closed once the task finishes."""
+    async with _tasks_lock:
+        state = _tasks.get(task_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    async def events() -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max(1.0, timeout_seconds)
+        last: Any = None
+        while True:
+            current = _task_event(state)
+            if current != last:
+                last = current
+                yield f"data: {json.dumps(current)}\n\n"
+            if state.status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED) or loop.time() >= deadline:
+                return
+            await asyncio.sleep(0.1)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.get("/{task_id}/trace")
+async def get_task_trace(task_id: str) -> dict[str, Any]:
+    async with _tasks_lock:
+        state = _tasks.get(task_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return to_chrome_trace(list(state.trace), trace_id=task_id)
+
+
 @router.get("/")
 async def list_tasks() -> dict[str, list[dict]]:
     async with _tasks_lock:
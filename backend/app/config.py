@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -18,14 +19,90 @@ class Settings(BaseSettings):
     elevenlabs_agent_id: Optional[str] = os.getenv("ELEVENLABS_AGENT_ID")
     elevenlabs_receptionist_agent_id: Optional[str] = None
     elevenlabs_agent_phone_number_id: Optional[str] = None
+    elevenlabs_api_base_url: str = "https://api.elevenlabs.io"
 
     providers_json_path: Path = Path(__file__).resolve().parent.parent / "data" / "providers.json"
 
     swarm_max_agents: int = 15
+    swarm_max_concurrent_calls: int = 1000
+    swarm_hedge_budget: int = 0
+    swarm_hedge_percentile: float = 0.9
+    swarm_hedge_min_delay_seconds: float = 10.0
+    swarm_hedge_default_delay_seconds: float = 60.0
+    swarm_target_outcomes: int = 0
+    shortlist_max_holds: int = 5
+
+    conversation_backend: str = "elevenlabs"
+    offline_response_delay_seconds: float = 0.05
+    async_runner_enabled: bool = False
+
+    session_pool_enabled: bool = False
+    session_pool_min_idle: int = 2
+    session_pool_max_idle_seconds: float = 60.0
+    session_pool_max_uses: int = 4
+    session_pool_key_ttl_seconds: float = 600.0
+
+    booking_hold_seconds: float = 300.0
+    booking_lock_stripes: int = 64
+
+    calendar_write_batch_size: int = 50
+    calendar_write_linger_seconds: float = 0.05
+    calendar_write_max_attempts: int = 5
+    calendar_write_backoff_seconds: float = 1.0
+    freebusy_cache_ttl_seconds: float = 30.0
+
+    integration_timeout_seconds: float = 10.0
+    integration_http_max_connections: int = 100
+
+    executor_conversations_max_workers: int = 64
+    executor_tools_max_workers: int = 16
+    executor_integrations_max_workers: int = 16
+
+    task_max_running: int = 16
+    task_queue_max_length: int = 500
+    task_mode_weights: dict[str, float] = {"single": 4.0, "first_acceptable": 2.0, "swarm": 1.0}
+    task_tier_weights: dict[str, float] = {"standard": 1.0, "priority": 4.0}
+
+    turn_timeout_seconds: float = 30.0
+    turn_timeout_min_seconds: float = 5.0
+    provider_stats_enabled: bool = True
+    provider_stats_path: Optional[Path] = None
+    provider_stats_alpha: float = 0.3
+    provider_stats_min_calls: int = 3
+    provider_stats_skip_timeout_rate: float = 0.8
+    provider_stats_skip_cooldown_seconds: float = 3600.0
+    provider_stats_candidate_factor: int = 3
+
+    archive_dir: Optional[Path] = None
+    archive_max_queue: int = 1000
+    recording_dir: Optional[Path] = None
+
+    slot_index_enabled: bool = True
+    slot_index_bucket_minutes: int = 15
+    slot_index_horizon_days: int = 14
+
+    tracing_enabled: bool = True
+
+    profiler_enabled: bool = True
+    profiler_dir: Optional[Path] = None
+    profiler_interval_ms: float = 5.0
+    profiler_max_seconds: float = 120.0
+    profiler_max_concurrent: int = 2
+    profiler_max_per_hour: int = 12
+
+    warmup_enabled: bool = True
+    warmup_steps: list[str] = ["providers", "provider_index", "slot_index", "sdk_imports", "calendar_service", "connections", "synthetic_tool_call"]
 
     twilio_account_sid: Optional[str] = None
     twilio_auth_token: Optional[str] = None
     twilio_phone_number: Optional[str] = None
+    twilio_api_base_url: str = "https://api.twilio.com"
+    twilio_twiml_url: Optional[str] = None
+
+    outbound_backend: str = "elevenlabs"
+    outbound_calls_per_second: float = 5.0
+    outbound_max_concurrent: int = 50
+    outbound_request_timeout_seconds: float = 15.0
 
     simulation_call_recipient: Optional[str] = None
 
@@ -36,5 +113,6 @@ class Settings(BaseSettings):
     google_maps_api_key: Optional[str] = None
 
 
+@lru_cache
 def get_settings() -> Settings:
     return Settings()
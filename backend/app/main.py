@@ -1,12 +1,23 @@
+import asyncio
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.config import get_settings
-from api.routes import agent_tools, appointments, messages, tasks
+from app.warmup import run_warmup
+from agents.session_pool import close_session_pool
+from core.archive import close_archive, open_archive
+from core.executors import close_executors
+from core.profiling import ProfileRequestsMiddleware
+from core.provider_stats import close_provider_stats
+from integrations.calendar_writer import close_calendar_writer
+from integrations.http import close_async_client
+from telephony.dialer import close_dialer
+from api.routes import admin, agent_tools, appointments, calls, messages, providers, slots, tasks
 
 
 @asynccontextmanager
@@ -16,7 +27,30 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     prov_path = getattr(settings, "providers_json_path", None)
     prov_path = Path(prov_path) if prov_path is not None else Path(__file__).resolve().parent.parent / "data" / "providers.json"
     prov_path.parent.mkdir(parents=True, exist_ok=True)
+    app.state.ready = False
+    app.state.warmup = None
+    # Tasks archive from the event loop; the archive's files, schema and writer thread are set up here instead.
+    await asyncio.get_running_loop().run_in_executor(None, open_archive)
+
+    async def _warm() -> None:
+        app.state.warmup = await run_warmup(settings)
+        app.state.ready = True
+
+    warmup_task = None
+    if getattr(settings, "warmup_enabled", True):
+        warmup_task = asyncio.create_task(_warm())
+    else:
+        app.state.ready = True
     yield
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    await close_dialer()
+    await close_calendar_writer()
+    await close_async_client()
+    await asyncio.get_running_loop().run_in_executor(None, close_session_pool)
+    await asyncio.get_running_loop().run_in_executor(None, close_archive)
+    close_executors()
+    close_provider_stats()
 
 
 app = FastAPI(
@@ -26,6 +60,7 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.add_middleware(ProfileRequestsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -37,9 +72,23 @@ app.add_middleware(
 app.include_router(tasks.router, prefix="/api/v1/tasks", tags=["tasks"])
 app.include_router(messages.router, prefix="/api/v1/messages", tags=["messages"])
 app.include_router(appointments.router, prefix="/api/v1/appointments", tags=["appointments"])
+app.include_router(providers.router, prefix="/api/v1/providers", tags=["providers"])
+app.include_router(slots.router, prefix="/api/v1/slots", tags=["slots"])
+app.include_router(calls.router, prefix="/api/v1/calls", tags=["calls"])
 app.include_router(agent_tools.router, prefix="/api/v1/agent-tools", tags=["agent-tools"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["admin"])
 
 
 @app.get("/health")
 async def health() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready(request: Request) -> JSONResponse:
+    is_ready = bool(getattr(request.app.state, "ready", False))
+    body: dict[str, Any] = {
+        "status": "ready" if is_ready else "warming",
+        "warmup": getattr(request.app.state, "warmup", None),
+    }
+    return JSONResponse(status_code=200 if is_ready else 503, content=body)
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+from core.executors import INTEGRATIONS, run_in
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STEPS = ("providers", "provider_index", "slot_index", "sdk_imports", "calendar_service", "connections", "synthetic_tool_call")
+
+
+def _providers_path(settings: Any) -> Path:
+    raw = getattr(settings, "providers_json_path", None)
+    return Path(raw) if raw is not None else Path(__file__).resolve().parent.parent / "data" / "providers.json"
+
+
+def _warm_providers(settings: Any) -> dict[str, Any]:
+    from core.providers_loader import get_providers_by_id, is_catalog, load_providers, query_providers
+    path = _providers_path(settings)
+    if is_catalog(path):
+        # Opens (or imports) the catalog without materializing it.
+        _, total = query_providers(path, limit=1)
+        return {"providers": total, "catalog": True}
+    providers = load_providers(path)
+    get_providers_by_id(path)
+    return {"providers": len(providers)}
+
+
+def _warm_provider_index(settings: Any) -> dict[str, Any]:
+    from core.provider_index import get_provider_index
+    index = get_provider_index(_providers_path(settings))
+    index.ensure_built()
+    return {"providers": index.size, "build_ms": index.build_ms}
+
+
+def _warm_slot_index(settings: Any) -> dict[str, Any]:
+    from core.slot_index import get_slot_index, is_slot_index_enabled
+    if not is_slot_index_enabled():
+        return {"skipped": "Slot index disabled"}
+    index = get_slot_index(_providers_path(settings))
+    index.ensure_built()
+    return index.stats()
+
+
+def _warm_sdk_imports(settings: Any) -> dict[str, Any]:
+    loaded: list[str] = []
+    try:
+        from agents.factory import _get_conversation, _get_elevenlabs
+        _get_elevenlabs()
+        _get_conversation()
+        loaded.append("elevenlabs")
+    except ImportError:
+        pass
+    try:
+        import googleapiclient.discovery  # noqa: F401
+        import google.oauth2.service_account  # noqa: F401
+        loaded.append("googleapiclient")
+    except ImportError:
+        pass
+    try:
+        import httpx  # noqa: F401
+        loaded.append("httpx")
+    except ImportError:
+        pass
+    return {"loaded": loaded}
+
+
+def _warm_calendar_service(settings: Any) -> dict[str, Any]:
+    from integrations.google_calendar import _get_service, is_google_calendar_configured
+    if not is_google_calendar_configured():
+        return {"skipped": "Google Calendar not configured"}
+    return {"built": _get_service() is not None}
+
+
+async def _warm_connections(settings: Any) -> dict[str, Any]:
+    """
+    Open pooled connections for the clients calls and tool webhooks actually use:
+    the shared integrations client (Places, Distance Matrix, Calendar REST), the
+    outbound dialer, and the per-key ElevenLabs SDK client the runner builds sessions on.
+    """
+    from agents.session_pool import get_client
+    from integrations.elevenlabs_phone import is_outbound_configured
+    from integrations.google_calendar import CALENDAR_API_URL, is_google_calendar_configured
+    from integrations.google_maps_distance import DISTANCE_MATRIX_URL, is_google_maps_configured
+    from integrations.google_places import is_google_places_configured
+    from integrations.http import get_async_client
+    from telephony.dialer import get_dialer
+
+    targets: list[tuple[str, Any, str]] = []
+    shared = get_async_client()
+    if is_google_places_configured():
+        targets.append(("places", shared, "https://places.googleapis.com/"))
+    if is_google_maps_configured():
+        targets.append(("distance_matrix", shared, DISTANCE_MATRIX_URL))
+    if is_google_calendar_configured():
+        targets.append(("calendar", shared, CALENDAR_API_URL))
+    if is_outbound_configured():
+        base_url = (getattr(settings, "elevenlabs_api_base_url", None) or "https://api.elevenlabs.io").rstrip("/")
+        targets.append(("dialer", get_dialer().client, base_url + "/"))
+
+    async def prime(client: Any, url: str) -> dict[str, Any]:
+        try:
+            # Any response will do: the point is a resolved host and an established TLS connection in the pool.
+            resp = await client.get(url, timeout=5.0)
+            return {"url": url, "status_code": resp.status_code}
+        except Exception as e:
+            return {"url": url, "error": str(e)}
+
+    report: dict[str, Any] = dict(zip(
+        (name for name, _, _ in targets),
+        await asyncio.gather(*(prime(client, url) for _, client, url in targets)),
+    ))
+    api_key = getattr(settings, "elevenlabs_api_key", None)
+    if api_key:
+        try:
+            await run_in(INTEGRATIONS, get_client, api_key)
+            report["elevenlabs_client"] = {"built": True}
+        except ImportError as e:
+            report["elevenlabs_client"] = {"built": False, "error": str(e)}
+    return report or {"skipped": "No integrations configured"}
+
+
+def _warm_synthetic_tool_call(settings: Any) -> dict[str, Any]:
+    from core.providers_loader import query_providers
+    from tools.registry import build_tool_registry
+    path = _providers_path(settings)
+    providers, _ = query_providers(path, limit=1)
+    if not providers:
+        return {"skipped": "No providers configured"}
+    registry = build_tool_registry(path)
+    pid = providers[0].id
+    lookup = registry["provider_lookup"]({"provider_id": pid})
+    check = registry["validate_slot"]({"provider_id": pid, "slot_iso": datetime.utcnow().replace(microsecond=0).isoformat()})
+    return {"provider_lookup_ok": lookup.get("ok"), "validate_slot_ok": check.get("ok")}
+
+
+def _warm_session_pool(settings: Any) -> dict[str, Any]:
+    from agents.session_pool import get_session_pool, is_session_pool_enabled
+    if not is_session_pool_enabled():
+        return {"skipped": "Session pool disabled"}
+    agent_id = getattr(settings, "elevenlabs_agent_id", None)
+    if not agent_id:
+        return {"skipped": "No ElevenLabs agent configured"}
+    api_key = getattr(settings, "elevenlabs_api_key", None)
+    receptionist_id = getattr(settings, "elevenlabs_receptionist_agent_id", None) or agent_id
+    pool = get_session_pool()
+    pool.prewarm(agent_id, api_key, with_tools=True)
+    pool.prewarm(receptionist_id, api_key, with_tools=False)
+    return pool.stats()
+
+
+_STEPS: dict[str, Callable[[Any], Any]] = {
+    "providers": _warm_providers,
+    "provider_index": _warm_provider_index,
+    "slot_index": _warm_slot_index,
+    "sdk_imports": _warm_sdk_imports,
+    "calendar_service": _warm_calendar_service,
+    "connections": _warm_connections,
+    "synthetic_tool_call": _warm_synthetic_tool_call,
+    "session_pool": _warm_session_pool,
+}
+
+
+async def run_warmup(settings: Any) -> dict[str, Any]:
+    """
+    Run the configured warm-up steps in order. Blocking steps go to the
+    integrations executor so the event loop keeps serving /health while warming.
+    """
+    steps = [s.strip() for s in (getattr(settings, "warmup_steps", None) or DEFAULT_STEPS) if s.strip()]
+    report: dict[str, Any] = {"steps": [], "ok": True}
+    started = time.perf_counter()
+    for name in steps:
+        fn = _STEPS.get(name)
+        if fn is None:
+            logger.warning("Unknown warm-up step %r; skipping", name)
+            continue
+        t0 = time.perf_counter()
+        entry: dict[str, Any] = {"step": name}
+        try:
+            if asyncio.iscoroutinefunction(fn):
+                result: Any = await fn(settings)
+            else:
+                result = await run_in(INTEGRATIONS, fn, settings)
+            entry.update({"ok": True, "result": result})
+        except Exception as e:
+            logger.warning("Warm-up step %s failed: %s", name, e)
+            entry.update({"ok": False, "error": str(e)})
+            report["ok"] = False
+        entry["duration_ms"] = round((time.perf_counter() - t0) * 1000.0, 2)
+        logger.info("Warm-up step %s finished in %.1f ms", name, entry["duration_ms"])
+        report["steps"].append(entry)
+    report["duration_ms"] = round((time.perf_counter() - started) * 1000.0, 2)
+    logger.info("Warm-up finished in %.1f ms", report["duration_ms"])
+    return report
+
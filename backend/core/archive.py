@@ -0,0 +1,322 @@
+"""
+Append-only archive of call transcripts and tool calls, with an on-disk inverted index.
+
+Finished tasks are handed to `archive_task`, which only enqueues a snapshot; a
+single writer thread turns it into documents (one per transcript turn or tool
+call), appends them as JSON lines to a daily segment file and then indexes the
+new lines into `index.sqlite`. The segments are the source of truth: the
+index records how far into each segment it has read, so after a crash the
+writer catches up from there on start. Postings map terms to documents; terms
+are lowercased word tokens plus `provider:<id>`, `tool:<name>` and
+`error:<token>`, so a search is an intersection of posting lists.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from app.config import get_settings
+from core.schemas import TaskState
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9_'-]*")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    task_id TEXT NOT NULL,
+    provider_id TEXT,
+    seq INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    role TEXT,
+    tool TEXT,
+    error TEXT,
+    text TEXT NOT NULL,
+    archived_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_docs_conversation ON docs (task_id, provider_id, seq);
+CREATE TABLE IF NOT EXISTS postings (term TEXT NOT NULL, doc_id INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS idx_postings_term ON postings (term, doc_id);
+CREATE TABLE IF NOT EXISTS segments (name TEXT PRIMARY KEY, offset INTEGER NOT NULL);
+"""
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+def _terms(doc: dict[str, Any]) -> set[str]:
+    terms = set(tokenize(doc["text"]))
+    if doc.get("provider_id"):
+        terms.add(f"provider:{doc['provider_id']}")
+    if doc.get("tool"):
+        terms.add(f"tool:{doc['tool']}")
+    for token in tokenize(doc.get("error") or ""):
+        terms.add(f"error:{token}")
+    return terms
+
+
+def _tool_provider(entry: dict[str, Any]) -> Optional[str]:
+    for part in (entry.get("params"), entry.get("result")):
+        if isinstance(part, dict) and part.get("provider_id"):
+            return str(part["provider_id"])
+    return None
+
+
+def task_documents(snapshot: dict[str, Any]) -> list[dict[str, Any]]:
+    """Archive documents for one task: every transcript turn, then every tool call, numbered per call."""
+    task_id = snapshot["task_id"]
+    archived_at = snapshot["archived_at"]
+    docs: list[dict[str, Any]] = []
+
+    def add(provider_id: Optional[str], seq: int, **fields: Any) -> None:
+        docs.append({"task_id": task_id, "provider_id": provider_id, "seq": seq, "archived_at": archived_at, **fields})
+
+    conversations = snapshot["conversations"]
+    for provider_id, turns in conversations:
+        for seq, turn in enumerate(turns):
+            add(provider_id, seq, kind="turn", role=turn["role"], tool=None, error=None, text=turn["text"])
+    counters: dict[Optional[str], int] = {}
+    for entry in snapshot["tool_calls"]:
+        tool = entry.get("tool") or entry.get("tool_name")
+        result = entry.get("result") if isinstance(entry.get("result"), dict) else {}
+        provider_id = _tool_provider(entry)
+        seq = counters.get(provider_id, 0)
+        counters[provider_id] = seq + 1
+        text = json.dumps({"params": entry.get("params"), "result": entry.get("result")}, default=str)
+        error = str(result["error"]) if result.get("error") else None
+        add(provider_id, seq, kind="tool", role=None, tool=tool, error=error, text=text)
+    return docs
+
+
+def snapshot_task(state: TaskState) -> dict[str, Any]:
+    """A plain copy of what the archive needs, taken on the caller's side so the task can move on."""
+    outcomes = list(state.outcomes)
+    conversations = [(o.provider_id, [t.model_dump() for t in o.transcript]) for o in outcomes if o.transcript]
+    if not conversations and state.transcript:
+        provider_id = outcomes[0].provider_id if len(outcomes) == 1 else None
+        conversations.append((provider_id, [t.model_dump() for t in state.transcript]))
+    return {
+        "task_id": state.task_id,
+        "archived_at": datetime.utcnow().isoformat(),
+        "conversations": conversations,
+        "tool_calls": [dict(e) for e in list(state.tool_calls_log) if isinstance(e, dict)],
+    }
+
+
+class TranscriptArchive:
+    def __init__(self, root: Path, max_queue: int = 1000) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / "index.sqlite"
+        self._queue: queue.Queue[Optional[dict[str, Any]]] = queue.Queue(maxsize=max_queue)
+        self.stats = {"enqueued": 0, "dropped": 0, "archived_tasks": 0, "indexed_docs": 0}
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.commit()
+        conn.close()
+        self._thread = threading.Thread(target=self._run, name="transcript-archive", daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.index_path, timeout=30.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def submit(self, snapshot: dict[str, Any]) -> bool:
+        """Queue a task snapshot; never blocks. False (and counted as dropped) when the queue is full."""
+        try:
+            self._queue.put_nowait(snapshot)
+        except queue.Full:
+            self.stats["dropped"] += 1
+            logger.warning("Transcript archive queue full; dropping task %s", snapshot.get("task_id"))
+            return False
+        self.stats["enqueued"] += 1
+        return True
+
+    def _segment(self, when: str) -> Path:
+        return self.root / f"archive-{when[:10]}.jsonl"
+
+    def _run(self) -> None:
+        conn = self._connect()
+        try:
+            self._catch_up(conn)
+            while True:
+                snapshot = self._queue.get()
+                if snapshot is None:
+                    return
+                try:
+                    self._archive(conn, snapshot)
+                except Exception:
+                    logger.exception("Could not archive task %s", snapshot.get("task_id"))
+        finally:
+            conn.close()
+
+    def _archive(self, conn: sqlite3.Connection, snapshot: dict[str, Any]) -> None:
+        docs = task_documents(snapshot)
+        if not docs:
+            return
+        segment = self._segment(snapshot["archived_at"])
+        with segment.open("a", encoding="utf-8") as f:
+            for doc in docs:
+                f.write(json.dumps(doc, default=str) + "\n")
+        self._index_segment(conn, segment)
+        self.stats["archived_tasks"] += 1
+
+    def _catch_up(self, conn: sqlite3.Connection) -> None:
+        for segment in sorted(self.root.glob("archive-*.jsonl")):
+            self._index_segment(conn, segment)
+
+    def _index_segment(self, conn: sqlite3.Connection, segment: Path) -> None:
+        """Index the lines appended to `segment` since the last pass."""
+        row = conn.execute("SELECT offset FROM segments WHERE name = ?", (segment.name,)).fetchone()
+        offset = row[0] if row else 0
+        indexed = 0
+        with segment.open("rb") as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # a partly written line; picked up on the next pass
+                offset += len(raw)
+                try:
+                    doc = json.loads(raw)
+                except ValueError:
+                    continue
+                cur = conn.execute(
+                    "INSERT INTO docs (task_id, provider_id, seq, kind, role, tool, error, text, archived_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (doc["task_id"], doc.get("provider_id"), doc["seq"], doc["kind"], doc.get("role"),
+                     doc.get("tool"), doc.get("error"), doc["text"], doc["archived_at"]),
+                )
+                conn.executemany(
+                    "INSERT INTO postings (term, doc_id) VALUES (?, ?)",
+                    [(term, cur.lastrowid) for term in _terms(doc)],
+                )
+                indexed += 1
+        conn.execute(
+            "INSERT INTO segments (name, offset) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET offset = excluded.offset",
+            (segment.name, offset),
+        )
+        conn.commit()
+        self.stats["indexed_docs"] += indexed
+
+    def search(
+        self,
+        text: Optional[str] = None,
+        provider_id: Optional[str] = None,
+        tool: Optional[str] = None,
+        error: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        context: int = 2,
+        limit: int = 50,
+    ) -> list[dict[str, Any]]:
+        """
+        Documents containing every query term, newest first, each with up to
+        `context` neighbouring documents of the same kind from the same call.
+        """
+        terms = set(tokenize(text or ""))
+        if provider_id:
+            terms.add(f"provider:{provider_id}")
+        if tool:
+            terms.add(f"tool:{tool}")
+        terms.update(f"error:{t}" for t in tokenize(error or ""))
+        if not terms:
+            raise ValueError("Give at least one of q, provider_id, tool or error")
+        conn = self._connect()
+        try:
+            clauses = " INTERSECT ".join("SELECT doc_id FROM postings WHERE term = ?" for _ in terms)
+            sql = f"SELECT {_DOC_COLUMNS} FROM docs WHERE id IN ({clauses})"
+            args: list[Any] = list(terms)
+            if since is not None:
+                sql += " AND archived_at >= ?"
+                args.append(since.isoformat())
+            if until is not None:
+                sql += " AND archived_at < ?"
+                args.append(until.isoformat())
+            sql += " ORDER BY id DESC LIMIT ?"
+            args.append(int(limit))
+            hits = [_doc(row) for row in conn.execute(sql, args)]
+            for hit in hits:
+                hit["context"] = [
+                    _doc(row) for row in conn.execute(
+                        f"SELECT {_DOC_COLUMNS} FROM docs WHERE task_id = ? AND provider_id IS ? AND kind = ?"
+                        " AND seq BETWEEN ? AND ? AND id != ? ORDER BY seq",
+                        (hit["task_id"], hit["provider_id"], hit["kind"], hit["seq"] - context, hit["seq"] + context, hit["id"]),
+                    )
+                ] if context > 0 else []
+            return hits
+        finally:
+            conn.close()
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Archive what is queued, then stop the writer."""
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            logger.warning("Transcript archive queue still full at shutdown")
+            return
+        self._thread.join(timeout)
+
+
+_DOC_COLUMNS = "id, task_id, provider_id, seq, kind, role, tool, error, text, archived_at"
+
+
+def _doc(row: Iterable[Any]) -> dict[str, Any]:
+    return dict(zip(("id", "task_id", "provider_id", "seq", "kind", "role", "tool", "error", "text", "archived_at"), row))
+
+
+_archive: Optional[TranscriptArchive] = None
+_archive_lock = threading.Lock()
+
+
+def get_archive(create: bool = True) -> Optional[TranscriptArchive]:
+    """
+    The process-wide archive, or None when ARCHIVE_DIR is not set. Creating it
+    blocks (directory, sqlite schema, writer thread); event-loop callers pass
+    `create=False` and rely on `open_archive` having run at startup.
+    """
+    global _archive
+    if _archive is None and create:
+        root = getattr(get_settings(), "archive_dir", None)
+        if not root:
+            return None
+        with _archive_lock:
+            if _archive is None:
+                _archive = TranscriptArchive(Path(root), max_queue=int(getattr(get_settings(), "archive_max_queue", 1000)))
+    return _archive
+
+
+def open_archive() -> Optional[TranscriptArchive]:
+    """Create the archive at startup; an unusable ARCHIVE_DIR is logged and leaves archiving off."""
+    try:
+        return get_archive()
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("Transcript archive disabled: could not open %s: %s", getattr(get_settings(), "archive_dir", None), e)
+        return None
+
+
+def archive_task(state: TaskState) -> None:
+    """Queue a finished task for the writer; never raises, since the task is over either way."""
+    archive = get_archive(create=False)
+    if archive is None:
+        return
+    try:
+        archive.submit(snapshot_task(state))
+    except Exception:
+        logger.exception("Could not queue task %s for the archive", state.task_id)
+
+
+def close_archive() -> None:
+    global _archive
+    if _archive is not None:
+        _archive.close()
+        _archive = None
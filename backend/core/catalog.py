@@ -0,0 +1,300 @@
+"""
+SQLite-backed provider catalog for registries too large to hold as pydantic models.
+
+Rows are read on demand as compact ProviderRecord objects and only turned into a
+Provider when a caller needs one. Filtering, sorting and paging run in SQL over
+indexes on id, rating and region. Catalogs are built by streaming a JSONL file
+(one provider object per line) through `import_providers`.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from core.schemas import AvailabilityProfile, Provider
+
+CATALOG_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+SORT_COLUMNS = ("rating", "distance_km", "name", "id")
+# Bumped whenever the table layout changes; catalogs built with another version are re-imported.
+SCHEMA_VERSION = "2"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS providers (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    rating REAL NOT NULL,
+    distance_km REAL NOT NULL,
+    region TEXT,
+    receptionist_style TEXT NOT NULL,
+    address TEXT,
+    phone_number TEXT,
+    calendar_id TEXT,
+    availability_profile TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_providers_rating ON providers (rating);
+CREATE INDEX IF NOT EXISTS idx_providers_region_rating ON providers (region, rating);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+_COLUMNS = (
+    "id, name, rating, distance_km, region, receptionist_style, address, phone_number, calendar_id, availability_profile"
+)
+
+
+class ProviderRecord:
+    """One catalog row. The availability profile stays as JSON until `to_provider`."""
+
+    __slots__ = (
+        "id",
+        "name",
+        "rating",
+        "distance_km",
+        "region",
+        "receptionist_style",
+        "address",
+        "phone_number",
+        "calendar_id",
+        "availability_json",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        rating: float,
+        distance_km: float,
+        region: Optional[str] = None,
+        receptionist_style: str = "professional",
+        address: Optional[str] = None,
+        phone_number: Optional[str] = None,
+        calendar_id: Optional[str] = None,
+        availability_json: Optional[str] = None,
+    ) -> None:
+        self.id = id
+        self.name = name
+        self.rating = rating
+        self.distance_km = distance_km
+        self.region = region
+        self.receptionist_style = receptionist_style
+        self.address = address
+        self.phone_number = phone_number
+        self.calendar_id = calendar_id
+        self.availability_json = availability_json
+
+    @classmethod
+    def from_provider(cls, p: Provider) -> ProviderRecord:
+        return cls(
+            p.id,
+            p.name,
+            p.rating,
+            p.distance_km,
+            p.region,
+            p.receptionist_style,
+            p.address,
+            p.phone_number,
+            p.calendar_id,
+            p.availability_profile.model_dump_json(),
+        )
+
+    def to_provider(self) -> Provider:
+        profile = (
+            AvailabilityProfile(**json.loads(self.availability_json))
+            if self.availability_json
+            else AvailabilityProfile()
+        )
+        return Provider(
+            id=self.id,
+            name=self.name,
+            rating=self.rating,
+            distance_km=self.distance_km,
+            region=self.region,
+            receptionist_style=self.receptionist_style,
+            address=self.address,
+            phone_number=self.phone_number,
+            calendar_id=self.calendar_id,
+            availability_profile=profile,
+        )
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "provider_id": self.id,
+            "name": self.name,
+            "rating": self.rating,
+            "distance_km": self.distance_km,
+            "region": self.region,
+        }
+
+
+def filter_clause(
+    min_rating: Optional[float] = None,
+    region: Optional[str] = None,
+    max_distance_km: Optional[float] = None,
+) -> tuple[str, list[Any]]:
+    clauses: list[str] = []
+    args: list[Any] = []
+    if min_rating is not None:
+        clauses.append("rating >= ?")
+        args.append(float(min_rating))
+    if region:
+        clauses.append("region = ?")
+        args.append(region)
+    if max_distance_km is not None:
+        clauses.append("distance_km <= ?")
+        args.append(float(max_distance_km))
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+
+class ProviderCatalog:
+    """Read-only view over a catalog database. Safe to share across threads."""
+
+    def __init__(self, db_path: Path, cache_size: int = 4096) -> None:
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._cache: OrderedDict[str, Optional[Provider]] = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def get_record(self, provider_id: str) -> Optional[ProviderRecord]:
+        row = self._conn().execute(f"SELECT {_COLUMNS} FROM providers WHERE id = ?", (provider_id,)).fetchone()
+        return ProviderRecord(*row) if row else None
+
+    def get(self, provider_id: str) -> Optional[Provider]:
+        with self._cache_lock:
+            if provider_id in self._cache:
+                self._cache.move_to_end(provider_id)
+                return self._cache[provider_id]
+        record = self.get_record(provider_id)
+        provider = record.to_provider() if record else None
+        with self._cache_lock:
+            self._cache[provider_id] = provider
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return provider
+
+    def count(
+        self,
+        min_rating: Optional[float] = None,
+        region: Optional[str] = None,
+        max_distance_km: Optional[float] = None,
+    ) -> int:
+        where, args = filter_clause(min_rating, region, max_distance_km)
+        return self._conn().execute(f"SELECT COUNT(*) FROM providers{where}", args).fetchone()[0]
+
+    def query(
+        self,
+        min_rating: Optional[float] = None,
+        region: Optional[str] = None,
+        max_distance_km: Optional[float] = None,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> list[ProviderRecord]:
+        """Matching rows, in import order unless `sort_by` names a column in SORT_COLUMNS."""
+        where, args = filter_clause(min_rating, region, max_distance_km)
+        order = "rowid"
+        if sort_by in SORT_COLUMNS:
+            order = f"{sort_by} {'DESC' if descending else 'ASC'}, rowid"
+        sql = f"SELECT {_COLUMNS} FROM providers{where} ORDER BY {order} LIMIT ? OFFSET ?"
+        rows = self._conn().execute(sql, [*args, -1 if limit is None else int(limit), max(0, int(offset))])
+        return [ProviderRecord(*row) for row in rows]
+
+    def iter_records(self, batch_size: int = 1000) -> Iterator[ProviderRecord]:
+        cursor = self._conn().execute(f"SELECT {_COLUMNS} FROM providers ORDER BY rowid")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield ProviderRecord(*row)
+
+    def meta(self, key: str) -> Optional[str]:
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+
+def iter_provider_items(source: Path) -> Iterator[dict[str, Any]]:
+    """Provider dicts from a JSONL file, read line by line; a JSON array file is also accepted."""
+    source = Path(source)
+    if source.suffix.lower() == ".json":
+        try:
+            data = json.loads(source.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            return
+        for item in data if isinstance(data, list) else []:
+            if isinstance(item, dict):
+                yield item
+        return
+    with source.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(item, dict):
+                yield item
+
+
+def import_providers(
+    source: Path,
+    db_path: Path,
+    batch_size: int = 1000,
+    meta: Optional[dict[str, str]] = None,
+) -> dict[str, int]:
+    """
+    Stream `source` into a fresh catalog at `db_path`. The database is built
+    next to the target and swapped in atomically, so open readers keep seeing
+    the previous catalog until they reconnect.
+    """
+    db_path = Path(db_path)
+    tmp_path = db_path.with_name(db_path.name + f".tmp-{os.getpid()}-{threading.get_ident()}")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    imported = skipped = 0
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        batch: list[tuple[Any, ...]] = []
+        for item in iter_provider_items(source):
+            try:
+                p = Provider(**item)
+            except Exception:
+                skipped += 1
+                continue
+            r = ProviderRecord.from_provider(p)
+            batch.append(
+                (r.id, r.name, r.rating, r.distance_km, r.region, r.receptionist_style,
+                 r.address, r.phone_number, r.calendar_id, r.availability_json)
+            )
+            if len(batch) >= batch_size:
+                conn.executemany(f"INSERT OR REPLACE INTO providers ({_COLUMNS}) VALUES (?,?,?,?,?,?,?,?,?,?)", batch)
+                imported += len(batch)
+                batch.clear()
+        if batch:
+            conn.executemany(f"INSERT OR REPLACE INTO providers ({_COLUMNS}) VALUES (?,?,?,?,?,?,?,?,?,?)", batch)
+            imported += len(batch)
+        meta_rows = {"schema_version": SCHEMA_VERSION, **(meta or {})}
+        conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", list(meta_rows.items()))
+        conn.commit()
+    except Exception:
+        conn.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    conn.close()
+    os.replace(tmp_path, db_path)
+    return {"imported": imported, "skipped": skipped}
@@ -0,0 +1,121 @@
+"""
+Named, separately sized thread pools ("bulkheads") for blocking work.
+
+Threaded conversations, the client tools those conversations call, and
+blocking integration I/O each get their own executor, so a large swarm
+filling the conversation pool cannot starve the tool calls it is waiting on.
+Every executor keeps gauges (queued, active, completed) that `executor_stats`
+reports for the admin endpoint and the load-test harness.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.config import get_settings
+from core import profiling
+
+T = TypeVar("T")
+
+CONVERSATIONS = "conversations"
+TOOLS = "tools"
+INTEGRATIONS = "integrations"
+
+_DEFAULT_WORKERS = {CONVERSATIONS: 64, TOOLS: 16, INTEGRATIONS: 16}
+
+
+class Bulkhead(ThreadPoolExecutor):
+    """
+    A ThreadPoolExecutor with saturation gauges. It is shared, so `shutdown`
+    from a borrower (e.g. ClientTools.stop) is ignored; `close` shuts it down.
+    """
+
+    def __init__(self, name: str, max_workers: int) -> None:
+        super().__init__(max_workers=max(1, max_workers), thread_name_prefix=f"bulkhead-{name}")
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self._gauge_lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.peak_queued = 0
+        self.peak_active = 0
+
+    def submit(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> Future[T]:
+        def run() -> T:
+            with self._gauge_lock:
+                self.queued -= 1
+                self.active += 1
+                self.peak_active = max(self.peak_active, self.active)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._gauge_lock:
+                    self.active -= 1
+                    self.completed += 1
+
+        with self._gauge_lock:
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+        try:
+            return super().submit(run)
+        except RuntimeError:
+            with self._gauge_lock:
+                self.queued -= 1
+            raise
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        pass
+
+    def close(self, wait: bool = False) -> None:
+        super().shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._gauge_lock:
+            return {
+                "max_workers": self.max_workers,
+                "threads": len(self._threads),
+                "active": self.active,
+                "queued": self.queued,
+                "completed": self.completed,
+                "peak_active": self.peak_active,
+                "peak_queued": self.peak_queued,
+            }
+
+
+_executors: dict[str, Bulkhead] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name: str) -> Bulkhead:
+    """The bulkhead for `name`, sized by the `executor_<name>_max_workers` setting."""
+    executor = _executors.get(name)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(name)
+            if executor is None:
+                workers = getattr(get_settings(), f"executor_{name}_max_workers", None)
+                executor = Bulkhead(name, int(workers or _DEFAULT_WORKERS.get(name, 8)))
+                _executors[name] = executor
+    return executor
+
+
+async def run_in(name: str, fn: Callable[..., T], *args: Any) -> T:
+    return await asyncio.get_running_loop().run_in_executor(get_executor(name), profiling.bind(fn), *args)
+
+
+def executor_stats() -> dict[str, dict[str, Any]]:
+    for name in _DEFAULT_WORKERS:
+        get_executor(name)
+    with _executors_lock:
+        return {name: executor.stats() for name, executor in _executors.items()}
+
+
+def close_executors(wait: bool = False) -> None:
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.close(wait=wait)
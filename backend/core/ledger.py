@@ -0,0 +1,317 @@
+"""
+In-memory booking ledger: per-provider reservation index with holds and bookings.
+
+A hold reserves a slot for one holder (a task) until it expires; a booking is
+permanent. `commit` turns a slot into a booking atomically, failing if another
+holder has it held or booked. Each provider's book is guarded by one of a fixed
+set of striped locks, so work on different providers rarely contends. Locks are
+threading locks: tools call in from executor threads and routes from the loop,
+and every critical section is a short in-memory check.
+
+Expired holds and reservations that have already ended are pruned whenever a
+book is touched, and by a sweep over every book at most once a minute (and on
+`bookings()`); books left empty are dropped.
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+HOLD = "hold"
+BOOKING = "booking"
+
+# Listeners hear about bookings as they are made and removed: (event, reservation).
+BOOKED = "booked"
+RELEASED = "released"
+LedgerListener = Callable[[str, "Reservation"], None]
+
+
+class SlotConflict(Exception):
+    def __init__(self, provider_id: str, slot: datetime, conflict: "Reservation") -> None:
+        self.provider_id = provider_id
+        self.slot = slot
+        self.conflict = conflict
+        kind = "booked" if conflict.kind == BOOKING else "held by another request"
+        super().__init__(f"Slot {slot.isoformat()} at {provider_id} is already {kind}.")
+
+
+@dataclass
+class Reservation:
+    provider_id: str
+    start: datetime
+    end: datetime
+    holder: str
+    kind: str
+    expires_at: Optional[float] = None
+    created_at: float = field(default_factory=time.time)
+
+    def active(self, now: float) -> bool:
+        return self.expires_at is None or self.expires_at > now
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        return self.start < end and start < self.end
+
+
+def _naive_utc(dt: datetime) -> datetime:
+    if dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+class _ProviderBook:
+    """Reservations for one provider, sorted by start."""
+
+    def __init__(self) -> None:
+        self.entries: list[Reservation] = []
+        self.starts: list[datetime] = []
+        self.max_span = timedelta(0)
+
+    def purge(self, now: float) -> None:
+        """Drop expired holds and anything that ended before `now`."""
+        past = datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None)
+        if any(not r.active(now) or r.end <= past for r in self.entries):
+            self.entries = [r for r in self.entries if r.active(now) and r.end > past]
+            self.starts = [r.start for r in self.entries]
+            self.max_span = max((r.end - r.start for r in self.entries), default=timedelta(0))
+
+    def overlapping(self, start: datetime, end: datetime) -> list[Reservation]:
+        lo = bisect.bisect_left(self.starts, start - self.max_span)
+        hi = bisect.bisect_left(self.starts, end)
+        return [r for r in self.entries[lo:hi] if r.overlaps(start, end)]
+
+    def add(self, r: Reservation) -> None:
+        i = bisect.bisect_right(self.starts, r.start)
+        self.entries.insert(i, r)
+        self.starts.insert(i, r.start)
+        self.max_span = max(self.max_span, r.end - r.start)
+
+    def remove(self, r: Reservation) -> None:
+        i = self.entries.index(r)
+        del self.entries[i]
+        del self.starts[i]
+
+
+class BookingLedger:
+    def __init__(self, stripes: int = 64, hold_seconds: float = 300.0, sweep_interval_seconds: float = 60.0) -> None:
+        self.hold_seconds = hold_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._locks = [threading.Lock() for _ in range(max(1, stripes))]
+        self._books: dict[str, _ProviderBook] = {}
+        self._listeners: list[LedgerListener] = []
+        self._swept_at = time.time()
+
+    def add_listener(self, listener: LedgerListener) -> None:
+        """Call `listener` after each booking is made or removed; it runs outside the provider lock."""
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, r: Reservation) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(event, r)
+            except Exception:
+                logger.exception("Ledger listener failed on %s", event)
+
+    def _lock(self, provider_id: str) -> threading.Lock:
+        return self._locks[zlib.crc32(provider_id.encode()) % len(self._locks)]
+
+    def _book(self, provider_id: str) -> _ProviderBook:
+        book = self._books.get(provider_id)
+        if book is None:
+            book = self._books.setdefault(provider_id, _ProviderBook())
+        return book
+
+    def _prune(self, provider_id: str, book: _ProviderBook, now: float) -> bool:
+        """Purge the book (under its provider's lock); drop it once empty. True if it was dropped."""
+        book.purge(now)
+        if book.entries:
+            return False
+        if self._books.get(provider_id) is book:
+            del self._books[provider_id]
+        return True
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Prune every book; returns how many empty books were dropped."""
+        now = time.time() if now is None else now
+        self._swept_at = now
+        dropped = 0
+        for pid in list(self._books):
+            with self._lock(pid):
+                book = self._books.get(pid)
+                if book is not None and self._prune(pid, book, now):
+                    dropped += 1
+        return dropped
+
+    def _maybe_sweep(self, now: float) -> None:
+        if now - self._swept_at >= self.sweep_interval_seconds:
+            self.sweep(now)
+
+    @staticmethod
+    def _span(slot: datetime, duration_minutes: int) -> tuple[datetime, datetime]:
+        start = _naive_utc(slot)
+        return start, start + timedelta(minutes=duration_minutes)
+
+    def _conflict(self, book: _ProviderBook, start: datetime, end: datetime, holder: Optional[str]) -> Optional[Reservation]:
+        for r in book.overlapping(start, end):
+            if r.kind == BOOKING or r.holder != holder:
+                return r
+        return None
+
+    def is_free(
+        self,
+        provider_id: str,
+        slot: datetime,
+        duration_minutes: int = 30,
+        holder: Optional[str] = None,
+    ) -> bool:
+        """True unless the slot overlaps a booking or someone else's live hold."""
+        start, end = self._span(slot, duration_minutes)
+        with self._lock(provider_id):
+            book = self._books.get(provider_id)
+            if book is None or self._prune(provider_id, book, time.time()):
+                return True
+            return self._conflict(book, start, end, holder) is None
+
+    def hold(
+        self,
+        provider_id: str,
+        slot: datetime,
+        holder: str,
+        duration_minutes: int = 30,
+        ttl_seconds: Optional[float] = None,
+    ) -> Optional[Reservation]:
+        """Hold (or refresh the holder's hold on) a slot. None if it is taken."""
+        start, end = self._span(slot, duration_minutes)
+        now = time.time()
+        expires_at = now + (ttl_seconds if ttl_seconds is not None else self.hold_seconds)
+        with self._lock(provider_id):
+            book = self._book(provider_id)
+            book.purge(now)
+            if self._conflict(book, start, end, holder) is not None:
+                return None
+            held = None
+            for r in book.overlapping(start, end):
+                if r.start == start and r.end == end:
+                    r.expires_at = expires_at
+                    held = r
+                    break
+            if held is None:
+                held = Reservation(provider_id, start, end, holder, HOLD, expires_at=expires_at)
+                book.add(held)
+        self._maybe_sweep(now)
+        return held
+
+    def commit(
+        self,
+        provider_id: str,
+        slot: datetime,
+        holder: str,
+        duration_minutes: int = 30,
+    ) -> Reservation:
+        """Book the slot for `holder`, replacing its holds there. Raises SlotConflict if taken."""
+        start, end = self._span(slot, duration_minutes)
+        with self._lock(provider_id):
+            book = self._book(provider_id)
+            book.purge(time.time())
+            overlapping = book.overlapping(start, end)
+            for r in overlapping:
+                if r.kind == BOOKING and r.holder == holder and r.start == start and r.end == end:
+                    return r
+            conflict = self._conflict(book, start, end, holder)
+            if conflict is not None:
+                raise SlotConflict(provider_id, slot, conflict)
+            for r in overlapping:
+                book.remove(r)
+            r = Reservation(provider_id, start, end, holder, BOOKING)
+            book.add(r)
+        self._notify(BOOKED, r)
+        return r
+
+    def cancel(self, provider_id: str, slot: datetime, holder: str, duration_minutes: int = 30) -> bool:
+        """Drop the holder's hold or booking at exactly this slot."""
+        start, end = self._span(slot, duration_minutes)
+        with self._lock(provider_id):
+            book = self._books.get(provider_id)
+            if book is None:
+                return False
+            removed = None
+            for r in book.overlapping(start, end):
+                if r.holder == holder and r.start == start and r.end == end:
+                    book.remove(r)
+                    removed = r
+                    break
+            self._prune(provider_id, book, time.time())
+        if removed is None:
+            return False
+        if removed.kind == BOOKING:
+            self._notify(RELEASED, removed)
+        return True
+
+    def release_holds(
+        self,
+        holder: str,
+        provider_ids: Optional[list[str]] = None,
+        keep: Optional[set[tuple[str, datetime]]] = None,
+    ) -> int:
+        """Drop every hold owned by `holder` (bookings stay), except those starting at a (provider, slot) in `keep`."""
+        kept = {(pid, _naive_utc(slot)) for pid, slot in keep or ()}
+        released = 0
+        for pid in provider_ids if provider_ids is not None else list(self._books):
+            with self._lock(pid):
+                book = self._books.get(pid)
+                if book is None:
+                    continue
+                mine = [
+                    r for r in book.entries
+                    if r.kind == HOLD and r.holder == holder and (pid, r.start) not in kept
+                ]
+                for r in mine:
+                    book.remove(r)
+                released += len(mine)
+                self._prune(pid, book, time.time())
+        return released
+
+    def bookings(self) -> list[Reservation]:
+        """Every booking that has not ended yet, across providers."""
+        self.sweep()
+        out: list[Reservation] = []
+        for pid in list(self._books):
+            with self._lock(pid):
+                book = self._books.get(pid)
+                if book is not None:
+                    out.extend(r for r in book.entries if r.kind == BOOKING)
+        return out
+
+    def reservations(self, provider_id: str, start: Optional[datetime] = None, end: Optional[datetime] = None) -> list[Reservation]:
+        with self._lock(provider_id):
+            book = self._books.get(provider_id)
+            if book is None or self._prune(provider_id, book, time.time()):
+                return []
+            if start is None or end is None:
+                return list(book.entries)
+            return book.overlapping(_naive_utc(start), _naive_utc(end))
+
+
+_ledger: Optional[BookingLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger() -> BookingLedger:
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                from app.config import get_settings
+                s = get_settings()
+                _ledger = BookingLedger(
+                    stripes=getattr(s, "booking_lock_stripes", 64),
+                    hold_seconds=getattr(s, "booking_hold_seconds", 300.0),
+                )
+    return _ledger
@@ -0,0 +1,231 @@
+"""
+Approximate memory accounting and tracemalloc control for the admin API.
+
+`deep_size` walks containers, pydantic models and plain objects, counting
+each object once, and stops after `max_objects` so a report on a large heap
+stays cheap. Sizes are estimates (shared interned objects and C-level buffers
+are not fully attributed), good for spotting which subsystem grows.
+
+The tracemalloc helpers keep a few named snapshots in memory; `diff` compares
+two of them (or a snapshot against the current heap) and returns the top
+allocation sites by size growth.
+"""
+from __future__ import annotations
+
+import gc
+import sys
+import threading
+import time
+import tracemalloc
+import types
+from collections import OrderedDict, deque
+from typing import Any, Callable, Optional
+
+from pydantic import BaseModel
+
+MAX_SNAPSHOTS = 8
+
+# Shared by everything and not owned by any subsystem.
+_SKIP_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def deep_size(obj: Any, seen: Optional[set[int]] = None, max_objects: int = 200_000) -> int:
+    """Bytes held by `obj` and everything reachable through containers, models and instance dicts."""
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack and len(seen) < max_objects:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, _SKIP_TYPES):
+            continue
+        seen.add(id(o))
+        try:
+            total += sys.getsizeof(o)
+        except TypeError:
+            continue
+        if isinstance(o, (str, bytes, bytearray, int, float, bool)) or o is None:
+            continue
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset, deque)):
+            stack.extend(o)
+        elif isinstance(o, BaseModel):
+            stack.append(o.__dict__)
+        else:
+            d = getattr(o, "__dict__", None)
+            if isinstance(d, dict):
+                stack.append(d)
+            for name in getattr(type(o), "__slots__", ()):
+                if hasattr(o, name):
+                    stack.append(getattr(o, name))
+    return total
+
+
+def task_sizes(tasks: dict[str, Any], top: int = 20) -> dict[str, Any]:
+    """Per-task sizes split by the parts that grow (outcomes, tool log, transcript, trace), largest first."""
+    rows: list[dict[str, Any]] = []
+    for task_id, state in list(tasks.items()):
+        parts = {
+            "outcomes": deep_size(list(state.outcomes)),
+            "tool_calls_log": deep_size(list(state.tool_calls_log)),
+            "transcript": deep_size(list(state.transcript)),
+            "trace": deep_size(list(state.trace or [])),
+        }
+        rows.append({
+            "task_id": task_id,
+            "status": state.status.value,
+            "bytes": deep_size(state),
+            "tool_calls": len(state.tool_calls_log),
+            **{f"{k}_bytes": v for k, v in parts.items()},
+        })
+    rows.sort(key=lambda r: r["bytes"], reverse=True)
+    return {
+        "count": len(rows),
+        "total_bytes": sum(r["bytes"] for r in rows),
+        "by_status": _by_status(rows),
+        "largest": rows[:top],
+    }
+
+
+def _by_status(rows: list[dict[str, Any]]) -> dict[str, dict[str, int]]:
+    out: dict[str, dict[str, int]] = {}
+    for r in rows:
+        entry = out.setdefault(r["status"], {"count": 0, "bytes": 0})
+        entry["count"] += 1
+        entry["bytes"] += r["bytes"]
+    return out
+
+
+def subsystem_sizes(subsystems: dict[str, Callable[[], Any]]) -> dict[str, Any]:
+    """Size of what each getter returns; a failing getter reports its error instead."""
+    out: dict[str, Any] = {}
+    for name, getter in subsystems.items():
+        started = time.perf_counter()
+        try:
+            out[name] = {"bytes": deep_size(getter())}
+        except Exception as e:
+            out[name] = {"error": str(e)}
+            continue
+        out[name]["measure_ms"] = round((time.perf_counter() - started) * 1000.0, 2)
+    return out
+
+
+def process_memory() -> dict[str, Any]:
+    out: dict[str, Any] = {"gc_objects": len(gc.get_objects()), "gc_counts": gc.get_count()}
+    try:
+        import resource
+        out["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    key, value = line.split(":", 1)
+                    out[key.lower() + "_kb"] = int(value.split()[0])
+    except OSError:
+        pass
+    return out
+
+
+class AllocationTracker:
+    """Named tracemalloc snapshots; tracing only runs between start() and stop()."""
+
+    def __init__(self, max_snapshots: int = MAX_SNAPSHOTS) -> None:
+        self.max_snapshots = max_snapshots
+        self._snapshots: OrderedDict[str, tuple[float, tracemalloc.Snapshot]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    def status(self) -> dict[str, Any]:
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        with self._lock:
+            snapshots = [{"id": sid, "taken_at": at} for sid, (at, _) in self._snapshots.items()]
+        return {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else None,
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "overhead_bytes": tracemalloc.get_tracemalloc_memory() if tracing else 0,
+            "snapshots": snapshots,
+        }
+
+    def start(self, frames: int = 1) -> dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(max(1, frames))
+        return self.status()
+
+    def stop(self) -> dict[str, Any]:
+        """Stop tracing and drop the snapshots (they are useless without a running trace to diff against)."""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        with self._lock:
+            self._snapshots.clear()
+        return self.status()
+
+    def snapshot(self) -> str:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running; start it first")
+        snap = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        with self._lock:
+            self._counter += 1
+            sid = f"s{self._counter}"
+            self._snapshots[sid] = (time.time(), snap)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return sid
+
+    def _get(self, sid: str) -> tracemalloc.Snapshot:
+        with self._lock:
+            entry = self._snapshots.get(sid)
+        if entry is None:
+            raise KeyError(sid)
+        return entry[1]
+
+    def diff(self, base: str, current: Optional[str] = None, top: int = 25, group_by: str = "lineno") -> dict[str, Any]:
+        """Top allocation sites by growth from `base` to `current` (a fresh snapshot when omitted)."""
+        if group_by not in ("lineno", "filename", "traceback"):
+            raise ValueError("group_by must be lineno, filename or traceback")
+        old = self._get(base)
+        current = current or self.snapshot()
+        new = self._get(current)
+        stats = new.compare_to(old, group_by)
+        return {
+            "base": base,
+            "current": current,
+            "total_size_diff": sum(s.size_diff for s in stats),
+            "top": [
+                {
+                    "site": [f"{frame.filename}:{frame.lineno}" for frame in s.traceback],
+                    "size": s.size,
+                    "size_diff": s.size_diff,
+                    "count": s.count,
+                    "count_diff": s.count_diff,
+                }
+                for s in stats[:top]
+            ],
+        }
+
+    def top_sites(self, sid: Optional[str] = None, top: int = 25, group_by: str = "lineno") -> dict[str, Any]:
+        sid = sid or self.snapshot()
+        stats = self._get(sid).statistics(group_by)
+        return {
+            "snapshot": sid,
+            "top": [
+                {"site": [f"{f.filename}:{f.lineno}" for f in s.traceback], "size": s.size, "count": s.count}
+                for s in stats[:top]
+            ],
+        }
+
+
+_tracker = AllocationTracker()
+
+
+def get_allocation_tracker() -> AllocationTracker:
+    return _tracker
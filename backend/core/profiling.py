@@ -0,0 +1,394 @@
+"""
+On-demand sampling profiler for one task or request.
+
+A profile session is made current with `activate()` inside the task (or ASGI
+request) being profiled. Work it hands to other threads through
+`bind()` (wrapped by tracing.bind and executors.run_in) registers its thread
+with the session while it runs; coroutines it runs as separate asyncio tasks
+are added with `adopt()`. A single sampler thread reads every thread's stack
+each `interval` and keeps:
+
+- the stacks of threads currently doing bound work for a session, and
+- the event loop thread's stack when it is running one of the session's
+  coroutines (found by walking the stack for their frames), trimmed to start
+  at that coroutine, so other requests sharing the loop are not counted.
+
+Finished sessions are written as `<id>.pstats` (loadable with pstats.Stats)
+and `<id>.collapsed` (folded stacks for flame graph tools) plus a JSON
+summary. Sessions are rate capped globally: at most `max_concurrent` at once
+and `max_per_hour` started per rolling hour.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import marshal
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from types import FrameType
+from typing import Any, Callable, Iterator, Optional
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+FuncKey = tuple[str, int, str]
+
+_current_profile: ContextVar[Optional["ProfileSession"]] = ContextVar("callpilot_profile", default=None)
+
+
+class ProfileSession:
+    def __init__(self, label: str, interval: float, max_seconds: float) -> None:
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.interval = interval
+        self.started_at = time.time()
+        self.deadline = time.monotonic() + max_seconds
+        self.finished_at: Optional[float] = None
+        self.samples: Counter[tuple[FuncKey, ...]] = Counter()
+        self.sample_count = 0
+        self._threads: Counter[int] = Counter()
+        self._coros: list[Any] = []
+        self._loop_thread: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self.finished_at is None and time.monotonic() < self.deadline
+
+    def enter_thread(self) -> None:
+        with self._lock:
+            self._threads[threading.get_ident()] += 1
+
+    def exit_thread(self) -> None:
+        with self._lock:
+            tid = threading.get_ident()
+            self._threads[tid] -= 1
+            if self._threads[tid] <= 0:
+                del self._threads[tid]
+
+    def adopt(self, task: "asyncio.Future[Any]") -> None:
+        coro = task.get_coro() if isinstance(task, asyncio.Task) else None
+        if coro is not None:
+            with self._lock:
+                self._coros.append(coro)
+
+    def sample(self, frames: dict[int, FrameType]) -> None:
+        with self._lock:
+            threads = list(self._threads)
+            roots = {id(c.cr_frame) for c in self._coros if getattr(c, "cr_frame", None) is not None}
+            loop_thread = self._loop_thread
+        for tid in threads:
+            frame = frames.get(tid)
+            if frame is not None and tid != loop_thread:
+                self._record(_stack(frame))
+        if loop_thread is not None and roots:
+            frame = frames.get(loop_thread)
+            if frame is not None:
+                stack = _stack(frame, roots)
+                if stack:
+                    self._record(stack)
+
+    def _record(self, stack: tuple[FuncKey, ...]) -> None:
+        self.samples[stack] += 1
+        self.sample_count += 1
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "label": self.label,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "interval_ms": round(self.interval * 1000.0, 3),
+            "samples": self.sample_count,
+            "unique_stacks": len(self.samples),
+        }
+
+
+def _stack(leaf: FrameType, roots: Optional[set[int]] = None) -> tuple[FuncKey, ...]:
+    """Root-to-leaf function keys. With `roots`, only the part below the outermost of those frames, else ()."""
+    frames: list[FrameType] = []
+    f: Optional[FrameType] = leaf
+    cut = -1
+    while f is not None:
+        frames.append(f)
+        if roots is not None and id(f) in roots:
+            cut = len(frames)
+        f = f.f_back
+    if roots is not None:
+        if cut < 0:
+            return ()
+        frames = frames[:cut]
+    return tuple((fr.f_code.co_filename, fr.f_code.co_firstlineno, fr.f_code.co_name) for fr in reversed(frames))
+
+
+def to_pstats(session: ProfileSession) -> dict[FuncKey, tuple[Any, ...]]:
+    """Sample counts as a pstats stats dict: time is samples x interval; calls are sample counts."""
+    interval = session.interval
+    tt: Counter[FuncKey] = Counter()
+    ct: Counter[FuncKey] = Counter()
+    edges: dict[FuncKey, Counter[FuncKey]] = {}
+    edge_tt: dict[FuncKey, Counter[FuncKey]] = {}
+    for stack, n in session.samples.items():
+        if not stack:
+            continue
+        tt[stack[-1]] += n
+        for func in set(stack):
+            ct[func] += n
+        seen_edges = set()
+        for caller, callee in zip(stack, stack[1:]):
+            if (caller, callee) in seen_edges:
+                continue
+            seen_edges.add((caller, callee))
+            edges.setdefault(callee, Counter())[caller] += n
+            if callee == stack[-1]:
+                edge_tt.setdefault(callee, Counter())[caller] += n
+    stats: dict[FuncKey, tuple[Any, ...]] = {}
+    for func, total in ct.items():
+        callers = {
+            caller: (n, n, edge_tt.get(func, Counter())[caller] * interval, n * interval)
+            for caller, n in edges.get(func, Counter()).items()
+        }
+        stats[func] = (total, total, tt[func] * interval, total * interval, callers)
+    return stats
+
+
+def to_collapsed(session: ProfileSession) -> str:
+    lines = []
+    for stack, n in sorted(session.samples.items(), key=lambda kv: -kv[1]):
+        frames = ";".join(f"{name} ({Path(filename).name}:{line})" for filename, line, name in stack)
+        lines.append(f"{frames} {n}")
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
+class Profiler:
+    def __init__(
+        self,
+        root: Path,
+        interval: float = 0.005,
+        max_seconds: float = 120.0,
+        max_concurrent: int = 2,
+        max_per_hour: int = 12,
+    ) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.interval = max(0.001, interval)
+        self.max_seconds = max_seconds
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_per_hour = max(1, max_per_hour)
+        self._active: dict[str, ProfileSession] = {}
+        self._started: deque[float] = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"started": 0, "rate_limited": 0, "saved": 0}
+
+    def begin(self, label: str) -> Optional[ProfileSession]:
+        """A new session, or None when the global cap is reached."""
+        now = time.monotonic()
+        with self._lock:
+            while self._started and now - self._started[0] > 3600.0:
+                self._started.popleft()
+            if len(self._active) >= self.max_concurrent or len(self._started) >= self.max_per_hour:
+                self.stats["rate_limited"] += 1
+                return None
+            self._started.append(now)
+            session = ProfileSession(label, self.interval, self.max_seconds)
+            self._active[session.id] = session
+            self.stats["started"] += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return session
+
+    def end(self, session: ProfileSession) -> dict[str, Any]:
+        """Stop sampling the session and write its outputs; returns its summary. Blocks; see end_async."""
+        summary = self._stop(session)
+        self._write(session, summary)
+        return summary
+
+    async def end_async(self, session: ProfileSession) -> dict[str, Any]:
+        """`end` for the event loop: the pstats/collapsed conversion and file writes run on the integrations executor."""
+        from core.executors import INTEGRATIONS, run_in
+        summary = self._stop(session)
+        await run_in(INTEGRATIONS, self._write, session, summary)
+        return summary
+
+    def _stop(self, session: ProfileSession) -> dict[str, Any]:
+        with self._lock:
+            self._active.pop(session.id, None)
+        session.finished_at = time.time()
+        return session.summary()
+
+    def _write(self, session: ProfileSession, summary: dict[str, Any]) -> None:
+        try:
+            with (self.root / f"{session.id}.pstats").open("wb") as f:
+                marshal.dump(to_pstats(session), f)
+            (self.root / f"{session.id}.collapsed").write_text(to_collapsed(session), encoding="utf-8")
+            (self.root / f"{session.id}.json").write_text(json.dumps(summary), encoding="utf-8")
+            self.stats["saved"] += 1
+        except OSError as e:
+            logger.warning("Could not write profile %s: %s", session.id, e)
+
+    def _sample_loop(self) -> None:
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                sessions = [s for s in self._active.values() if s.active]
+            if not sessions:
+                self._wake.wait(1.0)
+                self._wake.clear()
+                continue
+            frames = sys._current_frames()
+            frames.pop(me, None)
+            for s in sessions:
+                s.sample(frames)
+            del frames
+            time.sleep(self.interval)
+
+    def list(self) -> list[dict[str, Any]]:
+        out = []
+        for path in sorted(self.root.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True):
+            try:
+                out.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue
+        return out
+
+    def path(self, profile_id: str, fmt: str) -> Optional[Path]:
+        if not profile_id.isalnum() or fmt not in ("pstats", "collapsed", "json"):
+            return None
+        path = self.root / f"{profile_id}.{fmt}"
+        return path if path.exists() else None
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            active = [s.summary() for s in self._active.values()]
+            started_last_hour = len(self._started)
+        return {
+            "active": active,
+            "max_concurrent": self.max_concurrent,
+            "max_per_hour": self.max_per_hour,
+            "started_last_hour": started_last_hour,
+            "interval_ms": self.interval * 1000.0,
+            **self.stats,
+        }
+
+
+_profiler: Optional[Profiler] = None
+_profiler_lock = threading.Lock()
+
+
+def is_profiling_enabled() -> bool:
+    return bool(getattr(get_settings(), "profiler_enabled", True))
+
+
+def get_profiler() -> Profiler:
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                s = get_settings()
+                root = getattr(s, "profiler_dir", None) or Path(tempfile.gettempdir()) / "callpilot-profiles"
+                _profiler = Profiler(
+                    Path(root),
+                    interval=float(getattr(s, "profiler_interval_ms", 5.0)) / 1000.0,
+                    max_seconds=float(getattr(s, "profiler_max_seconds", 120.0)),
+                    max_concurrent=int(getattr(s, "profiler_max_concurrent", 2)),
+                    max_per_hour=int(getattr(s, "profiler_max_per_hour", 12)),
+                )
+    return _profiler
+
+
+def current_profile() -> Optional[ProfileSession]:
+    return _current_profile.get()
+
+
+@contextmanager
+def activate(session: Optional[ProfileSession]) -> Iterator[Optional[ProfileSession]]:
+    """Make `session` current for the running asyncio task (call from inside it); a no-op for None."""
+    if session is None:
+        yield None
+        return
+    session._loop_thread = threading.get_ident()
+    task = asyncio.current_task()
+    if task is not None:
+        session.adopt(task)
+    token = _current_profile.set(session)
+    try:
+        yield session
+    finally:
+        _current_profile.reset(token)
+
+
+def adopt(task: "asyncio.Future[Any]") -> None:
+    """Count a task spawned by profiled work as part of the current profile."""
+    session = _current_profile.get()
+    if session is not None:
+        session.adopt(task)
+
+
+def bind(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Carry the current profile into `fn` so the thread that runs it is sampled meanwhile."""
+    session = _current_profile.get()
+    if session is None:
+        return fn
+
+    def _bound(*a: Any, **kw: Any) -> Any:
+        token = _current_profile.set(session)
+        session.enter_thread()
+        try:
+            return fn(*a, **kw)
+        finally:
+            session.exit_thread()
+            _current_profile.reset(token)
+
+    return _bound
+
+
+class ProfileRequestsMiddleware:
+    """Profile a request sent with `X-Profile: 1`; the response carries X-Profile-Id or X-Profile: rate-limited."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict[str, Any], receive: Callable[..., Any], send: Callable[..., Any]) -> None:
+        if scope.get("type") != "http" or not _wants_profile(scope) or not is_profiling_enabled():
+            await self.app(scope, receive, send)
+            return
+        session = get_profiler().begin(f"{scope.get('method')} {scope.get('path')}")
+
+        async def send_with_header(message: dict[str, Any]) -> None:
+            if message.get("type") == "http.response.start":
+                headers = list(message.get("headers") or [])
+                if session is None:
+                    headers.append((b"x-profile", b"rate-limited"))
+                else:
+                    headers.append((b"x-profile-id", session.id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        if session is None:
+            await self.app(scope, receive, send_with_header)
+            return
+        try:
+            with activate(session):
+                await self.app(scope, receive, send_with_header)
+        finally:
+            await get_profiler().end_async(session)
+
+
+def _wants_profile(scope: dict[str, Any]) -> bool:
+    for name, value in scope.get("headers") or ():
+        if name == b"x-profile":
+            return value.strip().lower() in (b"1", b"true", b"yes")
+    return False
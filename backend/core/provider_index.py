@@ -0,0 +1,296 @@
+"""
+In-memory search index over the provider registry, for GET /api/v1/providers.
+
+Built once per registry version: column arrays over provider ordinals
+(rating, distance, region, receptionist style, weekend flag, opening hours)
+plus one ordinal list per sort key, sorted by (value, id). A query's filters
+are evaluated in one pass over the columns and the matching, sorted ordinals
+are cached per (filters, sort key), so paging through a result set is a
+bisect and a slice. Cursors are keyset cursors: the (value, id) of the last
+row served, tied to the registry version they were issued for.
+"""
+from __future__ import annotations
+
+import base64
+import bisect
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from core.catalog import ProviderRecord
+from core.providers_loader import iter_provider_records, registry_version
+
+logger = logging.getLogger(__name__)
+
+SORT_KEYS = ("id", "name", "rating", "distance_km")
+FIELDS = (
+    "id",
+    "name",
+    "rating",
+    "distance_km",
+    "region",
+    "receptionist_style",
+    "address",
+    "phone_number",
+    "weekday_hours",
+    "weekend_enabled",
+    "slot_duration_minutes",
+)
+DEFAULT_FIELDS = ("id", "name", "rating", "distance_km", "region")
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+class InvalidCursor(ValueError):
+    """A cursor that cannot be decoded or does not belong to this query."""
+
+
+class StaleCursor(InvalidCursor):
+    """A well-formed cursor issued for an older version of the registry."""
+
+
+def _minutes(hhmm: str) -> int:
+    parts = str(hhmm).strip().split(":")
+    h = int(parts[0]) if parts and parts[0] else 9
+    m = int(parts[1]) if len(parts) > 1 else 0
+    return h * 60 + m
+
+
+class ProviderIndex:
+    def __init__(self, providers_path: Path, cache_size: int = 256) -> None:
+        self.providers_path = Path(providers_path)
+        self.cache_size = cache_size
+        self.version: Optional[tuple[int, int]] = None
+        self.build_ms: Optional[float] = None
+        self._lock = threading.Lock()
+        self._records: list[ProviderRecord] = []
+        self._profiles: list[dict[str, Any]] = []
+        self._rating: list[float] = []
+        self._distance: list[float] = []
+        self._region: list[Optional[str]] = []
+        self._style: list[str] = []
+        self._weekend = bytearray()
+        self._open: list[int] = []
+        self._close: list[int] = []
+        self._slot: list[int] = []
+        self._orders: dict[str, list[int]] = {}
+        self._results: OrderedDict[tuple[Any, ...], tuple[list[int], list[tuple[Any, str]]]] = OrderedDict()
+
+    @property
+    def size(self) -> int:
+        return len(self._records)
+
+    def is_stale(self) -> bool:
+        return self.version is None or self.version != registry_version(self.providers_path)
+
+    def ensure_built(self) -> None:
+        if not self.is_stale():
+            return
+        with self._lock:
+            if self.is_stale():
+                self._build()
+
+    def _build(self) -> None:
+        started = time.perf_counter()
+        version = registry_version(self.providers_path)
+        records = list(iter_provider_records(self.providers_path))
+        profiles = [json.loads(r.availability_json) if r.availability_json else {} for r in records]
+        self._records = records
+        self._profiles = profiles
+        self._rating = [r.rating for r in records]
+        self._distance = [r.distance_km for r in records]
+        self._region = [r.region for r in records]
+        self._style = [r.receptionist_style for r in records]
+        self._weekend = bytearray(1 if p.get("weekend_enabled") else 0 for p in profiles)
+        hours = [p.get("weekday_hours") or ("09:00", "17:00") for p in profiles]
+        self._open = [_minutes(h[0]) for h in hours]
+        self._close = [_minutes(h[1]) for h in hours]
+        self._slot = [int(p.get("slot_duration_minutes") or 30) for p in profiles]
+        n = len(records)
+        self._orders = {key: sorted(range(n), key=lambda i, k=key: (self._value(k, i), records[i].id)) for key in SORT_KEYS}
+        self._results.clear()
+        self.version = version
+        self.build_ms = round((time.perf_counter() - started) * 1000.0, 2)
+        logger.info("Provider index built: %d providers in %.1f ms", n, self.build_ms)
+
+    def _value(self, key: str, i: int) -> Any:
+        if key == "rating":
+            return self._rating[i]
+        if key == "distance_km":
+            return self._distance[i]
+        if key == "name":
+            return self._records[i].name.lower()
+        return self._records[i].id
+
+    def _matches(
+        self,
+        min_rating: Optional[float],
+        max_distance_km: Optional[float],
+        region: Optional[str],
+        receptionist_style: Optional[str],
+        open_on: Optional[str],
+        open_at: Optional[datetime],
+    ) -> bytearray:
+        n = self.size
+        keep = bytearray(b"\x01") * n
+        if min_rating is not None:
+            for i, v in enumerate(self._rating):
+                if v < min_rating:
+                    keep[i] = 0
+        if max_distance_km is not None:
+            for i, v in enumerate(self._distance):
+                if v > max_distance_km:
+                    keep[i] = 0
+        if region:
+            for i, v in enumerate(self._region):
+                if v != region:
+                    keep[i] = 0
+        if receptionist_style:
+            for i, v in enumerate(self._style):
+                if v != receptionist_style:
+                    keep[i] = 0
+        days: set[int] = set()
+        if open_on == "weekend":
+            days = {5, 6}
+        elif open_on in WEEKDAYS:
+            days = {WEEKDAYS.index(open_on)}
+        if open_at is not None:
+            days.add(open_at.weekday())
+        if days & {5, 6}:
+            # Weekdays are always open; weekend days only with weekend_enabled.
+            for i in range(n):
+                if not self._weekend[i]:
+                    keep[i] = 0
+        if open_at is not None:
+            at = open_at.hour * 60 + open_at.minute
+            for i in range(n):
+                if keep[i] and not (self._open[i] <= at and at + self._slot[i] <= self._close[i]):
+                    keep[i] = 0
+        return keep
+
+    def _result(self, filters: tuple[Any, ...], sort_by: str) -> tuple[list[int], list[tuple[Any, str]]]:
+        key = (*filters, sort_by)
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                self._results.move_to_end(key)
+                return cached
+        keep = self._matches(*filters)
+        ordinals = [i for i in self._orders[sort_by] if keep[i]]
+        keys = [(self._value(sort_by, i), self._records[i].id) for i in ordinals]
+        with self._lock:
+            self._results[key] = (ordinals, keys)
+            while len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+        return ordinals, keys
+
+    def _encode_cursor(self, sort_by: str, descending: bool, key: tuple[Any, str]) -> str:
+        payload = json.dumps({"v": list(self.version or ()), "s": sort_by, "d": descending, "k": list(key)})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def _decode_cursor(self, cursor: str, sort_by: str, descending: bool) -> tuple[Any, str]:
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            key = (data["k"][0], data["k"][1])
+            version = tuple(data.get("v") or ())
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+            raise InvalidCursor("Malformed cursor")
+        if data.get("s") != sort_by or bool(data.get("d")) != descending:
+            raise InvalidCursor("Cursor was issued for a different sort order")
+        # The key is compared against the index's (value, id) tuples; a wrong type would blow up in bisect.
+        value, pid = key
+        if sort_by in ("rating", "distance_km"):
+            value_ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+        else:
+            value_ok = isinstance(value, str)
+        if not value_ok or not isinstance(pid, str):
+            raise InvalidCursor("Malformed cursor")
+        if version != tuple(self.version or ()):
+            raise StaleCursor("Cursor was issued for an older version of the provider registry")
+        return key
+
+    def row(self, i: int, fields: tuple[str, ...]) -> dict[str, Any]:
+        r = self._records[i]
+        profile = self._profiles[i]
+        values = {
+            "id": r.id,
+            "name": r.name,
+            "rating": r.rating,
+            "distance_km": r.distance_km,
+            "region": r.region,
+            "receptionist_style": r.receptionist_style,
+            "address": r.address,
+            "phone_number": r.phone_number,
+            "weekday_hours": list(profile.get("weekday_hours") or ("09:00", "17:00")),
+            "weekend_enabled": bool(self._weekend[i]),
+            "slot_duration_minutes": self._slot[i],
+        }
+        return {f: values[f] for f in fields}
+
+    def search(
+        self,
+        min_rating: Optional[float] = None,
+        max_distance_km: Optional[float] = None,
+        region: Optional[str] = None,
+        receptionist_style: Optional[str] = None,
+        open_on: Optional[str] = None,
+        open_at: Optional[datetime] = None,
+        sort_by: str = "id",
+        descending: bool = False,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        fields: tuple[str, ...] = DEFAULT_FIELDS,
+    ) -> dict[str, Any]:
+        """
+        One page of matching providers plus the total and the cursor of the next
+        page (None on the last one). Raises ValueError for an unknown sort key or
+        field, StaleCursor for a cursor from an older registry version and
+        InvalidCursor for any other cursor that does not fit the query.
+        """
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"sort_by must be one of {', '.join(SORT_KEYS)}")
+        unknown = [f for f in fields if f not in FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        if open_on is not None and open_on not in WEEKDAYS + ("weekday", "weekend"):
+            raise ValueError("open_on must be a day name, 'weekday' or 'weekend'")
+        self.ensure_built()
+        open_at = open_at.replace(second=0, microsecond=0) if open_at is not None else None
+        filters = (min_rating, max_distance_km, region or None, receptionist_style or None, open_on, open_at)
+        ordinals, keys = self._result(filters, sort_by)
+        after = self._decode_cursor(cursor, sort_by, descending) if cursor else None
+        if not descending:
+            start = bisect.bisect_right(keys, after) if after is not None else 0
+            page = ordinals[start:start + limit]
+            more = start + limit < len(ordinals)
+        else:
+            end = bisect.bisect_left(keys, after) if after is not None else len(ordinals)
+            page = ordinals[max(0, end - limit):end][::-1]
+            more = end - limit > 0
+        next_cursor = None
+        if more and page:
+            last = page[-1]
+            next_cursor = self._encode_cursor(sort_by, descending, (self._value(sort_by, last), self._records[last].id))
+        return {
+            "total": len(ordinals),
+            "providers": [self.row(i, fields) for i in page],
+            "next_cursor": next_cursor,
+        }
+
+
+_indexes: dict[Path, ProviderIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_provider_index(providers_path: Path) -> ProviderIndex:
+    """The search index for a registry; it builds on first search and after the registry changes."""
+    key = Path(providers_path).resolve()
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.setdefault(key, ProviderIndex(key))
+    return index
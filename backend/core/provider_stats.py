@@ -0,0 +1,246 @@
+"""
+Rolling responsiveness statistics per provider.
+
+Every finished call records time to first reply, turns, whether it produced a
+slot and whether a turn timed out. Each figure is kept as an exponentially
+weighted moving average, so recent behaviour dominates. Recent call durations
+are also kept, per provider and globally, for latency percentiles (hedging). The swarm uses the
+store to call responsive practices first and to skip chronic timeouts (they
+are re-probed after a cooldown). The runners use it to give slow practices
+tighter turn deadlines.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+DURATION_SAMPLES = 50
+GLOBAL_DURATION_SAMPLES = 1000
+
+
+class ProviderStats:
+    __slots__ = (
+        "calls",
+        "first_reply_seconds",
+        "turns",
+        "success_rate",
+        "timeout_rate",
+        "consecutive_timeouts",
+        "last_call_at",
+        "call_seconds",
+    )
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.first_reply_seconds: Optional[float] = None
+        self.turns: Optional[float] = None
+        self.success_rate = 0.5
+        self.timeout_rate = 0.0
+        self.consecutive_timeouts = 0
+        self.last_call_at = 0.0
+        self.call_seconds: deque[float] = deque(maxlen=DURATION_SAMPLES)
+
+    def to_dict(self) -> dict[str, Any]:
+        out = {name: getattr(self, name) for name in self.__slots__}
+        out["call_seconds"] = list(self.call_seconds)
+        return out
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ProviderStats:
+        stats = cls()
+        for name in cls.__slots__:
+            if name in data:
+                setattr(stats, name, data[name])
+        stats.call_seconds = deque(data.get("call_seconds") or [], maxlen=DURATION_SAMPLES)
+        return stats
+
+
+def _ewma(current: Optional[float], value: float, alpha: float) -> float:
+    return value if current is None else (1 - alpha) * current + alpha * value
+
+
+class ProviderStatsStore:
+    def __init__(
+        self,
+        alpha: float = 0.3,
+        min_calls: int = 3,
+        skip_timeout_rate: float = 0.8,
+        skip_cooldown_seconds: float = 3600.0,
+        path: Optional[Path] = None,
+        save_interval_seconds: float = 10.0,
+    ) -> None:
+        self.alpha = alpha
+        self.min_calls = max(1, min_calls)
+        self.skip_timeout_rate = skip_timeout_rate
+        self.skip_cooldown_seconds = skip_cooldown_seconds
+        self.path = Path(path) if path else None
+        self.save_interval_seconds = save_interval_seconds
+        self._stats: dict[str, ProviderStats] = {}
+        self._call_seconds: deque[float] = deque(maxlen=GLOBAL_DURATION_SAMPLES)
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+        if self.path is not None and self.path.exists():
+            self._load()
+
+    def record(
+        self,
+        provider_id: str,
+        first_reply_seconds: Optional[float],
+        turns: int,
+        success: bool,
+        timed_out: bool,
+        duration_seconds: Optional[float] = None,
+    ) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(provider_id, ProviderStats())
+            stats.calls += 1
+            if first_reply_seconds is not None:
+                stats.first_reply_seconds = _ewma(stats.first_reply_seconds, first_reply_seconds, self.alpha)
+            stats.turns = _ewma(stats.turns, float(turns), self.alpha)
+            stats.success_rate = _ewma(stats.success_rate if stats.calls > 1 else None, float(success), self.alpha)
+            stats.timeout_rate = _ewma(stats.timeout_rate if stats.calls > 1 else None, float(timed_out), self.alpha)
+            stats.consecutive_timeouts = stats.consecutive_timeouts + 1 if timed_out else 0
+            stats.last_call_at = time.time()
+            if duration_seconds is not None:
+                stats.call_seconds.append(duration_seconds)
+                self._call_seconds.append(duration_seconds)
+        self._maybe_save()
+
+    def get(self, provider_id: str) -> Optional[ProviderStats]:
+        with self._lock:
+            return self._stats.get(provider_id)
+
+    def score(self, provider_id: str) -> float:
+        """Higher is better. Providers without history sit in the middle, so new practices still get called."""
+        stats = self.get(provider_id)
+        if stats is None or stats.calls == 0:
+            return 0.5
+        speed = 1.0 / (1.0 + (stats.first_reply_seconds or 0.0) / 10.0)
+        return stats.success_rate * (1.0 - stats.timeout_rate) * (0.5 + 0.5 * speed)
+
+    def should_skip(self, provider_id: str) -> bool:
+        stats = self.get(provider_id)
+        if stats is None or stats.calls < self.min_calls:
+            return False
+        chronic = stats.timeout_rate >= self.skip_timeout_rate and stats.consecutive_timeouts >= self.min_calls
+        return chronic and time.time() - stats.last_call_at < self.skip_cooldown_seconds
+
+    def order(self, provider_ids: Iterable[str]) -> list[str]:
+        """Callable providers, most responsive first; ties keep their input order."""
+        ids = [pid for pid in provider_ids if not self.should_skip(pid)]
+        return sorted(ids, key=self.score, reverse=True)
+
+    def turn_timeout(self, provider_id: str, default: float, floor: float) -> float:
+        """Deadline for one turn: a few times the usual reply time, halved for chronic timeouts."""
+        stats = self.get(provider_id)
+        if stats is None or stats.calls < self.min_calls:
+            return default
+        timeout = default
+        if stats.first_reply_seconds is not None:
+            timeout = min(default, max(floor, 4.0 * stats.first_reply_seconds))
+        if stats.timeout_rate >= 0.5:
+            timeout = max(floor, timeout / 2.0)
+        return timeout
+
+    def latency_percentile(self, provider_id: str, q: float) -> Optional[float]:
+        """The q-quantile of recent call durations for this provider, else across all providers; None without data."""
+        with self._lock:
+            stats = self._stats.get(provider_id)
+            samples = list(stats.call_seconds) if stats is not None else []
+            if len(samples) < self.min_calls:
+                samples = list(self._call_seconds)
+        if len(samples) < self.min_calls:
+            return None
+        samples.sort()
+        return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+    def snapshot(self, provider_ids: Optional[Iterable[str]] = None) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            ids = list(provider_ids) if provider_ids is not None else list(self._stats)
+            return {pid: self._stats[pid].to_dict() for pid in ids if pid in self._stats}
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Could not load provider stats from %s: %s", self.path, e)
+            return
+        self._stats = {pid: ProviderStats.from_dict(d) for pid, d in data.items() if isinstance(d, dict)}
+        for stats in self._stats.values():
+            self._call_seconds.extend(stats.call_seconds)
+
+    def _maybe_save(self) -> None:
+        if self.path is None or time.monotonic() - self._last_save < self.save_interval_seconds:
+            return
+        self.save()
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self._last_save = time.monotonic()
+        tmp = self.path.with_name(self.path.name + f".tmp-{os.getpid()}")
+        try:
+            tmp.write_text(json.dumps(self.snapshot()), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning("Could not save provider stats to %s: %s", self.path, e)
+
+
+_store: Optional[ProviderStatsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_provider_stats() -> ProviderStatsStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                s = get_settings()
+                _store = ProviderStatsStore(
+                    alpha=getattr(s, "provider_stats_alpha", 0.3),
+                    min_calls=getattr(s, "provider_stats_min_calls", 3),
+                    skip_timeout_rate=getattr(s, "provider_stats_skip_timeout_rate", 0.8),
+                    skip_cooldown_seconds=getattr(s, "provider_stats_skip_cooldown_seconds", 3600.0),
+                    path=getattr(s, "provider_stats_path", None),
+                )
+    return _store
+
+
+def is_provider_stats_enabled() -> bool:
+    return bool(getattr(get_settings(), "provider_stats_enabled", True))
+
+
+def turn_timeout_for(provider_id: str) -> float:
+    s = get_settings()
+    default = float(getattr(s, "turn_timeout_seconds", 30.0))
+    if not is_provider_stats_enabled():
+        return default
+    return get_provider_stats().turn_timeout(provider_id, default, float(getattr(s, "turn_timeout_min_seconds", 5.0)))
+
+
+def record_call(provider_id: str, call_stats: dict[str, Any], turns: int, success: bool) -> None:
+    if not is_provider_stats_enabled():
+        return
+    get_provider_stats().record(
+        provider_id,
+        first_reply_seconds=call_stats.get("first_reply_seconds"),
+        turns=turns,
+        success=success,
+        timed_out=bool(call_stats.get("timed_out")),
+        duration_seconds=call_stats.get("duration_seconds"),
+    )
+
+
+def close_provider_stats() -> None:
+    if _store is not None:
+        _store.save()
@@ -1,15 +1,145 @@
 from __future__ import annotations
 
 import json
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Any, Iterable, Iterator, Optional
 
+from core.catalog import CATALOG_SUFFIXES, SCHEMA_VERSION, SORT_COLUMNS, ProviderCatalog, ProviderRecord, import_providers
 from core.schemas import AvailabilityProfile, Provider
 
+# Parsed registries keyed by resolved path; reloaded when the file's mtime/size changes.
+_cache: dict[Path, tuple[tuple[int, int], list[Provider], dict[str, Provider]]] = {}
+_cache_lock = threading.Lock()
+
+# SQLite catalogs keyed by resolved path. A `.jsonl` registry is imported into a
+# sidecar `<name>.jsonl.sqlite` catalog and re-imported when the JSONL changes.
+_catalogs: dict[Path, tuple[tuple[int, int], ProviderCatalog]] = {}
+_catalogs_lock = threading.Lock()
+
+
+def _file_version(path: Path) -> Optional[tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _cached(path: Path) -> tuple[list[Provider], dict[str, Provider]]:
+    path = Path(path)
+    version = _file_version(path)
+    if version is None:
+        return [], {}
+    key = path.resolve()
+    entry = _cache.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1], entry[2]
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1], entry[2]
+        providers = _parse_providers(path)
+        by_id = {p.id: p for p in providers}
+        _cache[key] = (version, providers, by_id)
+    return providers, by_id
+
+
+def is_catalog(path: Path) -> bool:
+    return Path(path).suffix.lower() in CATALOG_SUFFIXES + (".jsonl",)
+
+
+def _sidecar_db(path: Path) -> Path:
+    return path.with_name(path.name + ".sqlite")
+
+
+def _catalog(path: Path) -> Optional[ProviderCatalog]:
+    path = Path(path)
+    version = _file_version(path)
+    if version is None:
+        return None
+    key = path.resolve()
+    entry = _catalogs.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    with _catalogs_lock:
+        entry = _catalogs.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        db_path = path
+        if path.suffix.lower() == ".jsonl":
+            db_path = _sidecar_db(path)
+            source_version = f"{version[0]}:{version[1]}"
+            existing = ProviderCatalog(db_path) if db_path.exists() else None
+            try:
+                stale = (
+                    existing is None
+                    or existing.meta("source_version") != source_version
+                    or existing.meta("schema_version") != SCHEMA_VERSION
+                )
+            except Exception:
+                stale = True
+            if stale:
+                import_providers(path, db_path, meta={"source_version": source_version})
+        _catalogs[key] = (version, ProviderCatalog(db_path))
+    return _catalogs[key][1]
+
+
+def registry_version(path: Path) -> Optional[tuple[int, int]]:
+    return _file_version(Path(path))
+
 
 def load_providers(path: Path) -> list[Provider]:
-    if not path.exists():
-        return []
+    """Every provider as a model. For catalogs this materializes the whole table; prefer query_providers."""
+    if is_catalog(path):
+        catalog = _catalog(path)
+        return [r.to_provider() for r in catalog.iter_records()] if catalog else []
+    return list(_cached(path)[0])
+
+
+def iter_provider_records(path: Path) -> Iterator[ProviderRecord]:
+    """Every provider as a compact record, in registry order, without building models for catalogs."""
+    if is_catalog(path):
+        catalog = _catalog(path)
+        if catalog is not None:
+            yield from catalog.iter_records()
+        return
+    for p in _cached(path)[0]:
+        yield ProviderRecord.from_provider(p)
+
+
+def query_providers(
+    path: Path,
+    min_rating: Optional[float] = None,
+    region: Optional[str] = None,
+    max_distance_km: Optional[float] = None,
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> tuple[list[ProviderRecord], int]:
+    """A filtered, sorted page of providers and the total number of matches."""
+    if is_catalog(path):
+        catalog = _catalog(path)
+        if catalog is None:
+            return [], 0
+        filters: dict[str, Any] = dict(min_rating=min_rating, region=region, max_distance_km=max_distance_km)
+        page = catalog.query(**filters, sort_by=sort_by, descending=descending, limit=limit, offset=offset)
+        return page, catalog.count(**filters)
+    matches = [
+        p for p in _cached(path)[0]
+        if (min_rating is None or p.rating >= min_rating)
+        and (not region or p.region == region)
+        and (max_distance_km is None or p.distance_km <= max_distance_km)
+    ]
+    if sort_by in SORT_COLUMNS:
+        matches = sorted(matches, key=lambda p: getattr(p, sort_by), reverse=descending)
+    offset = max(0, offset)
+    page = matches[offset:] if limit is None else matches[offset:offset + limit]
+    return [ProviderRecord.from_provider(p) for p in page], len(matches)
+
+
+def _parse_providers(path: Path) -> list[Provider]:
     try:
         raw = path.read_text(encoding="utf-8")
         data = json.loads(raw)
@@ -31,9 +161,18 @@ def load_providers(path: Path) -> list[Provider]:
     return providers
 
 
-def get_providers_by_id(path: Path) -> dict[str, Provider]:
-    return {p.id: p for p in load_providers(path)}
+def get_providers_by_id(path: Path, ids: Optional[Iterable[str]] = None) -> dict[str, Provider]:
+    """Providers keyed by id; pass `ids` to look up only those (the only cheap option for catalogs)."""
+    if ids is not None:
+        found = {pid: get_provider(path, pid) for pid in ids}
+        return {pid: p for pid, p in found.items() if p is not None}
+    if is_catalog(path):
+        return {p.id: p for p in load_providers(path)}
+    return dict(_cached(path)[1])
 
 
 def get_provider(path: Path, provider_id: str) -> Optional[Provider]:
-    return get_providers_by_id(path).get(provider_id)
+    if is_catalog(path):
+        catalog = _catalog(path)
+        return catalog.get(provider_id) if catalog else None
+    return _cached(path)[1].get(provider_id)
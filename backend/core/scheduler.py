@@ -0,0 +1,202 @@
+"""
+Admission-controlled priority scheduler for task runs.
+
+Tasks are queued per priority class (caller tier plus TaskMode) and started
+when one of `max_running` slots frees up. Classes are served by smooth weighted
+round robin: with SINGLE weighted 4 and SWARM 1, four queued single tasks start
+for every swarm, but no class is starved. New work is refused once the queue
+holds `max_queue_length` tasks. Queued TaskStates carry their position and an
+estimated start, computed from per-mode EWMA run times.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional
+
+from app.config import get_settings
+from core.schemas import TaskMode, TaskState
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIER = "standard"
+
+
+class QueueFull(Exception):
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("Task queue is full")
+        self.retry_after = retry_after
+
+
+class _Queued:
+    __slots__ = ("state", "run", "enqueued_at")
+
+    def __init__(self, state: TaskState, run: Callable[[], Awaitable[None]]) -> None:
+        self.state = state
+        self.run = run
+        self.enqueued_at = time.monotonic()
+
+
+class TaskScheduler:
+    def __init__(
+        self,
+        max_running: int = 16,
+        max_queue_length: int = 500,
+        mode_weights: Optional[dict[str, float]] = None,
+        tier_weights: Optional[dict[str, float]] = None,
+        initial_run_seconds: Optional[dict[str, float]] = None,
+    ) -> None:
+        self.max_running = max(1, max_running)
+        self.max_queue_length = max(0, max_queue_length)
+        self.mode_weights = mode_weights or {
+            TaskMode.SINGLE.value: 4.0,
+            TaskMode.FIRST_ACCEPTABLE.value: 2.0,
+            TaskMode.SWARM.value: 1.0,
+        }
+        self.tier_weights = tier_weights or {DEFAULT_TIER: 1.0}
+        self._queues: dict[str, deque[_Queued]] = {}
+        self._credit: dict[str, float] = {}
+        self._running: dict[str, tuple[TaskMode, float]] = {}
+        self._run_seconds = {TaskMode.SINGLE: 30.0, TaskMode.FIRST_ACCEPTABLE: 30.0, TaskMode.SWARM: 60.0}
+        for mode, seconds in (initial_run_seconds or {}).items():
+            self._run_seconds[TaskMode(mode)] = seconds
+        self.stats = {"admitted": 0, "rejected": 0, "started": 0, "finished": 0}
+
+    def priority_class(self, mode: TaskMode, tier: Optional[str] = None) -> str:
+        tier = tier or DEFAULT_TIER
+        if tier not in self.tier_weights:
+            raise ValueError(f"Unknown caller tier '{tier}'")
+        return f"{tier}:{mode.value}"
+
+    def _weight(self, cls: str) -> float:
+        tier, mode = cls.split(":", 1)
+        return max(0.01, self.tier_weights.get(tier, 1.0) * self.mode_weights.get(mode, 1.0))
+
+    @property
+    def depth(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def submit(self, state: TaskState, run: Callable[[], Awaitable[None]], tier: Optional[str] = None) -> None:
+        """Queue `run` for `state`; raises QueueFull (with a retry hint) or ValueError for an unknown tier."""
+        cls = self.priority_class(state.mode, tier)
+        if self.depth >= self.max_queue_length and len(self._running) >= self.max_running:
+            self.stats["rejected"] += 1
+            raise QueueFull(retry_after=self._retry_after())
+        state.priority_class = cls
+        self._queues.setdefault(cls, deque()).append(_Queued(state, run))
+        self.stats["admitted"] += 1
+        self._dispatch()
+        self._refresh_estimates()
+
+    def _pick(self) -> Optional[str]:
+        # Smooth weighted round robin over the non-empty classes.
+        ready = [cls for cls, q in self._queues.items() if q]
+        if not ready:
+            return None
+        total = 0.0
+        for cls in ready:
+            self._credit[cls] = self._credit.get(cls, 0.0) + self._weight(cls)
+            total += self._weight(cls)
+        best = max(ready, key=lambda c: self._credit[c])
+        self._credit[best] -= total
+        return best
+
+    def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while len(self._running) < self.max_running:
+            cls = self._pick()
+            if cls is None:
+                return
+            item = self._queues[cls].popleft()
+            state = item.state
+            state.queue_position = None
+            state.estimated_start_at = None
+            self._running[state.task_id] = (state.mode, time.monotonic())
+            self.stats["started"] += 1
+            loop.create_task(self._run(item))
+
+    async def _run(self, item: _Queued) -> None:
+        state = item.state
+        try:
+            await item.run()
+        except Exception:
+            logger.exception("Task %s crashed in the scheduler", state.task_id)
+        finally:
+            mode, started = self._running.pop(state.task_id, (state.mode, time.monotonic()))
+            elapsed = time.monotonic() - started
+            self._run_seconds[mode] = 0.8 * self._run_seconds[mode] + 0.2 * elapsed
+            self.stats["finished"] += 1
+            self._dispatch()
+            self._refresh_estimates()
+
+    def _order(self) -> list[_Queued]:
+        """The queue in the order `_pick` would drain it, without touching the real credits."""
+        queues = {cls: list(q) for cls, q in self._queues.items() if q}
+        credit = dict(self._credit)
+        heads = {cls: 0 for cls in queues}
+        order: list[_Queued] = []
+        while queues:
+            total = sum(self._weight(cls) for cls in queues)
+            for cls in queues:
+                credit[cls] = credit.get(cls, 0.0) + self._weight(cls)
+            best = max(queues, key=lambda c: credit[c])
+            credit[best] -= total
+            order.append(queues[best][heads[best]])
+            heads[best] += 1
+            if heads[best] >= len(queues[best]):
+                del queues[best]
+        return order
+
+    def _refresh_estimates(self) -> None:
+        now = time.monotonic()
+        wall = datetime.utcnow()
+        free_at = [
+            max(0.0, started + self._run_seconds[mode] - now) for mode, started in self._running.values()
+        ]
+        free_at += [0.0] * (self.max_running - len(free_at))
+        heapq.heapify(free_at)
+        for position, item in enumerate(self._order(), start=1):
+            start_in = heapq.heappop(free_at)
+            heapq.heappush(free_at, start_in + self._run_seconds[item.state.mode])
+            item.state.queue_position = position
+            item.state.estimated_start_at = wall + timedelta(seconds=start_in)
+
+    def _retry_after(self) -> float:
+        soonest = min(
+            (max(0.0, started + self._run_seconds[mode] - time.monotonic()) for mode, started in self._running.values()),
+            default=0.0,
+        )
+        return max(1.0, soonest)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "running": len(self._running),
+            "max_running": self.max_running,
+            "queued": self.depth,
+            "max_queue_length": self.max_queue_length,
+            "queues": {cls: len(q) for cls, q in self._queues.items()},
+            "weights": {cls: self._weight(cls) for cls in self._queues},
+            "estimated_run_seconds": {mode.value: round(s, 2) for mode, s in self._run_seconds.items()},
+            **self.stats,
+        }
+
+
+_scheduler: Optional[TaskScheduler] = None
+
+
+def get_scheduler() -> TaskScheduler:
+    """The process-wide scheduler; call it from the event loop."""
+    global _scheduler
+    if _scheduler is None:
+        s = get_settings()
+        _scheduler = TaskScheduler(
+            max_running=getattr(s, "task_max_running", 16),
+            max_queue_length=getattr(s, "task_queue_max_length", 500),
+            mode_weights=getattr(s, "task_mode_weights", None),
+            tier_weights=getattr(s, "task_tier_weights", None),
+        )
+    return _scheduler
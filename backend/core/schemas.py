@@ -18,6 +18,7 @@ class TaskStatus(str, Enum):
 class TaskMode(str, Enum):
     SINGLE = "single"
     SWARM = "swarm"
+    FIRST_ACCEPTABLE = "first_acceptable"
 
 
 class AvailabilityProfile(BaseModel):
@@ -32,9 +33,12 @@ class Provider(BaseModel):
     name: str
     rating: float = Field(ge=0, le=5)
     distance_km: float = Field(ge=0)
+    region: Optional[str] = None
     receptionist_style: str = "professional"
     availability_profile: AvailabilityProfile = Field(default_factory=AvailabilityProfile)
     address: Optional[str] = None
+    phone_number: Optional[str] = None
+    calendar_id: Optional[str] = None
 
 
 class TranscriptTurn(BaseModel):
@@ -42,10 +46,25 @@ class TranscriptTurn(BaseModel):
     text: str
 
 
+class SlotSource(str, Enum):
+    OFFERED = "offered"
+    VALIDATED = "validated"
+    CONFIRMED = "confirmed"
+
+
+class OfferedSlot(BaseModel):
+    """A slot that came up in a call, with how far it got: read out, validated by a tool, or confirmed."""
+
+    slot: datetime
+    confidence: float = Field(ge=0, le=1)
+    source: SlotSource = SlotSource.OFFERED
+
+
 class NegotiationOutcome(BaseModel):
     provider_id: str
     proposed_slot: Optional[datetime] = None
     confidence_score: float = Field(ge=0, le=1)
+    offered_slots: list[OfferedSlot] = Field(default_factory=list)
     rejection_reasons: list[str] = Field(default_factory=list)
     raw_metadata: dict[str, Any] = Field(default_factory=dict)
     transcript: list[TranscriptTurn] = Field(default_factory=list)
@@ -57,14 +76,53 @@ class PreferenceWeights(BaseModel):
     distance_weight: float = Field(ge=0, le=1, default=0.2)
 
 
+class AcceptanceCriteria(BaseModel):
+    """Bounds a slot must meet in FIRST_ACCEPTABLE mode; unset bounds are derived from the preference weights."""
+
+    latest_slot: Optional[datetime] = None
+    min_rating: Optional[float] = Field(None, ge=0, le=5)
+    max_distance_km: Optional[float] = Field(None, gt=0)
+
+
 class UserRequest(BaseModel):
     message: str
     mode: TaskMode = TaskMode.SINGLE
     preferences: Optional[PreferenceWeights] = None
+    acceptance: Optional[AcceptanceCriteria] = None
 
 
 class TaskCreate(BaseModel):
     user_request: UserRequest
+    tier: Optional[str] = Field(None, description="Caller tier for queue priority (see TASK_TIER_WEIGHTS)")
+    profile: bool = Field(False, description="Run the task under the sampling profiler (GET /admin/profiles)")
+
+
+class TraceSpan(BaseModel):
+    span_id: int
+    parent_id: Optional[int] = None
+    name: str
+    category: str = "app"
+    start_us: float
+    duration_us: float
+    thread_id: int = 0
+    args: dict[str, Any] = Field(default_factory=dict)
+
+
+class HedgeAction(str, Enum):
+    HEDGE = "hedge"
+    BUDGET_EXHAUSTED = "budget_exhausted"
+    NO_CANDIDATES = "no_candidates"
+    CANCEL_REDUNDANT = "cancel_redundant"
+    CANCEL_TARGET_REACHED = "cancel_target_reached"
+
+
+class HedgeDecision(BaseModel):
+    action: HedgeAction
+    provider_id: str
+    hedge_provider_id: Optional[str] = None
+    elapsed_seconds: float = 0.0
+    threshold_seconds: Optional[float] = None
+    at: datetime = Field(default_factory=datetime.utcnow)
 
 
 class TaskState(BaseModel):
@@ -80,6 +138,14 @@ class TaskState(BaseModel):
     error_message: Optional[str] = None
     shortlist: list[RankedSlot] = Field(default_factory=list)
     confirmed_appointment: Optional[BookedAppointment] = None
+    # Served by GET /tasks/{id}/trace; kept out of the (frequently polled) task response.
+    trace: list[TraceSpan] = Field(default_factory=list, exclude=True)
+    hedge_decisions: list[HedgeDecision] = Field(default_factory=list)
+    time_to_result_seconds: Optional[float] = None
+    profile_id: Optional[str] = None
+    priority_class: Optional[str] = None
+    queue_position: Optional[int] = None
+    estimated_start_at: Optional[datetime] = None
 
 
 class RankedSlot(BaseModel):
@@ -88,6 +154,15 @@ class RankedSlot(BaseModel):
     slot: datetime
     score: float
     rank: int
+    held: bool = False
+
+
+class CalendarSyncStatus(str, Enum):
+    NOT_CONFIGURED = "not_configured"
+    PENDING = "pending"
+    RETRYING = "retrying"
+    SYNCED = "synced"
+    FAILED = "failed"
 
 
 class BookedAppointment(BaseModel):
@@ -97,9 +172,33 @@ class BookedAppointment(BaseModel):
     booked_at: datetime = Field(default_factory=datetime.utcnow)
     calendar_event_id: Optional[str] = None
     calendar_link: Optional[str] = None
+    calendar_sync_status: CalendarSyncStatus = CalendarSyncStatus.NOT_CONFIGURED
+    calendar_sync_attempts: int = 0
+    calendar_sync_error: Optional[str] = None
+    calendar_synced_at: Optional[datetime] = None
 
 
 class ConfirmAppointmentRequest(BaseModel):
     task_id: str
     provider_id: str
     slot: datetime
+
+
+class OutboundCallStatus(str, Enum):
+    QUEUED = "queued"
+    DIALING = "dialing"
+    INITIATED = "initiated"
+    FAILED = "failed"
+
+
+class OutboundCallState(BaseModel):
+    provider_id: str
+    to_number: str
+    backend: str = "elevenlabs"
+    status: OutboundCallStatus = OutboundCallStatus.QUEUED
+    call_sid: Optional[str] = None
+    conversation_id: Optional[str] = None
+    message: Optional[str] = None
+    queued_at: datetime = Field(default_factory=datetime.utcnow)
+    dialed_at: Optional[datetime] = None
+    latency_ms: Optional[float] = None
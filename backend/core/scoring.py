@@ -1,6 +1,29 @@
 from __future__ import annotations
 
-from core.schemas import NegotiationOutcome, PreferenceWeights, Provider, RankedSlot
+from datetime import datetime, timedelta
+from typing import Optional
+
+from core.schemas import (
+    AcceptanceCriteria,
+    NegotiationOutcome,
+    OfferedSlot,
+    PreferenceWeights,
+    Provider,
+    RankedSlot,
+    UserRequest,
+)
+
+# Outcomes below this confidence only carry a slot the agent mentioned, not one a tool validated.
+VALIDATED_CONFIDENCE = 0.85
+
+
+def outcome_slots(outcome: NegotiationOutcome) -> list[OfferedSlot]:
+    """Every slot an outcome carries; outcomes without offered_slots fall back to their proposed slot."""
+    if outcome.offered_slots:
+        return outcome.offered_slots
+    if outcome.proposed_slot is None:
+        return []
+    return [OfferedSlot(slot=outcome.proposed_slot, confidence=outcome.confidence_score)]
 
 
 def rank_outcomes_by_agent(
@@ -9,21 +32,22 @@ def rank_outcomes_by_agent(
 ) -> list[RankedSlot]:
     slots: list[RankedSlot] = []
     for o in outcomes:
-        if o.proposed_slot is None or o.provider_id not in providers_by_id:
+        if o.provider_id not in providers_by_id:
             continue
         prov = providers_by_id[o.provider_id]
-        slots.append(
-            RankedSlot(
-                provider_id=o.provider_id,
-                provider_name=prov.name,
-                slot=o.proposed_slot,
-                score=round(o.confidence_score, 4),
-                rank=0,
+        for offered in outcome_slots(o):
+            slots.append(
+                RankedSlot(
+                    provider_id=o.provider_id,
+                    provider_name=prov.name,
+                    slot=offered.slot,
+                    score=round(offered.confidence, 4),
+                    rank=0,
+                )
             )
-        )
     if not slots:
         return []
-    slots.sort(key=lambda s: -s.score)
+    slots.sort(key=lambda s: (-s.score, s.slot.replace(tzinfo=None)))
     for rank, s in enumerate(slots, start=1):
         s.rank = rank
     return slots
@@ -36,3 +60,34 @@ def rank_outcomes(
     now=None,
 ) -> list[RankedSlot]:
     return rank_outcomes_by_agent(outcomes, providers_by_id)
+
+
+def acceptance_criteria(user_request: UserRequest, now: Optional[datetime] = None) -> AcceptanceCriteria:
+    """
+    The request's explicit acceptance bounds, with unset ones derived from its
+    preference weights: the more a dimension is weighted, the tighter its bound
+    (rating 3.0-4.5 stars, distance 50-5 km, latest slot 14-7 days out).
+    """
+    explicit = user_request.acceptance or AcceptanceCriteria()
+    prefs = user_request.preferences or PreferenceWeights()
+    now = now or datetime.utcnow()
+    return AcceptanceCriteria(
+        latest_slot=explicit.latest_slot or now + timedelta(days=14 - 7 * prefs.availability_weight),
+        min_rating=explicit.min_rating if explicit.min_rating is not None else round(3.0 + 1.5 * prefs.rating_weight, 2),
+        max_distance_km=explicit.max_distance_km or round(50.0 - 45.0 * prefs.distance_weight, 1),
+    )
+
+
+def is_acceptable(outcome: NegotiationOutcome, provider: Optional[Provider], criteria: AcceptanceCriteria) -> bool:
+    """Any validated slot of the outcome, from a provider within every bound."""
+    if provider is None:
+        return False
+    if criteria.min_rating is not None and provider.rating < criteria.min_rating:
+        return False
+    if criteria.max_distance_km is not None and provider.distance_km > criteria.max_distance_km:
+        return False
+    latest = criteria.latest_slot.replace(tzinfo=None) if criteria.latest_slot is not None else None
+    return any(
+        s.confidence >= VALIDATED_CONFIDENCE and (latest is None or s.slot.replace(tzinfo=None) <= latest)
+        for s in outcome_slots(outcome)
+    )
@@ -0,0 +1,266 @@
+"""
+Time-bucketed inverted index of open slots across every provider.
+
+The rolling horizon (from today's midnight UTC, `horizon_days` long) is cut
+into `bucket_minutes` bins. Each bin holds an int used as a bitset over
+provider ordinals: bit p is set when provider p has an open slot starting in
+that bin. Bits come from the availability profiles and are then adjusted by
+bookings (ledger listener) and by validate_slot results from negotiations,
+which can both open and close a bin. Holds are short-lived and not indexed;
+callers that need certainty still check the ledger.
+
+A query ORs the bins in a window and ANDs the result with a cached provider
+filter mask (rating, distance, region), so "who has something Tuesday
+morning?" costs a few dozen big-int operations rather than a profile walk per
+provider. The index rebuilds itself when the registry file changes or the day
+rolls over.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from app.config import get_settings
+from core.ledger import BOOKED, BOOKING, Reservation, get_ledger
+from core.providers_loader import load_providers, registry_version
+from core.schemas import Provider
+from simulation.availability import profile_slot_starts
+
+logger = logging.getLogger(__name__)
+
+
+def _naive_utc(dt: datetime) -> datetime:
+    if dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _bits(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class SlotIndex:
+    def __init__(self, providers_path: Path, bucket_minutes: int = 15, horizon_days: int = 14) -> None:
+        self.providers_path = Path(providers_path)
+        self.bucket_minutes = max(1, bucket_minutes)
+        self.horizon_days = max(1, horizon_days)
+        self._lock = threading.Lock()
+        self._version: Optional[tuple[int, int]] = None
+        self._origin: Optional[datetime] = None
+        self._buckets: list[int] = []
+        self._ids: list[str] = []
+        self._ordinal: dict[str, int] = {}
+        self._providers: list[Provider] = []
+        self._masks: dict[tuple[Any, ...], int] = {}
+        self.built_at: Optional[float] = None
+        self.build_ms: Optional[float] = None
+
+    @property
+    def bucket_count(self) -> int:
+        return self.horizon_days * 24 * 60 // self.bucket_minutes
+
+    def _bucket(self, dt: datetime) -> int:
+        return int((_naive_utc(dt) - self._origin).total_seconds() // (self.bucket_minutes * 60))
+
+    def _bucket_start(self, b: int) -> datetime:
+        return self._origin + timedelta(minutes=b * self.bucket_minutes)
+
+    def _range(self, start: datetime, end: datetime) -> range:
+        """Bins whose span intersects [start, end), clipped to the horizon."""
+        lo = max(0, self._bucket(start))
+        hi = min(self.bucket_count, self._bucket(end - timedelta(microseconds=1)) + 1)
+        return range(lo, max(lo, hi))
+
+    def is_stale(self) -> bool:
+        """True before the first build, after the registry changes and once the day rolls over."""
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        return self._origin != today or self._version != registry_version(self.providers_path)
+
+    def ensure_built(self) -> None:
+        if not self.is_stale():
+            return
+        with self._lock:
+            if self.is_stale():
+                self._build()
+
+    def _build(self) -> None:
+        started = time.perf_counter()
+        self._version = registry_version(self.providers_path)
+        self._origin = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        self._providers = load_providers(self.providers_path)
+        self._ids = [p.id for p in self._providers]
+        self._ordinal = {pid: i for i, pid in enumerate(self._ids)}
+        self._buckets = [0] * self.bucket_count
+        self._masks = {}
+        for i, provider in enumerate(self._providers):
+            self._set_profile_bits(i, provider, self._origin, self.horizon_days)
+        for r in get_ledger().bookings():
+            self._clear(r)
+        self.built_at = time.time()
+        self.build_ms = round((time.perf_counter() - started) * 1000.0, 2)
+        logger.info("Slot index built: %d providers, %d bins in %.1f ms", len(self._ids), self.bucket_count, self.build_ms)
+
+    def _set_profile_bits(self, i: int, provider: Provider, from_date: datetime, days: int) -> None:
+        bit = 1 << i
+        for slot in profile_slot_starts(provider, from_date, days_ahead=days):
+            b = self._bucket(slot)
+            if 0 <= b < len(self._buckets):
+                self._buckets[b] |= bit
+
+    def _clear(self, r: Reservation) -> None:
+        i = self._ordinal.get(r.provider_id)
+        if i is None:
+            return
+        keep = ~(1 << i)
+        for b in self._range(r.start, r.end):
+            self._buckets[b] &= keep
+
+    def on_ledger(self, event: str, r: Reservation) -> None:
+        """Ledger listener: a booking closes its bins; a cancelled one reopens what the profile allows there."""
+        with self._lock:
+            if self._origin is None or r.provider_id not in self._ordinal:
+                return
+            if event == BOOKED:
+                self._clear(r)
+                return
+            i = self._ordinal[r.provider_id]
+            window = self._range(r.start, r.end)
+            if not window:
+                return
+            day = self._bucket_start(window.start).replace(hour=0, minute=0)
+            for slot in profile_slot_starts(self._providers[i], day, days_ahead=1):
+                b = self._bucket(slot)
+                if b in window:
+                    self._buckets[b] |= 1 << i
+            for other in get_ledger().reservations(r.provider_id, r.start, r.end):
+                if other.kind == BOOKING:
+                    self._clear(other)
+
+    def note_slot(self, provider_id: str, slot: datetime, available: bool) -> None:
+        """A negotiation checked this slot: open or close its bin."""
+        with self._lock:
+            i = self._ordinal.get(provider_id)
+            if self._origin is None or i is None:
+                return
+            b = self._bucket(slot)
+            if 0 <= b < len(self._buckets):
+                if available:
+                    self._buckets[b] |= 1 << i
+                else:
+                    self._buckets[b] &= ~(1 << i)
+
+    def _mask(self, min_rating: Optional[float], max_distance_km: Optional[float], region: Optional[str]) -> int:
+        key = (min_rating, max_distance_km, region or None)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = 0
+            for i, p in enumerate(self._providers):
+                if (
+                    (min_rating is None or p.rating >= min_rating)
+                    and (max_distance_km is None or p.distance_km <= max_distance_km)
+                    and (not region or p.region == region)
+                ):
+                    mask |= 1 << i
+            self._masks[key] = mask
+        return mask
+
+    def query(
+        self,
+        start: datetime,
+        end: datetime,
+        min_rating: Optional[float] = None,
+        max_distance_km: Optional[float] = None,
+        region: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list[tuple[str, datetime]]:
+        """(provider id, first open bin start) for providers with an open slot in the window, earliest first."""
+        self.ensure_built()
+        with self._lock:
+            mask = self._mask(min_rating, max_distance_km, region)
+            seen = 0
+            hits: list[tuple[str, datetime]] = []
+            for b in self._range(start, end):
+                new = self._buckets[b] & mask & ~seen
+                if not new:
+                    continue
+                seen |= new
+                at = self._bucket_start(b)
+                for i in _bits(new):
+                    hits.append((self._ids[i], at))
+                    if limit is not None and len(hits) >= limit:
+                        return hits
+            return hits
+
+    def providers(
+        self,
+        start: datetime,
+        end: datetime,
+        min_rating: Optional[float] = None,
+        max_distance_km: Optional[float] = None,
+        region: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list[str]:
+        """Ids with an open slot in the window, in registry order."""
+        self.ensure_built()
+        with self._lock:
+            union = 0
+            for b in self._range(start, end):
+                union |= self._buckets[b]
+            union &= self._mask(min_rating, max_distance_km, region)
+            ids: list[str] = []
+            for i in _bits(union):
+                ids.append(self._ids[i])
+                if limit is not None and len(ids) >= limit:
+                    break
+            return ids
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "providers": len(self._ids),
+            "bucket_minutes": self.bucket_minutes,
+            "horizon_days": self.horizon_days,
+            "origin": self._origin.isoformat() if self._origin else None,
+            "built_at": self.built_at,
+            "build_ms": self.build_ms,
+        }
+
+
+_indexes: dict[Path, SlotIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def is_slot_index_enabled() -> bool:
+    return bool(getattr(get_settings(), "slot_index_enabled", True))
+
+
+def get_slot_index(providers_path: Path) -> SlotIndex:
+    """The index for a registry; it builds on first query and the ledger keeps it current."""
+    key = Path(providers_path).resolve()
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                s = get_settings()
+                index = SlotIndex(
+                    key,
+                    bucket_minutes=int(getattr(s, "slot_index_bucket_minutes", 15)),
+                    horizon_days=int(getattr(s, "slot_index_horizon_days", 14)),
+                )
+                get_ledger().add_listener(index.on_ledger)
+                _indexes[key] = index
+    return index
+
+
+def note_slot(providers_path: Path, provider_id: str, slot: datetime, available: bool) -> None:
+    """Feed a validate_slot result into an index that already exists; never builds one."""
+    index = _indexes.get(Path(providers_path).resolve())
+    if index is not None:
+        index.note_slot(provider_id, slot, available)
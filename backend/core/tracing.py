@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+from core import profiling
+from core.schemas import TraceSpan
+
+_current_tracer: ContextVar[Optional["Tracer"]] = ContextVar("callpilot_tracer", default=None)
+_current_parent: ContextVar[Optional[int]] = ContextVar("callpilot_span_parent", default=None)
+
+
+class Tracer:
+    """
+    Collects finished spans for one task. Spans nest through context variables,
+    so anything running under `span()` on the same thread or asyncio task becomes
+    a child; work handed to other threads must go through `bind()`.
+    """
+
+    def __init__(self, trace_id: str) -> None:
+        self.trace_id = trace_id
+        self.spans: list[TraceSpan] = []
+        self._origin = time.perf_counter()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._origin) * 1_000_000.0
+
+    @contextmanager
+    def span(self, name: str, category: str = "app", **args: Any) -> Iterator[dict[str, Any]]:
+        with self._lock:
+            span_id = next(self._ids)
+        parent_id = _current_parent.get() if _current_tracer.get() is self else None
+        tracer_token = _current_tracer.set(self)
+        parent_token = _current_parent.set(span_id)
+        start = self._now_us()
+        error: Optional[str] = None
+        try:
+            yield args
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            duration = self._now_us() - start
+            _current_parent.reset(parent_token)
+            _current_tracer.reset(tracer_token)
+            if error:
+                args["error"] = error
+            self.spans.append(
+                TraceSpan(
+                    span_id=span_id,
+                    parent_id=parent_id,
+                    name=name,
+                    category=category,
+                    start_us=round(start, 1),
+                    duration_us=round(duration, 1),
+                    thread_id=threading.get_ident(),
+                    args=args,
+                )
+            )
+
+
+def current_tracer() -> Optional[Tracer]:
+    return _current_tracer.get()
+
+
+@contextmanager
+def span(name: str, category: str = "app", **args: Any) -> Iterator[dict[str, Any]]:
+    """Record a span on the active tracer; a no-op when nothing is being traced."""
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield args
+        return
+    with tracer.span(name, category, **args) as span_args:
+        yield span_args
+
+
+def bind(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Capture the active tracer and parent span so `fn` records children of the
+    current span when it later runs on an executor or SDK thread. An active
+    profile is carried along as well (see core.profiling.bind).
+    """
+    fn = profiling.bind(fn)
+    tracer = _current_tracer.get()
+    if tracer is None:
+        return fn
+    parent_id = _current_parent.get()
+
+    def _bound(*a: Any, **kw: Any) -> Any:
+        tracer_token = _current_tracer.set(tracer)
+        parent_token = _current_parent.set(parent_id)
+        try:
+            return fn(*a, **kw)
+        finally:
+            _current_parent.reset(parent_token)
+            _current_tracer.reset(tracer_token)
+
+    return _bound
+
+
+def to_chrome_trace(spans: list[TraceSpan], trace_id: str = "") -> dict[str, Any]:
+    """Chrome trace-event JSON (load in chrome://tracing or Perfetto)."""
+    pid = os.getpid()
+    events: list[dict[str, Any]] = []
+    for s in sorted(spans, key=lambda s: s.start_us):
+        events.append(
+            {
+                "name": s.name,
+                "cat": s.category,
+                "ph": "X",
+                "ts": s.start_us,
+                "dur": s.duration_us,
+                "pid": pid,
+                "tid": s.thread_id,
+                "args": {**s.args, "span_id": s.span_id, "parent_id": s.parent_id},
+            }
+        )
+    return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"trace_id": trace_id}}
@@ -0,0 +1,195 @@
+"""
+Write-behind queue for Google Calendar events.
+
+Confirming an appointment only enqueues its calendar write. A single worker on
+the event loop drains the queue in batches (Calendar batch requests, run in
+the integrations executor), retries retryable failures with exponential backoff and
+fills calendar_event_id / calendar_link on the BookedAppointment in place.
+Each event gets a deterministic id, so a retry after an ambiguous failure
+cannot create a duplicate.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from app.config import get_settings
+from core.executors import INTEGRATIONS, run_in
+from core.schemas import BookedAppointment, CalendarSyncStatus
+from integrations.google_calendar import create_events_batch
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = (CalendarSyncStatus.SYNCED, CalendarSyncStatus.FAILED, CalendarSyncStatus.NOT_CONFIGURED)
+
+
+def event_id_for(appointment: BookedAppointment) -> str:
+    # Calendar event ids allow base32hex characters; lowercase hex is a subset.
+    key = f"{appointment.task_id}|{appointment.provider_id}|{appointment.slot.isoformat()}"
+    return "cp" + hashlib.sha1(key.encode()).hexdigest()
+
+
+def _event(appointment: BookedAppointment, duration_minutes: int = 30) -> dict[str, Any]:
+    return {
+        "event_id": event_id_for(appointment),
+        "start_iso": appointment.slot.isoformat(),
+        "end_iso": (appointment.slot + timedelta(minutes=duration_minutes)).isoformat(),
+        "summary": f"Dental appointment – {appointment.provider_id}",
+    }
+
+
+class CalendarWriter:
+    def __init__(
+        self,
+        batch_size: int = 50,
+        linger_seconds: float = 0.05,
+        max_attempts: int = 5,
+        backoff_seconds: float = 1.0,
+        max_backoff_seconds: float = 60.0,
+    ) -> None:
+        self.batch_size = max(1, batch_size)
+        self.linger_seconds = linger_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._queue: asyncio.Queue[BookedAppointment] = asyncio.Queue()
+        self._changed = asyncio.Condition()
+        self._worker: Optional[asyncio.Task] = None
+        self._retries: set[asyncio.TimerHandle] = set()
+        self.stats = {"enqueued": 0, "batches": 0, "synced": 0, "retried": 0, "failed": 0}
+
+    def enqueue(self, appointment: BookedAppointment) -> None:
+        appointment.calendar_sync_status = CalendarSyncStatus.PENDING
+        self.stats["enqueued"] += 1
+        self._queue.put_nowait(appointment)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() + len(self._retries)
+
+    async def _next_batch(self) -> list[BookedAppointment]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.linger_seconds
+        while len(batch) < self.batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._write(batch)
+            except Exception:
+                logger.exception("Calendar write batch failed")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_backoff_seconds, self.backoff_seconds * (2 ** (attempts - 1)))
+        return delay * (0.5 + random.random() / 2)
+
+    def _requeue(self, appointment: BookedAppointment, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+
+        def fire() -> None:
+            self._retries.discard(handle)
+            self._queue.put_nowait(appointment)
+
+        handle = loop.call_later(delay, fire)
+        self._retries.add(handle)
+
+    async def _write(self, batch: list[BookedAppointment]) -> None:
+        self.stats["batches"] += 1
+        events = [_event(a) for a in batch]
+        try:
+            results = await run_in(INTEGRATIONS, create_events_batch, events)
+        except Exception as e:
+            results = [{"ok": False, "error": str(e), "retryable": True} for _ in batch]
+        for appointment, result in zip(batch, results):
+            appointment.calendar_sync_attempts += 1
+            if result.get("ok"):
+                appointment.calendar_event_id = result.get("event_id")
+                appointment.calendar_link = result.get("html_link") or appointment.calendar_link
+                appointment.calendar_sync_status = CalendarSyncStatus.SYNCED
+                appointment.calendar_sync_error = None
+                appointment.calendar_synced_at = datetime.utcnow()
+                self.stats["synced"] += 1
+            elif result.get("retryable") and appointment.calendar_sync_attempts < self.max_attempts:
+                appointment.calendar_sync_status = CalendarSyncStatus.RETRYING
+                appointment.calendar_sync_error = result.get("error")
+                self.stats["retried"] += 1
+                self._requeue(appointment, self._backoff(appointment.calendar_sync_attempts))
+            else:
+                appointment.calendar_sync_status = CalendarSyncStatus.FAILED
+                appointment.calendar_sync_error = result.get("error")
+                self.stats["failed"] += 1
+                logger.warning("Calendar sync failed for task %s: %s", appointment.task_id, result.get("error"))
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def wait_for_change(self, timeout: float) -> bool:
+        """Wait until any write settles or is retried. False on timeout."""
+        async with self._changed:
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+                return True
+            except asyncio.TimeoutError:
+                return False
+
+    async def close(self, drain_timeout: float = 5.0) -> None:
+        try:
+            await asyncio.wait_for(self._queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Calendar writer closed with %d writes still queued", self._queue.qsize())
+        for handle in list(self._retries):
+            handle.cancel()
+        if self._retries:
+            logger.warning("Calendar writer dropped %d scheduled retries on shutdown", len(self._retries))
+        self._retries.clear()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+
+
+_writer: Optional[CalendarWriter] = None
+
+
+def get_calendar_writer() -> CalendarWriter:
+    """The process-wide writer; must be first called on the running event loop."""
+    global _writer
+    if _writer is None:
+        s = get_settings()
+        _writer = CalendarWriter(
+            batch_size=getattr(s, "calendar_write_batch_size", 50),
+            linger_seconds=getattr(s, "calendar_write_linger_seconds", 0.05),
+            max_attempts=getattr(s, "calendar_write_max_attempts", 5),
+            backoff_seconds=getattr(s, "calendar_write_backoff_seconds", 1.0),
+        )
+    return _writer
+
+
+async def close_calendar_writer() -> None:
+    global _writer
+    if _writer is not None:
+        await _writer.close()
+        _writer = None
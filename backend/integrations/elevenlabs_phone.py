@@ -3,8 +3,9 @@ from __future__ import annotations
 from typing import Any, Optional
 
 from app.config import get_settings
+from core.tracing import span
 
-OUTBOUND_URL = "https://api.elevenlabs.io/v1/convai/twilio/outbound-call"
+OUTBOUND_PATH = "/v1/convai/twilio/outbound-call"
 
 
 def is_outbound_configured() -> bool:
@@ -16,27 +17,23 @@ def is_outbound_configured() -> bool:
     )
 
 
-def start_outbound_call(to_number: str) -> dict[str, Any]:
+def _failure(message: str) -> dict[str, Any]:
+    return {
+        "success": False,
+        "message": message,
+        "callSid": None,
+        "conversation_id": None,
+    }
+
+
+def _outbound_request(to_number: str) -> tuple[Optional[str], dict[str, Any], dict[str, str]]:
     s = get_settings()
     api_key = s.elevenlabs_api_key or ""
     agent_id = s.elevenlabs_agent_id or ""
     phone_id = getattr(s, "elevenlabs_agent_phone_number_id", None) or ""
     if not all([api_key, agent_id, phone_id]):
-        return {
-            "success": False,
-            "message": "Outbound calls not configured: set ELEVENLABS_API_KEY, ELEVENLABS_AGENT_ID, ELEVENLABS_AGENT_PHONE_NUMBER_ID",
-            "callSid": None,
-            "conversation_id": None,
-        }
-    try:
-        import httpx
-    except ImportError:
-        return {
-            "success": False,
-            "message": "httpx required for outbound calls: pip install httpx",
-            "callSid": None,
-            "conversation_id": None,
-        }
+        return None, {}, {}
+    base_url = (getattr(s, "elevenlabs_api_base_url", None) or "https://api.elevenlabs.io").rstrip("/")
     payload = {
         "agent_id": agent_id,
         "agent_phone_number_id": phone_id,
@@ -46,25 +43,54 @@ def start_outbound_call(to_number: str) -> dict[str, Any]:
         "xi-api-key": api_key,
         "Content-Type": "application/json",
     }
-    with httpx.Client(timeout=15.0) as client:
-        resp = client.post(OUTBOUND_URL, json=payload, headers=headers)
-    try:
-        data = resp.json()
-    except Exception:
+    return base_url + OUTBOUND_PATH, payload, headers
+
+
+def _parse_outbound_response(status_code: int, data: Any) -> dict[str, Any]:
+    if not isinstance(data, dict):
         data = {}
-    if resp.status_code == 200:
+    if status_code == 200:
         return {
             "success": data.get("success", True),
             "message": data.get("message", "Call initiated"),
             "callSid": data.get("callSid"),
             "conversation_id": data.get("conversation_id"),
         }
-    detail = data.get("detail", data.get("message", f"HTTP {resp.status_code}"))
+    detail = data.get("detail", data.get("message", f"HTTP {status_code}"))
     if isinstance(detail, list) and detail:
         detail = detail[0].get("msg", str(detail[0])) if isinstance(detail[0], dict) else str(detail[0])
-    return {
-        "success": False,
-        "message": str(detail) if detail else f"HTTP {resp.status_code}",
-        "callSid": None,
-        "conversation_id": None,
-    }
+    return _failure(str(detail) if detail else f"HTTP {status_code}")
+
+
+async def start_outbound_call_async(
+    to_number: str,
+    client: Any = None,
+    timeout: Optional[float] = None,
+) -> dict[str, Any]:
+    """
+    Ask ElevenLabs to place one outbound call, on a pooled httpx.AsyncClient
+    (the shared integrations client by default). Calls are placed through
+    telephony.dialer, which supplies its own client and enforces the limits.
+    """
+    url, payload, headers = _outbound_request(to_number)
+    if not url:
+        return _failure(
+            "Outbound calls not configured: set ELEVENLABS_API_KEY, ELEVENLABS_AGENT_ID, ELEVENLABS_AGENT_PHONE_NUMBER_ID"
+        )
+    kwargs: dict[str, Any] = {}
+    if client is None:
+        from integrations.http import call_timeout, get_async_client
+        client = get_async_client()
+        kwargs["timeout"] = call_timeout(timeout if timeout is not None else 15.0)
+    elif timeout is not None:
+        kwargs["timeout"] = timeout
+    try:
+        with span("elevenlabs.outbound_call", "integration"):
+            resp = await client.post(url, json=payload, headers=headers, **kwargs)
+    except Exception as e:
+        return _failure(str(e) or type(e).__name__)
+    try:
+        data = resp.json()
+    except Exception:
+        data = {}
+    return _parse_outbound_response(resp.status_code, data)
@@ -0,0 +1,291 @@
+"""
+Batched freebusy lookups across many calendars.
+
+The Calendar freebusy endpoint accepts up to 50 calendar ids per query. Larger
+sets are split into chunks that go out together as one HTTP batch request, so
+a whole provider set costs a single round trip. Busy periods come back merged
+into sorted, non-overlapping intervals per calendar, and each calendar's
+intervals are cached for a short TTL over an hour-aligned window. Repeated
+lookups during a swarm then hit the cache. The async variants share the cache
+and send the chunks concurrently over the shared httpx client instead.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, Optional
+
+from app.config import get_settings
+from core.tracing import span
+from integrations.google_calendar import _get_service, freebusy_query_async, is_google_calendar_configured
+
+FREEBUSY_MAX_CALENDARS = 50
+
+Interval = tuple[datetime, datetime]
+
+
+def _utc(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def _parse(value: str) -> datetime:
+    return _utc(datetime.fromisoformat(value.replace("Z", "+00:00")))
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> list[Interval]:
+    merged: list[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def clip(intervals: list[Interval], time_min: datetime, time_max: datetime) -> list[Interval]:
+    return [(max(s, time_min), min(e, time_max)) for s, e in intervals if s < time_max and e > time_min]
+
+
+def as_busy_list(intervals: list[Interval]) -> list[dict[str, str]]:
+    return [{"start": s.isoformat(), "end": e.isoformat()} for s, e in intervals]
+
+
+class _Entry:
+    __slots__ = ("window_min", "window_max", "busy", "error", "fetched_at")
+
+    def __init__(self, window_min: datetime, window_max: datetime, busy: list[Interval], error: Optional[str]) -> None:
+        self.window_min = window_min
+        self.window_max = window_max
+        self.busy = busy
+        self.error = error
+        self.fetched_at = time.monotonic()
+
+
+class FreeBusyService:
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 10000) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._cache: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "round_trips": 0}
+
+    @staticmethod
+    def _window(time_min: datetime, time_max: datetime) -> Interval:
+        start = _utc(time_min).replace(minute=0, second=0, microsecond=0)
+        end = _utc(time_max)
+        if end.minute or end.second or end.microsecond:
+            end = end.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        return start, end
+
+    def _cached(self, cid: str, time_min: datetime, time_max: datetime, now: float) -> Optional[_Entry]:
+        entry = self._cache.get(cid)
+        if entry is None or now - entry.fetched_at > self.ttl_seconds:
+            return None
+        if entry.window_min <= time_min and entry.window_max >= time_max:
+            return entry
+        return None
+
+    @staticmethod
+    def _chunks(calendar_ids: list[str]) -> list[list[str]]:
+        return [calendar_ids[i:i + FREEBUSY_MAX_CALENDARS] for i in range(0, len(calendar_ids), FREEBUSY_MAX_CALENDARS)]
+
+    @staticmethod
+    def _body(chunk: list[str], window: Interval) -> dict[str, Any]:
+        return {
+            "timeMin": window[0].isoformat(),
+            "timeMax": window[1].isoformat(),
+            "items": [{"id": cid} for cid in chunk],
+        }
+
+    def _entries(
+        self,
+        chunks: list[list[str]],
+        responses: list[Any],
+        errors: list[Optional[str]],
+        window: Interval,
+    ) -> dict[str, _Entry]:
+        with self._lock:
+            self.stats["round_trips"] += 1
+        entries: dict[str, _Entry] = {}
+        for i, chunk in enumerate(chunks):
+            calendars = (responses[i] or {}).get("calendars", {})
+            for cid in chunk:
+                data = calendars.get(cid) or {}
+                error = errors[i]
+                if data.get("errors"):
+                    error = ", ".join(str(e.get("reason", e)) for e in data["errors"])
+                busy = merge_intervals((_parse(b["start"]), _parse(b["end"])) for b in data.get("busy", []))
+                entries[cid] = _Entry(window[0], window[1], busy, error)
+        return entries
+
+    def _fetch(self, calendar_ids: list[str], window: Interval) -> dict[str, _Entry]:
+        service = _get_service()
+        chunks = self._chunks(calendar_ids)
+        responses: list[Any] = [None] * len(chunks)
+        errors: list[Optional[str]] = [None] * len(chunks)
+        with span("google_calendar.freebusy", "integration", calendars=len(calendar_ids), chunks=len(chunks)):
+            try:
+                if len(chunks) == 1:
+                    responses[0] = service.freebusy().query(body=self._body(chunks[0], window)).execute()
+                else:
+                    def on_response(request_id: str, response: Any, exception: Any) -> None:
+                        i = int(request_id)
+                        responses[i] = response
+                        errors[i] = str(exception) if exception is not None else None
+
+                    batch = service.new_batch_http_request(callback=on_response)
+                    for i, chunk in enumerate(chunks):
+                        batch.add(service.freebusy().query(body=self._body(chunk, window)), request_id=str(i))
+                    batch.execute()
+            except Exception as e:
+                errors = [str(e)] * len(chunks)
+        return self._entries(chunks, responses, errors, window)
+
+    async def _fetch_async(self, calendar_ids: list[str], window: Interval, timeout: Optional[float]) -> dict[str, _Entry]:
+        chunks = self._chunks(calendar_ids)
+
+        async def one(chunk: list[str]) -> tuple[Any, Optional[str]]:
+            try:
+                return await freebusy_query_async(self._body(chunk, window), timeout=timeout), None
+            except Exception as e:
+                return None, str(e) or type(e).__name__
+
+        # Chunks go out concurrently on the pooled client: one round trip of latency.
+        with span("google_calendar.freebusy", "integration", calendars=len(calendar_ids), chunks=len(chunks)):
+            results = await asyncio.gather(*(one(c) for c in chunks))
+        return self._entries(chunks, [r for r, _ in results], [e for _, e in results], window)
+
+    def _partition(self, ids: list[str], tmin: datetime, tmax: datetime) -> tuple[dict[str, _Entry], list[str]]:
+        now = time.monotonic()
+        found: dict[str, _Entry] = {}
+        missing: list[str] = []
+        with self._lock:
+            for cid in ids:
+                entry = self._cached(cid, tmin, tmax, now)
+                if entry is not None:
+                    found[cid] = entry
+                else:
+                    missing.append(cid)
+            self.stats["hits"] += len(found)
+            self.stats["misses"] += len(missing)
+        return found, missing
+
+    def _store(self, fetched: dict[str, _Entry]) -> None:
+        with self._lock:
+            for cid, entry in fetched.items():
+                if entry.error is None:
+                    self._cache[cid] = entry
+            if len(self._cache) > self.max_entries:
+                oldest = sorted(self._cache.items(), key=lambda kv: kv[1].fetched_at)
+                for cid, _ in oldest[: len(self._cache) - self.max_entries]:
+                    del self._cache[cid]
+
+    @staticmethod
+    def _result(ids: list[str], found: dict[str, _Entry], tmin: datetime, tmax: datetime) -> dict[str, dict[str, Any]]:
+        return {
+            cid: {"busy": clip(found[cid].busy, tmin, tmax), "error": found[cid].error}
+            for cid in ids
+        }
+
+    def query(
+        self,
+        calendar_ids: Iterable[str],
+        time_min: datetime,
+        time_max: datetime,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Busy intervals per calendar id within [time_min, time_max], as
+        {"busy": [(start, end), ...], "error": str | None}. Uncached calendars
+        are fetched together in one round trip.
+        """
+        ids = list(dict.fromkeys(c for c in calendar_ids if c))
+        tmin, tmax = _utc(time_min), _utc(time_max)
+        found, missing = self._partition(ids, tmin, tmax)
+        if missing:
+            fetched = self._fetch(missing, self._window(tmin, tmax))
+            self._store(fetched)
+            found.update(fetched)
+        return self._result(ids, found, tmin, tmax)
+
+    async def query_async(
+        self,
+        calendar_ids: Iterable[str],
+        time_min: datetime,
+        time_max: datetime,
+        timeout: Optional[float] = None,
+    ) -> dict[str, dict[str, Any]]:
+        ids = list(dict.fromkeys(c for c in calendar_ids if c))
+        tmin, tmax = _utc(time_min), _utc(time_max)
+        found, missing = self._partition(ids, tmin, tmax)
+        if missing:
+            fetched = await self._fetch_async(missing, self._window(tmin, tmax), timeout)
+            self._store(fetched)
+            found.update(fetched)
+        return self._result(ids, found, tmin, tmax)
+
+    def invalidate(self, calendar_id: Optional[str] = None) -> None:
+        with self._lock:
+            if calendar_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(calendar_id, None)
+
+
+_service: Optional[FreeBusyService] = None
+_service_lock = threading.Lock()
+
+
+def get_freebusy_service() -> FreeBusyService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = FreeBusyService(ttl_seconds=getattr(get_settings(), "freebusy_cache_ttl_seconds", 30.0))
+    return _service
+
+
+def _shape(results: dict[str, dict[str, Any]]) -> dict[str, Any]:
+    calendars: dict[str, Any] = {}
+    for cid, r in results.items():
+        calendars[cid] = {"busy": as_busy_list(r["busy"])}
+        if r["error"]:
+            calendars[cid]["error"] = r["error"]
+    return {"ok": all(not r["error"] for r in results.values()), "calendars": calendars}
+
+
+def _mock(ids: list[str]) -> dict[str, Any]:
+    return {
+        "ok": True,
+        "calendars": {cid: {"busy": []} for cid in ids},
+        "message": "Google Calendar not configured; using mock.",
+    }
+
+
+def get_freebusy_many(
+    calendar_ids: Iterable[str],
+    time_min: datetime,
+    time_max: datetime,
+) -> dict[str, Any]:
+    """
+    Freebusy for many calendars at once, shaped like get_freebusy:
+    {"ok": bool, "calendars": {calendar_id: {"busy": [{start, end}], "error"?}}}.
+    """
+    ids = list(dict.fromkeys(c for c in calendar_ids if c))
+    if not is_google_calendar_configured() or _get_service() is None:
+        return _mock(ids)
+    return _shape(get_freebusy_service().query(ids, time_min, time_max))
+
+
+async def get_freebusy_many_async(
+    calendar_ids: Iterable[str],
+    time_min: datetime,
+    time_max: datetime,
+    timeout: Optional[float] = None,
+) -> dict[str, Any]:
+    ids = list(dict.fromkeys(c for c in calendar_ids if c))
+    if not is_google_calendar_configured():
+        return _mock(ids)
+    return _shape(await get_freebusy_service().query_async(ids, time_min, time_max, timeout=timeout))
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+import json
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Optional
+from urllib.parse import quote
 
 from app.config import get_settings
+from core.executors import INTEGRATIONS, run_in
+from core.tracing import span
+from integrations.http import call_timeout, get_async_client
+
+CALENDAR_API_URL = "https://www.googleapis.com/calendar/v3"
 
 
 def is_google_calendar_configured() -> bool:
@@ -15,21 +23,43 @@ def is_google_calendar_configured() -> bool:
     return p.is_file()
 
 
+_credentials = None
+_credentials_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+# googleapiclient services wrap a non-thread-safe httplib2.Http, so each thread builds its own.
+_local = threading.local()
+
+
+def _get_credentials():
+    global _credentials
+    if _credentials is None:
+        with _credentials_lock:
+            if _credentials is None:
+                from google.oauth2 import service_account
+                s = get_settings()
+                path = Path(s.google_credentials_path).expanduser()
+                _credentials = service_account.Credentials.from_service_account_file(
+                    str(path),
+                    scopes=["https://www.googleapis.com/auth/calendar", "https://www.googleapis.com/auth/calendar.events"],
+                )
+    return _credentials
+
+
 def _get_service():
     if not is_google_calendar_configured():
         return None
+    service = getattr(_local, "service", None)
+    if service is not None:
+        return service
     try:
-        from google.oauth2 import service_account
         from googleapiclient.discovery import build
+        credentials = _get_credentials()
     except ImportError:
         return None
-    s = get_settings()
-    path = Path(s.google_credentials_path).expanduser()
-    creds = service_account.Credentials.from_service_account_file(
-        str(path),
-        scopes=["https://www.googleapis.com/auth/calendar", "https://www.googleapis.com/auth/calendar.events"],
-    )
-    return build("calendar", "v3", credentials=creds)
+    with span("google_calendar.build_service", "integration"):
+        service = build("calendar", "v3", credentials=credentials, cache_discovery=False)
+    _local.service = service
+    return service
 
 
 def get_freebusy(
@@ -41,18 +71,14 @@ def get_freebusy(
     cid = calendar_id or get_settings().google_calendar_id or "primary"
     if not service:
         return {"ok": True, "busy": [], "message": "Google Calendar not configured; using mock."}
+    from integrations.freebusy import get_freebusy_many
     try:
-        tmin = time_min.isoformat() + "Z" if time_min.tzinfo is None else time_min.isoformat()
-        tmax = time_max.isoformat() + "Z" if time_max.tzinfo is None else time_max.isoformat()
-        body = {"timeMin": tmin, "timeMax": tmax, "items": [{"id": cid}]}
-        result = service.freebusy().query(body=body).execute()
-        busy = []
-        for cal, data in result.get("calendars", {}).items():
-            for item in data.get("busy", []):
-                busy.append({"start": item["start"], "end": item["end"]})
-        return {"ok": True, "busy": busy}
+        cal = get_freebusy_many([cid], time_min, time_max)["calendars"].get(cid) or {}
     except Exception as e:
         return {"ok": False, "error": str(e), "busy": []}
+    if cal.get("error"):
+        return {"ok": False, "error": cal["error"], "busy": []}
+    return {"ok": True, "busy": cal.get("busy", [])}
 
 
 def get_available_slots(
@@ -65,7 +91,15 @@ def get_available_slots(
     Return list of free slots {start_iso, end_iso} in the window, excluding busy periods.
     Slot length = duration_minutes.
     """
-    fb = get_freebusy(time_min, time_max, calendar_id)
+    return _slots_from_freebusy(get_freebusy(time_min, time_max, calendar_id), time_min, time_max, duration_minutes)
+
+
+def _slots_from_freebusy(
+    fb: dict[str, Any],
+    time_min: datetime,
+    time_max: datetime,
+    duration_minutes: int,
+) -> list[dict[str, str]]:
     if not fb.get("ok"):
         return []
     busy_list = fb.get("busy") or []
@@ -97,13 +131,197 @@ def create_event(
     if not service or not start_iso or not end_iso:
         return {"ok": False, "error": "Calendar not configured or missing start/end"}
     try:
-        body = {
-            "summary": summary,
-            "description": description,
-            "start": {"dateTime": start_iso, "timeZone": "UTC"},
-            "end": {"dateTime": end_iso, "timeZone": "UTC"},
-        }
-        event = service.events().insert(calendarId=cid, body=body).execute()
+        body = _event_body(start_iso, end_iso, summary, description)
+        with span("google_calendar.insert", "integration"):
+            event = service.events().insert(calendarId=cid, body=body).execute()
         return {"ok": True, "event_id": event.get("id"), "html_link": event.get("htmlLink", "")}
     except Exception as e:
         return {"ok": False, "error": str(e)}
+
+
+# Calendar API batch requests accept up to 50 calls each.
+BATCH_MAX_REQUESTS = 50
+_RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+# A 403 is usually final (no access to the calendar); only these reasons mean "slow down".
+_RATE_LIMIT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded")
+
+
+def _error_reasons(payload: Any) -> list[str]:
+    """The `reason` of each entry in a Google API error body (JSON text, bytes or parsed)."""
+    if isinstance(payload, (bytes, str)):
+        try:
+            payload = json.loads(payload)
+        except ValueError:
+            return []
+    error = payload.get("error") if isinstance(payload, dict) else None
+    errors = error.get("errors") if isinstance(error, dict) else None
+    return [e.get("reason", "") for e in errors or () if isinstance(e, dict)]
+
+
+def _is_retryable(status: Optional[int], payload: Any = None) -> bool:
+    if status is None:
+        return True
+    if int(status) == 403:
+        return any(r in _RATE_LIMIT_REASONS for r in _error_reasons(payload))
+    return int(status) in _RETRYABLE_STATUS
+
+
+def _event_body(start_iso: str, end_iso: str, summary: str, description: str) -> dict[str, Any]:
+    return {
+        "summary": summary,
+        "description": description,
+        "start": {"dateTime": start_iso, "timeZone": "UTC"},
+        "end": {"dateTime": end_iso, "timeZone": "UTC"},
+    }
+
+
+def _error_result(error: Exception) -> dict[str, Any]:
+    status = getattr(getattr(error, "resp", None), "status", None)
+    return {"ok": False, "error": str(error), "retryable": _is_retryable(status, getattr(error, "content", None))}
+
+
+def create_events_batch(
+    events: list[dict[str, Any]],
+    calendar_id: Optional[str] = None,
+) -> list[dict[str, Any]]:
+    """
+    Insert events with Calendar batch requests (BATCH_MAX_REQUESTS per HTTP call).
+    Each event is a dict of create_event's keyword arguments plus an optional
+    client-chosen `event_id`; one result per event, in order, shaped like
+    create_event's plus a `retryable` flag on errors.
+    """
+    service = _get_service()
+    cid = calendar_id or get_settings().google_calendar_id or "primary"
+    if not service:
+        return [{"ok": False, "error": "Calendar not configured", "retryable": False} for _ in events]
+    results: list[dict[str, Any]] = [{} for _ in events]
+
+    def on_response(request_id: str, response: Any, exception: Any) -> None:
+        i = int(request_id)
+        status = getattr(getattr(exception, "resp", None), "status", None)
+        if exception is not None and status is not None and int(status) == 409 and events[i].get("event_id"):
+            # The event id already exists: an earlier attempt went through.
+            results[i] = {"ok": True, "event_id": events[i]["event_id"], "html_link": "", "duplicate": True}
+        elif exception is not None:
+            results[i] = _error_result(exception)
+        else:
+            results[i] = {"ok": True, "event_id": response.get("id"), "html_link": response.get("htmlLink", "")}
+
+    for offset in range(0, len(events), BATCH_MAX_REQUESTS):
+        chunk = events[offset:offset + BATCH_MAX_REQUESTS]
+        batch = service.new_batch_http_request(callback=on_response)
+        for i, ev in enumerate(chunk, start=offset):
+            if not ev.get("start_iso") or not ev.get("end_iso"):
+                results[i] = {"ok": False, "error": "Missing start/end", "retryable": False}
+                continue
+            body = _event_body(ev["start_iso"], ev["end_iso"], ev.get("summary", "CallPilot appointment"), ev.get("description", ""))
+            if ev.get("event_id"):
+                body["id"] = ev["event_id"]
+            batch.add(service.events().insert(calendarId=ev.get("calendar_id") or cid, body=body), request_id=str(i))
+        try:
+            with span("google_calendar.insert_batch", "integration", events=len(chunk)):
+                batch.execute()
+        except Exception as e:
+            for i in range(offset, offset + len(chunk)):
+                if not results[i]:
+                    results[i] = _error_result(e)
+    return results
+
+
+# Async counterparts: plain Calendar REST calls on the shared httpx.AsyncClient,
+# authorized with the same service-account credentials as the discovery client.
+
+
+def _fresh_token() -> str:
+    credentials = _get_credentials()
+    with _refresh_lock:
+        if not credentials.valid:
+            import httplib2
+            from google_auth_httplib2 import Request
+            credentials.refresh(Request(httplib2.Http()))
+    return credentials.token
+
+
+async def _auth_headers() -> dict[str, str]:
+    credentials = _credentials
+    if credentials is not None and credentials.valid:
+        token = credentials.token
+    else:
+        # Loading the key file and refreshing the token are blocking; keep them off the loop.
+        token = await run_in(INTEGRATIONS, _fresh_token)
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def freebusy_query_async(body: dict[str, Any], timeout: Optional[float] = None) -> dict[str, Any]:
+    """Raw freeBusy.query response; raises on transport or HTTP errors."""
+    headers = await _auth_headers()
+    resp = await get_async_client().post(
+        f"{CALENDAR_API_URL}/freeBusy", json=body, headers=headers, timeout=call_timeout(timeout)
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
+async def get_freebusy_async(
+    time_min: datetime,
+    time_max: datetime,
+    calendar_id: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> dict[str, Any]:
+    cid = calendar_id or get_settings().google_calendar_id or "primary"
+    if not is_google_calendar_configured():
+        return {"ok": True, "busy": [], "message": "Google Calendar not configured; using mock."}
+    from integrations.freebusy import get_freebusy_many_async
+    try:
+        cal = (await get_freebusy_many_async([cid], time_min, time_max, timeout=timeout))["calendars"].get(cid) or {}
+    except Exception as e:
+        return {"ok": False, "error": str(e), "busy": []}
+    if cal.get("error"):
+        return {"ok": False, "error": cal["error"], "busy": []}
+    return {"ok": True, "busy": cal.get("busy", [])}
+
+
+async def get_available_slots_async(
+    time_min: datetime,
+    time_max: datetime,
+    duration_minutes: int = 30,
+    calendar_id: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> list[dict[str, str]]:
+    fb = await get_freebusy_async(time_min, time_max, calendar_id, timeout=timeout)
+    return _slots_from_freebusy(fb, time_min, time_max, duration_minutes)
+
+
+async def create_event_async(
+    calendar_id: Optional[str] = None,
+    start_iso: Optional[str] = None,
+    end_iso: Optional[str] = None,
+    summary: str = "CallPilot appointment",
+    description: str = "",
+    event_id: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> dict[str, Any]:
+    cid = calendar_id or get_settings().google_calendar_id or "primary"
+    if not is_google_calendar_configured() or not start_iso or not end_iso:
+        return {"ok": False, "error": "Calendar not configured or missing start/end"}
+    body = _event_body(start_iso, end_iso, summary, description)
+    if event_id:
+        body["id"] = event_id
+    try:
+        headers = await _auth_headers()
+        with span("google_calendar.insert", "integration"):
+            resp = await get_async_client().post(
+                f"{CALENDAR_API_URL}/calendars/{quote(cid, safe='')}/events", json=body, headers=headers, timeout=call_timeout(timeout)
+            )
+    except Exception as e:
+        return {"ok": False, "error": str(e) or type(e).__name__, "retryable": True}
+    if resp.status_code == 409 and event_id:
+        return {"ok": True, "event_id": event_id, "html_link": "", "duplicate": True}
+    if resp.status_code >= 400:
+        return {
+            "ok": False,
+            "error": f"Calendar API returned {resp.status_code}",
+            "retryable": _is_retryable(resp.status_code, resp.content),
+        }
+    event = resp.json()
+    return {"ok": True, "event_id": event.get("id"), "html_link": event.get("htmlLink", "")}
@@ -5,6 +5,8 @@ from typing import Any, Optional
 
 from app.config import get_settings
 from core.providers_loader import get_provider
+from core.tracing import span
+from integrations.http import call_timeout, get_async_client
 
 DISTANCE_MATRIX_URL = "https://maps.googleapis.com/maps/api/distancematrix/json"
 
@@ -23,10 +25,27 @@ def get_distance_matrix(origin: str, destination: str) -> dict[str, Any]:
         return {"ok": False, "error": "httpx required"}
     params = {"origins": origin, "destinations": destination, "key": api_key}
     try:
-        with httpx.Client(timeout=10.0) as client:
+        with span("google_maps.distance_matrix", "integration"), httpx.Client(timeout=10.0) as client:
             resp = client.get(DISTANCE_MATRIX_URL, params=params)
     except Exception as e:
         return {"ok": False, "error": str(e)}
+    return _parse_distance_response(resp)
+
+
+async def get_distance_matrix_async(origin: str, destination: str, timeout: Optional[float] = None) -> dict[str, Any]:
+    api_key = get_settings().google_maps_api_key
+    if not api_key:
+        return {"ok": False, "error": "Google Maps API key not configured"}
+    params = {"origins": origin, "destinations": destination, "key": api_key}
+    try:
+        with span("google_maps.distance_matrix", "integration"):
+            resp = await get_async_client().get(DISTANCE_MATRIX_URL, params=params, timeout=call_timeout(timeout))
+    except Exception as e:
+        return {"ok": False, "error": str(e) or type(e).__name__}
+    return _parse_distance_response(resp)
+
+
+def _parse_distance_response(resp: Any) -> dict[str, Any]:
     if resp.status_code != 200:
         return {"ok": False, "error": f"Maps API returned {resp.status_code}"}
     try:
@@ -55,15 +74,29 @@ def get_distance_matrix(origin: str, destination: str) -> dict[str, Any]:
     }
 
 
+def _lookup_provider(provider_id: str, providers_path: Optional[Path]) -> Any:
+    settings = get_settings()
+    path = providers_path or settings.providers_json_path
+    path = Path(path) if path else path
+    return get_provider(path, provider_id) if path and path.exists() else None
+
+
+def _local_distance(provider_id: str, prov: Any) -> dict[str, Any]:
+    return {
+        "ok": True,
+        "provider_id": provider_id,
+        "distance_km": prov.distance_km,
+        "duration_minutes": max(1, int(prov.distance_km * 2.5)),
+        "source": "local",
+    }
+
+
 def get_provider_distance(
     provider_id: str,
     origin: Optional[str] = None,
     providers_path: Optional[Path] = None,
 ) -> dict[str, Any]:
-    settings = get_settings()
-    path = providers_path or settings.providers_json_path
-    path = Path(path) if path else path
-    prov = get_provider(path, provider_id) if path and path.exists() else None
+    prov = _lookup_provider(provider_id, providers_path)
     if not prov:
         return {"ok": False, "error": "Provider not found", "provider_id": provider_id}
     dest = prov.address
@@ -72,10 +105,22 @@ def get_provider_distance(
         if out.get("ok"):
             out["provider_id"] = provider_id
             return out
-    return {
-        "ok": True,
-        "provider_id": provider_id,
-        "distance_km": prov.distance_km,
-        "duration_minutes": max(1, int(prov.distance_km * 2.5)),
-        "source": "local",
-    }
+    return _local_distance(provider_id, prov)
+
+
+async def get_provider_distance_async(
+    provider_id: str,
+    origin: Optional[str] = None,
+    providers_path: Optional[Path] = None,
+    timeout: Optional[float] = None,
+) -> dict[str, Any]:
+    prov = _lookup_provider(provider_id, providers_path)
+    if not prov:
+        return {"ok": False, "error": "Provider not found", "provider_id": provider_id}
+    dest = prov.address
+    if origin and dest and is_google_maps_configured():
+        out = await get_distance_matrix_async(origin, dest, timeout=timeout)
+        if out.get("ok"):
+            out["provider_id"] = provider_id
+            return out
+    return _local_distance(provider_id, prov)
@@ -4,11 +4,36 @@ from pathlib import Path
 from typing import Any, Optional
 
 from app.config import get_settings
+from core.tracing import span
+from integrations.http import call_timeout, get_async_client
 
 def is_google_places_configured() -> bool:
     return bool(get_settings().google_places_api_key)
 
 
+PLACE_DETAILS_URL = "https://places.googleapis.com/v1/places/{place_id}"
+
+
+def _place_request(place_id: str, api_key: str) -> tuple[str, dict[str, str]]:
+    url = PLACE_DETAILS_URL.format(place_id=place_id)
+    headers = {"X-Goog-Api-Key": api_key, "X-Goog-FieldMask": "rating,userRatingCount"}
+    return url, headers
+
+
+def _parse_place_response(resp: Any) -> dict[str, Any]:
+    if resp.status_code != 200:
+        return {"ok": False, "error": f"Places API returned {resp.status_code}"}
+    try:
+        data = resp.json()
+    except Exception:
+        return {"ok": False, "error": "Invalid JSON response"}
+    rating = data.get("rating")
+    total = data.get("userRatingCount", 0)
+    if rating is None:
+        return {"ok": True, "rating": None, "user_ratings_total": total, "message": "No rating for this place"}
+    return {"ok": True, "rating": float(rating), "user_ratings_total": int(total)}
+
+
 def get_place_rating_by_place_id(place_id: str) -> dict[str, Any]:
     api_key = get_settings().google_places_api_key
     if not api_key:
@@ -17,24 +42,26 @@ def get_place_rating_by_place_id(place_id: str) -> dict[str, Any]:
         import httpx
     except ImportError:
         return {"ok": False, "error": "httpx required"}
-    url = f"https://places.googleapis.com/v1/places/{place_id}"
-    headers = {"X-Goog-Api-Key": api_key, "X-Goog-FieldMask": "rating,userRatingCount"}
+    url, headers = _place_request(place_id, api_key)
     try:
-        with httpx.Client(timeout=10.0) as client:
+        with span("google_places.place_details", "integration"), httpx.Client(timeout=10.0) as client:
             resp = client.get(url, headers=headers)
     except Exception as e:
         return {"ok": False, "error": str(e)}
-    if resp.status_code != 200:
-        return {"ok": False, "error": f"Places API returned {resp.status_code}"}
+    return _parse_place_response(resp)
+
+
+async def get_place_rating_by_place_id_async(place_id: str, timeout: Optional[float] = None) -> dict[str, Any]:
+    api_key = get_settings().google_places_api_key
+    if not api_key:
+        return {"ok": False, "error": "Google Places API key not configured"}
+    url, headers = _place_request(place_id, api_key)
     try:
-        data = resp.json()
-    except Exception:
-        return {"ok": False, "error": "Invalid JSON response"}
-    rating = data.get("rating")
-    total = data.get("userRatingCount", 0)
-    if rating is None:
-        return {"ok": True, "rating": None, "user_ratings_total": total, "message": "No rating for this place"}
-    return {"ok": True, "rating": float(rating), "user_ratings_total": int(total)}
+        with span("google_places.place_details", "integration"):
+            resp = await get_async_client().get(url, headers=headers, timeout=call_timeout(timeout))
+    except Exception as e:
+        return {"ok": False, "error": str(e) or type(e).__name__}
+    return _parse_place_response(resp)
 
 
 def get_provider_rating(provider_id: str, providers_path: Optional[Path] = None) -> dict[str, Any]:
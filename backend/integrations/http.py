@@ -0,0 +1,45 @@
+"""
+Shared httpx.AsyncClient for the async integration functions.
+
+One pooled client serves Places, Distance Matrix, Calendar REST and ElevenLabs
+calls made from request handlers, so connections (and TLS sessions) are reused
+across webhooks. Each call passes its own timeout; the client default is only
+a backstop.
+"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from app.config import get_settings
+
+_client: Any = None
+
+
+def get_async_client() -> Any:
+    """The shared client; create it from the running event loop."""
+    global _client
+    if _client is None:
+        import httpx
+        s = get_settings()
+        max_connections = int(getattr(s, "integration_http_max_connections", 100))
+        _client = httpx.AsyncClient(
+            timeout=float(getattr(s, "integration_timeout_seconds", 10.0)),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max(1, max_connections // 2),
+            ),
+        )
+    return _client
+
+
+def call_timeout(override: Optional[float] = None) -> float:
+    if override is not None:
+        return override
+    return float(getattr(get_settings(), "integration_timeout_seconds", 10.0))
+
+
+async def close_async_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Dial many practices in parallel against a local telephony stand-in.")
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--base-url", default="http://127.0.0.1:5055")
+    parser.add_argument("--backend", choices=["elevenlabs", "twilio"], default="elevenlabs")
+    parser.add_argument("--cps", type=float, default=100.0, help="Calls per second")
+    parser.add_argument("--max-concurrent", type=int, default=100)
+    args = parser.parse_args()
+
+    os.environ.setdefault("ELEVENLABS_API_KEY", "standin")
+    os.environ.setdefault("ELEVENLABS_AGENT_ID", "standin-agent")
+    os.environ.setdefault("ELEVENLABS_AGENT_PHONE_NUMBER_ID", "standin-phone")
+    os.environ.setdefault("TWILIO_ACCOUNT_SID", "ACstandin")
+    os.environ.setdefault("TWILIO_AUTH_TOKEN", "standin")
+    os.environ.setdefault("TWILIO_PHONE_NUMBER", "+15550000000")
+    os.environ["ELEVENLABS_API_BASE_URL"] = args.base_url
+    os.environ["TWILIO_API_BASE_URL"] = args.base_url
+
+    from core.schemas import OutboundCallStatus
+    from telephony.dialer import OutboundDialer
+
+    async def run() -> None:
+        dialer = OutboundDialer(
+            backend=args.backend,
+            calls_per_second=args.cps,
+            max_concurrent=args.max_concurrent,
+        )
+        targets = [(f"practice-{i:05d}", f"+1555{i:07d}") for i in range(args.count)]
+        started = time.perf_counter()
+        try:
+            calls = await dialer.dial_many(targets)
+        finally:
+            await dialer.aclose()
+        elapsed = time.perf_counter() - started
+        ok = sum(1 for c in calls if c.status == OutboundCallStatus.INITIATED)
+        latencies = sorted(c.latency_ms or 0.0 for c in calls)
+        p50 = latencies[len(latencies) // 2] if latencies else 0.0
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0
+        print(f"Dialed {len(calls)} practices in {elapsed:.2f}s ({len(calls) / elapsed:.1f} calls/s)")
+        print(f"Initiated: {ok}, failed: {len(calls) - ok}, request p50={p50:.1f}ms p99={p99:.1f}ms")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
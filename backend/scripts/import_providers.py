@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stream a providers JSONL (or JSON array) file into a SQLite catalog.")
+    parser.add_argument("source", help="Providers .jsonl (one object per line) or .json array")
+    parser.add_argument("db", help="Catalog database to create, e.g. data/providers.db")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    from pathlib import Path
+
+    from core.catalog import import_providers
+
+    started = time.perf_counter()
+    result = import_providers(Path(args.source), Path(args.db), batch_size=args.batch_size)
+    elapsed = time.perf_counter() - started
+    print(f"Imported {result['imported']} providers ({result['skipped']} skipped) into {args.db} in {elapsed:.1f}s")
+    print(f"Set PROVIDERS_JSON_PATH={args.db} to serve from the catalog.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,462 @@
+"""
+End-to-end load test for the CallPilot HTTP API.
+
+Drives the real FastAPI app, either in-process through httpx's ASGI transport or
+over a localhost uvicorn server running on its own thread, with a weighted mix
+of single-agent tasks, swarm tasks and agent-tool webhook calls. Task clients
+either poll GET /tasks/{id} or follow GET /tasks/{id}/stream.
+
+Nothing leaves the machine: conversations run on the offline backend
+(CONVERSATION_BACKEND=offline), Places and Distance Matrix requests are answered
+by a stand-in transport on the shared integration client, and Google Calendar
+stays unconfigured so freebusy falls back to its mock.
+
+    python scripts/load_test.py --users 50 --duration 30 --mix single=2,swarm=1,webhook=6
+    python scripts/load_test.py --server uvicorn --client stream --json load-report.json
+
+In-process mode shares one event loop between the load generator and the app,
+so its loop-lag figures include client work; uvicorn mode probes the server's
+loop only.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import threading
+import time
+from typing import Any, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TERMINAL = ("completed", "failed", "cancelled")
+WEBHOOKS = ("rating", "distance", "availability")
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    mix: dict[str, float] = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("single", "swarm", "first_acceptable", "webhook"):
+            raise argparse.ArgumentTypeError(
+                f"Unknown workload '{name}' (expected single, swarm, first_acceptable or webhook)"
+            )
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("Mix needs at least one positive weight")
+    return mix
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, IndexError):
+        # Peak rather than current RSS, but still shows growth.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+class Stats:
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.requests = 0
+        self.tasks_done = 0
+
+    def record(self, name: str, ms: float, ok: bool = True, request: bool = True) -> None:
+        self.latencies.setdefault(name, []).append(ms)
+        if not ok:
+            self.errors[name] = self.errors.get(name, 0) + 1
+        if request:
+            self.requests += 1
+
+    def summary(self, elapsed: float) -> dict[str, Any]:
+        out: dict[str, Any] = {}
+        for name in sorted(self.latencies):
+            values = self.latencies[name]
+            out[name] = {
+                "count": len(values),
+                "errors": self.errors.get(name, 0),
+                "per_second": round(len(values) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": round(percentile(values, 0.50), 2),
+                "p95_ms": round(percentile(values, 0.95), 2),
+                "p99_ms": round(percentile(values, 0.99), 2),
+                "max_ms": round(max(values), 2),
+            }
+        return out
+
+
+class LoopLagProbe:
+    """Sleeps for `interval` on the loop under test and records how late each wake-up is."""
+
+    def __init__(self, interval: float = 0.05) -> None:
+        self.interval = interval
+        self.samples: list[float] = []
+        self._cursor = 0
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, (loop.time() - start - self.interval) * 1000.0))
+
+    def window(self) -> list[float]:
+        end = len(self.samples)
+        values = self.samples[self._cursor:end]
+        self._cursor = end
+        return values
+
+
+def standin_transport(latency_ms: float) -> Any:
+    """Answers Places details and Distance Matrix requests like the Google APIs would."""
+    import httpx
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if latency_ms > 0:
+            await asyncio.sleep(latency_ms / 1000.0)
+        if "distancematrix" in request.url.path:
+            km = random.uniform(0.5, 25.0)
+            element = {"status": "OK", "distance": {"value": int(km * 1000)}, "duration": {"value": int(km * 150)}}
+            return httpx.Response(200, json={"status": "OK", "rows": [{"elements": [element]}]})
+        if request.url.host == "places.googleapis.com":
+            return httpx.Response(200, json={"rating": round(random.uniform(3.5, 5.0), 1), "userRatingCount": 120})
+        return httpx.Response(404, json={"error": "No stand-in for this endpoint"})
+
+    return httpx.MockTransport(handler)
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Point the app at the offline stand-ins; must run before the app (and its settings) are imported."""
+    os.environ["CONVERSATION_BACKEND"] = "offline"
+    os.environ["ASYNC_RUNNER_ENABLED"] = "true" if args.async_runner else "false"
+    os.environ["OFFLINE_RESPONSE_DELAY_SECONDS"] = str(args.turn_delay)
+    os.environ["SWARM_MAX_AGENTS"] = str(args.swarm_agents)
+    os.environ["GOOGLE_PLACES_API_KEY"] = "standin"
+    os.environ["GOOGLE_MAPS_API_KEY"] = "standin"
+    os.environ["GOOGLE_CREDENTIALS_PATH"] = ""
+    os.environ["SESSION_POOL_ENABLED"] = "false"
+    if args.providers:
+        os.environ["PROVIDERS_JSON_PATH"] = args.providers
+
+
+def install_standins(latency_ms: float) -> None:
+    import httpx
+    import integrations.http as integration_http
+
+    integration_http._client = httpx.AsyncClient(transport=standin_transport(latency_ms))
+
+
+class UvicornThread(threading.Thread):
+    """Serves the app on localhost from its own event loop, with a lag probe on that loop."""
+
+    def __init__(self, app: Any, port: int, probe: LoopLagProbe) -> None:
+        super().__init__(name="loadtest-uvicorn", daemon=True)
+        import uvicorn
+
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.probe = probe
+
+    def run(self) -> None:
+        async def serve() -> None:
+            probe_task = asyncio.create_task(self.probe.run())
+            try:
+                await self.server.serve()
+            finally:
+                probe_task.cancel()
+
+        asyncio.run(serve())
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.join(timeout=10)
+
+
+class LoadTest:
+    def __init__(self, args: argparse.Namespace, client: Any, probe: LoopLagProbe, provider_ids: list[str]) -> None:
+        self.args = args
+        self.client = client
+        self.probe = probe
+        self.provider_ids = provider_ids or ["dentist-001"]
+        self.stats = Stats()
+        self.timeline: list[dict[str, Any]] = []
+        self.lag_samples: list[float] = []
+        self._names = list(args.mix)
+        self._weights = [args.mix[n] for n in self._names]
+
+    async def _timed(self, name: str, method: str, url: str, **kwargs: Any) -> Optional[Any]:
+        start = time.perf_counter()
+        try:
+            resp = await self.client.request(method, url, **kwargs)
+        except Exception:
+            self.stats.record(name, (time.perf_counter() - start) * 1000.0, ok=False)
+            return None
+        self.stats.record(name, (time.perf_counter() - start) * 1000.0, ok=resp.status_code < 400)
+        return resp if resp.status_code < 400 else None
+
+    async def _follow_poll(self, task_id: str, deadline: float) -> Optional[str]:
+        while time.perf_counter() < deadline:
+            resp = await self._timed("task.poll", "GET", f"/api/v1/tasks/{task_id}")
+            if resp is not None and resp.json().get("status") in TERMINAL:
+                return resp.json()["status"]
+            await asyncio.sleep(self.args.poll_interval)
+        return None
+
+    async def _follow_stream(self, task_id: str, deadline: float) -> Optional[str]:
+        status = None
+        start = time.perf_counter()
+        try:
+            timeout = max(1.0, deadline - time.perf_counter())
+            async with self.client.stream(
+                "GET", f"/api/v1/tasks/{task_id}/stream", params={"timeout_seconds": timeout}, timeout=timeout + 5
+            ) as resp:
+                async for line in resp.aiter_lines():
+                    if line.startswith("data: "):
+                        status = json.loads(line[6:]).get("status")
+            ok = status in TERMINAL
+        except Exception:
+            ok = False
+        self.stats.record("task.stream", (time.perf_counter() - start) * 1000.0, ok=ok)
+        return status
+
+    async def _task(self, mode: str, rng: random.Random) -> None:
+        start = time.perf_counter()
+        body = {"user_request": {"message": "Cleaning appointment next week, mornings preferred", "mode": mode}}
+        resp = await self._timed("task.create", "POST", "/api/v1/tasks/", json=body)
+        if resp is None:
+            self.stats.record(f"task.{mode}", (time.perf_counter() - start) * 1000.0, ok=False, request=False)
+            return
+        task_id = resp.json()["task_id"]
+        deadline = start + self.args.task_timeout
+        streaming = self.args.client == "stream" or (self.args.client == "mixed" and rng.random() < 0.5)
+        if streaming:
+            status = await self._follow_stream(task_id, deadline)
+        else:
+            status = await self._follow_poll(task_id, deadline)
+        self.stats.record(f"task.{mode}", (time.perf_counter() - start) * 1000.0, ok=status == "completed", request=False)
+        self.stats.tasks_done += 1
+
+    async def _webhook(self, rng: random.Random) -> None:
+        kind = rng.choice(WEBHOOKS)
+        pid = rng.choice(self.provider_ids)
+        if kind == "rating":
+            body: dict[str, Any] = {"place_id": f"standin-{pid}"} if rng.random() < 0.5 else {"provider_id": pid}
+        elif kind == "distance":
+            body = {"provider_id": pid, "origin": "48.8566,2.3522"}
+        else:
+            body = {"provider_ids": rng.sample(self.provider_ids, min(5, len(self.provider_ids)))}
+        await self._timed(f"webhook.{kind}", "POST", f"/api/v1/agent-tools/{kind}", json=body)
+
+    async def _user(self, index: int, stop_at: float) -> None:
+        rng = random.Random(self.args.seed + index)
+        while time.perf_counter() < stop_at:
+            op = rng.choices(self._names, self._weights)[0]
+            if op == "webhook":
+                await self._webhook(rng)
+            else:
+                await self._task(op, rng)
+            if self.args.think_time > 0:
+                await asyncio.sleep(rng.uniform(0, 2 * self.args.think_time))
+
+    async def _sample(self, started: float) -> None:
+        from api.routes.tasks import _tasks
+        from core.executors import executor_stats
+
+        last_requests = 0
+        last_t = started
+        while True:
+            await asyncio.sleep(self.args.sample_interval)
+            now = time.perf_counter()
+            lag = self.probe.window()
+            self.lag_samples.extend(lag)
+            self.timeline.append({
+                "t": round(now - started, 2),
+                "rss_mb": round(rss_mb(), 1),
+                "tasks_stored": len(_tasks),
+                "requests_per_second": round((self.stats.requests - last_requests) / (now - last_t), 1),
+                "loop_lag_p99_ms": round(percentile(lag, 0.99), 2),
+                "loop_lag_max_ms": round(max(lag), 2) if lag else 0.0,
+                "executors": {
+                    name: {"active": g["active"], "queued": g["queued"]} for name, g in executor_stats().items()
+                },
+            })
+            if not self.args.quiet:
+                row = self.timeline[-1]
+                print(
+                    f"  t={row['t']:>6.1f}s  {row['requests_per_second']:>8.1f} req/s  "
+                    f"lag p99={row['loop_lag_p99_ms']:>7.2f}ms max={row['loop_lag_max_ms']:>7.2f}ms  "
+                    f"rss={row['rss_mb']:>7.1f}MB  tasks={row['tasks_stored']}",
+                    flush=True,
+                )
+            last_requests, last_t = self.stats.requests, now
+
+    async def run(self) -> dict[str, Any]:
+        rss_start = rss_mb()
+        started = time.perf_counter()
+        stop_at = started + self.args.duration
+        sampler = asyncio.create_task(self._sample(started))
+        users = []
+        for i in range(self.args.users):
+            users.append(asyncio.create_task(self._user(i, stop_at)))
+            if self.args.ramp > 0:
+                await asyncio.sleep(self.args.ramp / self.args.users)
+        await asyncio.gather(*users)
+        elapsed = time.perf_counter() - started
+        sampler.cancel()
+        self.lag_samples.extend(self.probe.window())
+        rss_end = rss_mb()
+        peak = max([rss_end, *(row["rss_mb"] for row in self.timeline)])
+        return {
+            "config": {
+                "server": self.args.server,
+                "client": self.args.client,
+                "users": self.args.users,
+                "duration_seconds": self.args.duration,
+                "mix": self.args.mix,
+                "async_runner": self.args.async_runner,
+            },
+            "elapsed_seconds": round(elapsed, 2),
+            "requests": self.stats.requests,
+            "requests_per_second": round(self.stats.requests / elapsed, 2),
+            "tasks_finished": self.stats.tasks_done,
+            "tasks_per_second": round(self.stats.tasks_done / elapsed, 2),
+            "operations": self.stats.summary(elapsed),
+            "loop_lag_ms": {
+                "p50": round(percentile(self.lag_samples, 0.50), 2),
+                "p99": round(percentile(self.lag_samples, 0.99), 2),
+                "max": round(max(self.lag_samples), 2) if self.lag_samples else 0.0,
+            },
+            "memory_mb": {
+                "start": round(rss_start, 1),
+                "end": round(rss_end, 1),
+                "peak": round(peak, 1),
+                "growth_per_1000_tasks": round((rss_end - rss_start) * 1000 / self.stats.tasks_done, 2)
+                if self.stats.tasks_done
+                else None,
+            },
+            "timeline": self.timeline,
+        }
+
+
+async def wait_ready(client: Any, timeout: float = 60.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("App did not become ready")
+
+
+def print_report(report: dict[str, Any]) -> None:
+    print()
+    print(
+        f"{report['requests']} requests in {report['elapsed_seconds']}s "
+        f"({report['requests_per_second']} req/s), {report['tasks_finished']} tasks "
+        f"({report['tasks_per_second']} tasks/s)"
+    )
+    print(f"{'operation':<22}{'count':>8}{'errors':>8}{'/s':>9}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for name, op in report["operations"].items():
+        print(
+            f"{name:<22}{op['count']:>8}{op['errors']:>8}{op['per_second']:>9.1f}"
+            f"{op['p50_ms']:>8.1f}ms{op['p95_ms']:>8.1f}ms{op['p99_ms']:>8.1f}ms{op['max_ms']:>8.1f}ms"
+        )
+    lag = report["loop_lag_ms"]
+    mem = report["memory_mb"]
+    print(f"Event-loop lag: p50={lag['p50']}ms p99={lag['p99']}ms max={lag['max']}ms")
+    print(
+        f"Memory (RSS): start={mem['start']}MB end={mem['end']}MB peak={mem['peak']}MB "
+        f"growth/1000 tasks={mem['growth_per_1000_tasks']}MB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the CallPilot API against local stand-ins.")
+    parser.add_argument("--server", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--port", type=int, default=5099, help="Port for --server uvicorn")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to generate load")
+    parser.add_argument("--ramp", type=float, default=0.0, help="Seconds over which users are started")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("single=2,swarm=1,webhook=6"))
+    parser.add_argument("--client", choices=["poll", "stream", "mixed"], default="poll")
+    parser.add_argument("--poll-interval", type=float, default=0.25)
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between a user's operations")
+    parser.add_argument("--task-timeout", type=float, default=120.0)
+    parser.add_argument("--swarm-agents", type=int, default=5)
+    parser.add_argument("--turn-delay", type=float, default=0.05, help="Offline conversation delay per turn")
+    parser.add_argument("--google-latency-ms", type=float, default=40.0, help="Stand-in Places/Maps latency")
+    parser.add_argument("--async-runner", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--providers", help="Providers JSON/JSONL/catalog path (defaults to the app setting)")
+    parser.add_argument("--sample-interval", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", dest="json_path", help="Write the full report (with timeline) here")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+    configure_environment(args)
+
+    import httpx
+
+    from app.config import get_settings
+    from app.main import app
+    from core.providers_loader import query_providers
+
+    records, _ = query_providers(get_settings().providers_json_path, limit=50)
+    provider_ids = [r.id for r in records]
+    probe = LoopLagProbe()
+
+    async def run_inprocess() -> dict[str, Any]:
+        async with app.router.lifespan_context(app):
+            install_standins(args.google_latency_ms)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60.0) as client:
+                probe_task = asyncio.create_task(probe.run())
+                try:
+                    await wait_ready(client)
+                    return await LoadTest(args, client, probe, provider_ids).run()
+                finally:
+                    probe_task.cancel()
+
+    async def run_uvicorn() -> dict[str, Any]:
+        install_standins(args.google_latency_ms)
+        server = UvicornThread(app, args.port, probe)
+        server.start()
+        limits = httpx.Limits(max_connections=args.users * 2, max_keepalive_connections=args.users * 2)
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60.0, limits=limits) as client:
+                await wait_ready(client)
+                return await LoadTest(args, client, probe, provider_ids).run()
+        finally:
+            await asyncio.get_running_loop().run_in_executor(None, server.stop)
+
+    print(
+        f"Load test: {args.users} users for {args.duration}s, server={args.server}, "
+        f"client={args.client}, mix={args.mix}",
+        flush=True,
+    )
+    report = asyncio.run(run_inprocess() if args.server == "inprocess" else run_uvicorn())
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Replay recorded negotiations (RECORDING_DIR) through the runner, tools and outcome extraction.
+
+Each recording is fed back at its recorded pace divided by --speed (0 replays
+as fast as possible). Tools answer from the recording unless --live-tools is
+given, in which case they run for real (against the local registry and
+ledger) and differing results are reported. Exits non-zero when any replayed
+outcome differs from the recorded one, so a corpus of real calls can gate
+changes to the runner or outcome extraction.
+
+    python scripts/replay_calls.py data/recordings --speed 0
+    python scripts/replay_calls.py data/recordings/2026-10-19/101500-dentist-001-ab12cd34.json --speed 1
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded negotiations and compare outcomes.")
+    parser.add_argument("paths", nargs="+", help="Recording files or directories containing them")
+    parser.add_argument("--speed", type=float, default=0.0, help="1 = recorded pace, 0 = as fast as possible")
+    parser.add_argument("--live-tools", action="store_true", help="Run the real tools instead of the recorded results")
+    parser.add_argument("--providers", help="Providers JSON/JSONL/catalog path (defaults to the recorded one)")
+    parser.add_argument("--json", dest="json_path", help="Write every replay result here")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    from agents.replay import iter_recording_paths, load_recording, replay_call
+
+    results = []
+    for path in iter_recording_paths(args.paths):
+        try:
+            result = replay_call(load_recording(path), providers_path=args.providers, speed=args.speed, live_tools=args.live_tools)
+        except (OSError, ValueError, KeyError) as e:
+            result = {"error": str(e), "outcome_matches": False}
+        result["path"] = str(path)
+        results.append(result)
+        if not args.quiet:
+            if "error" in result:
+                print(f"ERROR {path}: {result['error']}")
+                continue
+            status = "ok  " if result["outcome_matches"] else "DIFF"
+            print(
+                f"{status} {path}  {result['duration_seconds']:.2f}s (recorded {result['recorded_duration_seconds']}s)"
+                f"  tools {result['tool_calls']}/{result['recorded_tool_calls']}"
+                f"  slot {result['outcome'].get('proposed_slot')} (recorded {result['recorded_outcome'].get('proposed_slot')})"
+                + (f"  {len(result['tool_mismatches'])} tool mismatches" if result["tool_mismatches"] else "")
+            )
+
+    differing = [r for r in results if not r["outcome_matches"]]
+    print(f"{len(results)} replayed, {len(results) - len(differing)} matching, {len(differing)} differing")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, default=str)
+    sys.exit(1 if differing else 0)
+
+
+if __name__ == "__main__":
+    main()
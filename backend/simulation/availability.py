@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
+from core.ledger import get_ledger
 from core.schemas import AvailabilityProfile, Provider
 
 
@@ -13,12 +14,13 @@ def _parse_time(t: str) -> Tuple[int, int]:
     return h, m
 
 
-def get_available_slots(
+def profile_slot_starts(
     provider: Provider,
     from_date: datetime,
     days_ahead: int = 14,
     duration_minutes: int | None = None,
 ) -> List[datetime]:
+    """Slot starts the availability profile allows in the window, ignoring bookings and holds."""
     profile = provider.availability_profile
     duration = duration_minutes or profile.slot_duration_minutes
     open_h, open_m = _parse_time(profile.weekday_hours[0])
@@ -39,11 +41,35 @@ def get_available_slots(
     return slots
 
 
+def get_available_slots(
+    provider: Provider,
+    from_date: datetime,
+    days_ahead: int = 14,
+    duration_minutes: int | None = None,
+    holder: Optional[str] = None,
+) -> List[datetime]:
+    """Open slots in the window, excluding ones booked or held by someone other than `holder`."""
+    duration = duration_minutes or provider.availability_profile.slot_duration_minutes
+    ledger = get_ledger()
+    return [
+        slot for slot in profile_slot_starts(provider, from_date, days_ahead, duration)
+        if ledger.is_free(provider.id, slot, duration, holder)
+    ]
+
+
 def is_slot_available(
     provider: Provider,
     slot: datetime,
     duration_minutes: int = 30,
+    holder: Optional[str] = None,
 ) -> bool:
+    if not profile_allows_slot(provider, slot, duration_minutes):
+        return False
+    return get_ledger().is_free(provider.id, slot, duration_minutes, holder)
+
+
+def profile_allows_slot(provider: Provider, slot: datetime, duration_minutes: int = 30) -> bool:
+    """True when the slot falls within the provider's opening hours (ignoring the ledger)."""
     profile = provider.availability_profile
     if slot.weekday() >= 5 and not profile.weekend_enabled:
         return False
@@ -53,6 +79,4 @@ def is_slot_available(
     end = slot.replace(hour=close_h, minute=close_m, second=0, microsecond=0)
     if slot < start:
         return False
-    if slot + timedelta(minutes=duration_minutes + profile.buffer_minutes) > end:
-        return False
-    return True
+    return slot + timedelta(minutes=duration_minutes + profile.buffer_minutes) <= end
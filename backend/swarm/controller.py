@@ -2,10 +2,15 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import threading
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Optional
 
 from core.schemas import (
+    AcceptanceCriteria,
+    HedgeAction,
+    HedgeDecision,
     NegotiationOutcome,
     PreferenceWeights,
     Provider,
@@ -13,13 +18,75 @@ from core.schemas import (
     TaskMode,
     UserRequest,
 )
-from core.providers_loader import load_providers, get_providers_by_id
-from core.scoring import rank_outcomes
+from core.providers_loader import get_providers_by_id, query_providers
+from core.scoring import acceptance_criteria, is_acceptable, rank_outcomes
+from app.config import get_settings
+from core import profiling
+from core.executors import CONVERSATIONS, INTEGRATIONS, get_executor, run_in
+from core.ledger import get_ledger
+from core.provider_stats import get_provider_stats, is_provider_stats_enabled
+from core.slot_index import get_slot_index, is_slot_index_enabled
+from core.tracing import bind, span
+from agents.async_runner import run_agent_and_extract_outcome_async
 from agents.runner import run_agent_and_extract_outcome
 from simulation.receptionist import get_next_available
 
 logger = logging.getLogger(__name__)
 
+# Cancelled calls left to unwind in the background; referenced so they are not collected mid-cleanup.
+_draining: set[asyncio.Task] = set()
+
+
+def _drain(task: asyncio.Task) -> None:
+    _draining.add(task)
+
+    def done(t: asyncio.Task) -> None:
+        _draining.discard(t)
+        if not t.cancelled() and t.exception() is not None:
+            logger.warning("Cancelled agent run failed while unwinding: %s", t.exception())
+
+    task.add_done_callback(done)
+
+
+def _select_providers(
+    providers_path: Path,
+    max_agents: int,
+    reserve: int = 0,
+    filters: Optional[dict[str, Any]] = None,
+    window: Optional[tuple[datetime, datetime]] = None,
+) -> tuple[list[str], list[str], int]:
+    """
+    Up to `max_agents` provider ids, most responsive first, plus up to
+    `reserve` next-best ids for hedging. With stats enabled a wider candidate
+    pool is read so chronic timeouts can be skipped without shrinking the
+    swarm. `filters` narrow the candidates by rating and distance; with a
+    `window` and the slot index enabled, only providers with an open slot in
+    it are candidates. Returns (selected, reserve, skipped count).
+    """
+    filters = filters or {}
+
+    def candidates(limit: int) -> list[str]:
+        if window is not None and is_slot_index_enabled():
+            return get_slot_index(providers_path).providers(*window, limit=limit, **filters)
+        return [p.id for p in query_providers(providers_path, limit=limit, **filters)[0]]
+
+    if not is_provider_stats_enabled():
+        ids = candidates(max_agents + reserve)
+        return ids[:max_agents], ids[max_agents:], 0
+    factor = max(1, int(getattr(get_settings(), "provider_stats_candidate_factor", 3)))
+    ids = candidates(max(max_agents * factor, max_agents + reserve))
+    ordered = get_provider_stats().order(ids)
+    return ordered[:max_agents], ordered[max_agents:max_agents + reserve], len(ids) - len(ordered)
+
+
+def _hedge_threshold(provider_id: str, settings: Any) -> float:
+    q = float(getattr(settings, "swarm_hedge_percentile", 0.9))
+    floor = float(getattr(settings, "swarm_hedge_min_delay_seconds", 10.0))
+    observed = get_provider_stats().latency_percentile(provider_id, q) if is_provider_stats_enabled() else None
+    if observed is None:
+        observed = float(getattr(settings, "swarm_hedge_default_delay_seconds", 60.0))
+    return max(floor, observed)
+
 
 async def run_swarm(
     providers_path: Path,
@@ -28,38 +95,212 @@ async def run_swarm(
     api_key: Optional[str] = None,
     agent_id: Optional[str] = None,
     max_agents: int = 15,
+    on_outcome: Optional[Callable[[NegotiationOutcome], None]] = None,
+    async_runner: bool = False,
+    max_concurrent_calls: Optional[int] = None,
+    hedge_budget: Optional[int] = None,
+    target_outcomes: Optional[int] = None,
+    on_hedge: Optional[Callable[[HedgeDecision], None]] = None,
+    accept: Optional[Callable[[NegotiationOutcome, Optional[Provider]], bool]] = None,
+    provider_filters: Optional[dict[str, Any]] = None,
+    window: Optional[tuple[datetime, datetime]] = None,
 ) -> tuple[list[NegotiationOutcome], list[RankedSlot], list[dict]]:
-    providers = load_providers(providers_path)
-    if not providers:
+    """
+    Call the selected providers concurrently and rank what they offer.
+
+    With a hedge budget, a call still undecided past its latency percentile
+    triggers a call to the next-best uncalled provider; whichever of the pair
+    settles with a slot first wins and the other is cancelled. With
+    `target_outcomes` = k, the swarm stops once k calls have settled with a
+    slot and cancels the rest. With `accept` (called with the outcome and its
+    provider), only outcomes it approves count as a slot for both, and only
+    they are ranked (unless none are). Cancelled
+    calls are not waited for; threaded ones are told to hang up and finish in
+    the background. Only providers with an open slot in `window` (default: the
+    slot index horizon from now) are called.
+    """
+    settings = get_settings()
+    if window is None:
+        now = datetime.utcnow()
+        window = (now, now + timedelta(days=int(getattr(settings, "slot_index_horizon_days", 14))))
+    if hedge_budget is None:
+        hedge_budget = int(getattr(settings, "swarm_hedge_budget", 0))
+    if target_outcomes is None:
+        target_outcomes = int(getattr(settings, "swarm_target_outcomes", 0))
+    if is_slot_index_enabled():
+        # A rebuild (day rollover, registry change) walks every profile; keep it off the loop.
+        index = get_slot_index(providers_path)
+        if index.is_stale():
+            await run_in(INTEGRATIONS, index.ensure_built)
+    provider_ids, reserve, skipped = _select_providers(
+        providers_path, max_agents, reserve=max(0, hedge_budget), filters=provider_filters, window=window
+    )
+    if not provider_ids:
         return [], [], []
-    selected = providers[:max_agents]
-    provider_ids = [p.id for p in selected]
+    # Looked up once: acceptance checks run on every wake-up, and ranking needs the same records.
+    by_id = await run_in(INTEGRATIONS, get_providers_by_id, providers_path, provider_ids + reserve)
     loop = asyncio.get_event_loop()
     preferences = user_request.preferences or PreferenceWeights()
+    call_slots = asyncio.Semaphore(max_concurrent_calls or len(provider_ids) + len(reserve))
+    call_started: dict[str, float] = {}
+    settled: dict[str, NegotiationOutcome] = {}
+    wake = asyncio.Event()
+    # Threaded calls can't be cancelled through their future; setting this makes the runner hang up.
+    stops: dict[str, threading.Event] = {}
+
+    def on_settled(outcome: NegotiationOutcome) -> None:
+        def note() -> None:
+            settled[outcome.provider_id] = outcome
+            wake.set()
+        loop.call_soon_threadsafe(note)
+        if on_outcome:
+            on_outcome(outcome)
+
+    def release_cancelled(pid: str) -> None:
+        # A cancelled call may have held a slot (confirm_slot) that no outcome will account for.
+        if task_id:
+            get_ledger().release_holds(task_id, [pid])
 
     async def run_one(pid: str) -> tuple[str, NegotiationOutcome, list[dict]]:
-        outcome, tool_log, transcript = await loop.run_in_executor(
-            None,
-            lambda p=pid: run_agent_and_extract_outcome(
-                provider_id=p,
-                providers_path=providers_path,
-                user_request=user_request,
-                task_id=task_id,
-                api_key=api_key,
-                agent_id=agent_id,
-            ),
-        )
+        if async_runner:
+            try:
+                async with call_slots:
+                    call_started[pid] = loop.time()
+                    outcome, tool_log, transcript = await run_agent_and_extract_outcome_async(
+                        provider_id=pid,
+                        providers_path=providers_path,
+                        user_request=user_request,
+                        task_id=task_id,
+                        api_key=api_key,
+                        agent_id=agent_id,
+                        on_outcome=on_settled,
+                    )
+            except asyncio.CancelledError:
+                release_cancelled(pid)
+                raise
+            outcome.transcript = transcript
+            return pid, outcome, tool_log
+        stop = stops.setdefault(pid, threading.Event())
+
+        def call(p: str) -> tuple[NegotiationOutcome, list[dict], list]:
+            # Started only once a CONVERSATIONS worker picks it up: time queued behind a saturated
+            # bulkhead must not count toward the hedge threshold (hedging would only queue more calls).
+            started = loop.time()
+            loop.call_soon_threadsafe(call_started.__setitem__, p, started)
+            try:
+                return run_agent_and_extract_outcome(
+                    provider_id=p,
+                    providers_path=providers_path,
+                    user_request=user_request,
+                    task_id=task_id,
+                    api_key=api_key,
+                    agent_id=agent_id,
+                    on_outcome=on_settled,
+                    stop=stop,
+                )
+            finally:
+                # The thread outlives the cancelled future; release once it has actually hung up.
+                if stop.is_set():
+                    release_cancelled(p)
+
+        outcome, tool_log, transcript = await loop.run_in_executor(get_executor(CONVERSATIONS), bind(call), pid)
         outcome.transcript = transcript
         return pid, outcome, tool_log
 
-    results = await asyncio.gather(
-        *[run_one(pid) for pid in provider_ids],
-        return_exceptions=True,
-    )
+    def decide(action: HedgeAction, pid: str, **kwargs: Any) -> None:
+        decision = HedgeDecision(action=action, provider_id=pid, **kwargs)
+        logger.info("Swarm hedge decision: %s %s", action.value, pid)
+        if on_hedge:
+            on_hedge(decision)
+
+    calls: dict[str, asyncio.Task] = {}
+    partner: dict[str, str] = {}
+    checked: set[str] = set()
+    cancelled: set[str] = set()
+    thresholds: dict[str, float] = {}
+    budget = max(0, hedge_budget)
+
+    def launch(pid: str) -> None:
+        calls[pid] = asyncio.ensure_future(run_one(pid))
+        profiling.adopt(calls[pid])
+
+    def elapsed(pid: str, now: float) -> float:
+        return now - call_started[pid] if pid in call_started else 0.0
+
+    def cancel(pid: str, action: HedgeAction) -> None:
+        task = calls.get(pid)
+        if task is not None and not task.done() and pid not in cancelled:
+            cancelled.add(pid)
+            stops.setdefault(pid, threading.Event()).set()
+            task.cancel()
+            decide(action, pid, elapsed_seconds=round(elapsed(pid, loop.time()), 3))
+
+    def good(pid: str) -> bool:
+        outcome = settled.get(pid)
+        return outcome is not None and outcome.proposed_slot is not None and (accept is None or accept(outcome, by_id.get(pid)))
+
+    with span("swarm", "swarm", providers=len(provider_ids), skipped=skipped, hedge_budget=budget) as swarm_args:
+        for pid in provider_ids:
+            launch(pid)
+        while True:
+            for pid, task in calls.items():
+                # A call can also finish with a slot without settling early (e.g. one read from its last message).
+                if task.done() and pid not in settled and not task.cancelled() and task.exception() is None:
+                    settled[pid] = task.result()[1]
+            pending = [pid for pid, t in calls.items() if not t.done()]
+            if not pending:
+                break
+            for pid in list(settled):
+                if good(pid) and pid in partner:
+                    cancel(partner.pop(pid), HedgeAction.CANCEL_REDUNDANT)
+            if target_outcomes and sum(1 for pid in settled if good(pid)) >= target_outcomes:
+                for pid in pending:
+                    if pid not in settled:
+                        cancel(pid, HedgeAction.CANCEL_TARGET_REACHED)
+                break
+            now = loop.time()
+            next_check: Optional[float] = None
+            for pid in pending if hedge_budget > 0 else ():
+                if pid in checked or pid in settled or pid not in call_started:
+                    continue
+                if pid not in thresholds:
+                    thresholds[pid] = _hedge_threshold(pid, settings)
+                due = call_started[pid] + thresholds[pid]
+                if now < due:
+                    next_check = due if next_check is None else min(next_check, due)
+                    continue
+                checked.add(pid)
+                facts = dict(elapsed_seconds=round(elapsed(pid, now), 3), threshold_seconds=round(thresholds[pid], 3))
+                if budget <= 0:
+                    decide(HedgeAction.BUDGET_EXHAUSTED, pid, **facts)
+                elif not reserve:
+                    decide(HedgeAction.NO_CANDIDATES, pid, **facts)
+                else:
+                    hedge_pid = reserve.pop(0)
+                    budget -= 1
+                    checked.add(hedge_pid)
+                    partner[pid], partner[hedge_pid] = hedge_pid, pid
+                    launch(hedge_pid)
+                    decide(HedgeAction.HEDGE, pid, hedge_provider_id=hedge_pid, **facts)
+            if hedge_budget > 0 and any(pid not in call_started for pid in pending):
+                # Calls still waiting for a slot have no start time yet; look again shortly.
+                next_check = now + 0.5 if next_check is None else min(next_check, now + 0.5)
+            wake.clear()
+            waiter = asyncio.ensure_future(wake.wait())
+            timeout = None if next_check is None else max(0.0, next_check - loop.time())
+            await asyncio.wait([calls[pid] for pid in pending] + [waiter], timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+        for pid in cancelled:
+            _drain(calls[pid])
+        results = await asyncio.gather(*(t for pid, t in calls.items() if pid not in cancelled), return_exceptions=True)
+        swarm_args["calls"] = len(calls)
+        swarm_args["hedged"] = max(0, hedge_budget) - budget
 
     outcomes: list[NegotiationOutcome] = []
     all_tool_logs: list[dict] = []
     for r in results:
+        if isinstance(r, asyncio.CancelledError):
+            continue
         if isinstance(r, Exception):
             logger.exception("Agent run failed: %s", r)
             continue
@@ -67,11 +308,53 @@ async def run_swarm(
         outcomes.append(outcome)
         all_tool_logs.extend(tool_log)
 
-    by_id = get_providers_by_id(providers_path)
-    shortlist = rank_outcomes(outcomes, by_id, preferences)
+    ranked = [o for o in outcomes if accept(o, by_id.get(o.provider_id))] if accept is not None else outcomes
+    with span("rank", "swarm", outcomes=len(outcomes), acceptable=len(ranked)):
+        shortlist = rank_outcomes(ranked or outcomes, by_id, preferences)
     return outcomes, shortlist, all_tool_logs
 
 
+def acceptance_predicate(criteria: AcceptanceCriteria) -> Callable[[NegotiationOutcome, Optional[Provider]], bool]:
+    def accept(outcome: NegotiationOutcome, provider: Optional[Provider]) -> bool:
+        return is_acceptable(outcome, provider, criteria)
+
+    return accept
+
+
+async def run_first_acceptable(
+    providers_path: Path,
+    user_request: UserRequest,
+    **swarm_kwargs: Any,
+) -> tuple[list[NegotiationOutcome], list[RankedSlot], list[dict], bool]:
+    """
+    Swarm that stops at the first validated slot meeting the request's
+    acceptance criteria, cancels every other call and returns at once. Only
+    providers within the rating and distance bounds, with an open slot before
+    the latest acceptable one, are called. The last
+    element says whether an acceptable slot was found; without one the
+    shortlist ranks whatever was offered.
+    """
+    criteria = acceptance_criteria(user_request)
+    predicate = acceptance_predicate(criteria)
+    # Latest verdict per provider; run_swarm re-checks every final outcome when ranking, so no second lookup is needed.
+    verdicts: dict[str, bool] = {}
+
+    def accept(outcome: NegotiationOutcome, provider: Optional[Provider]) -> bool:
+        verdicts[outcome.provider_id] = ok = predicate(outcome, provider)
+        return ok
+
+    outcomes, shortlist, tool_logs = await run_swarm(
+        providers_path=providers_path,
+        user_request=user_request,
+        target_outcomes=1,
+        accept=accept,
+        provider_filters=dict(min_rating=criteria.min_rating, max_distance_km=criteria.max_distance_km),
+        window=(datetime.utcnow(), criteria.latest_slot),
+        **swarm_kwargs,
+    )
+    return outcomes, shortlist, tool_logs, any(verdicts.get(o.provider_id, False) for o in outcomes)
+
+
 def run_single_agent(
     provider_id: str,
     providers_path: Path,
@@ -79,6 +362,7 @@ def run_single_agent(
     task_id: Optional[str] = None,
     api_key: Optional[str] = None,
     agent_id: Optional[str] = None,
+    on_outcome: Optional[Callable[[NegotiationOutcome], None]] = None,
 ) -> tuple[NegotiationOutcome, list[RankedSlot], list[dict], list]:
     outcome, tool_log, transcript = run_agent_and_extract_outcome(
         provider_id=provider_id,
@@ -87,9 +371,42 @@ def run_single_agent(
         task_id=task_id,
         api_key=api_key,
         agent_id=agent_id,
+        on_outcome=on_outcome,
+    )
+    return _single_result(provider_id, providers_path, user_request, outcome, tool_log, transcript)
+
+
+async def run_single_agent_async(
+    provider_id: str,
+    providers_path: Path,
+    user_request: UserRequest,
+    task_id: Optional[str] = None,
+    api_key: Optional[str] = None,
+    agent_id: Optional[str] = None,
+    on_outcome: Optional[Callable[[NegotiationOutcome], None]] = None,
+) -> tuple[NegotiationOutcome, list[RankedSlot], list[dict], list]:
+    outcome, tool_log, transcript = await run_agent_and_extract_outcome_async(
+        provider_id=provider_id,
+        providers_path=providers_path,
+        user_request=user_request,
+        task_id=task_id,
+        api_key=api_key,
+        agent_id=agent_id,
+        on_outcome=on_outcome,
     )
+    return _single_result(provider_id, providers_path, user_request, outcome, tool_log, transcript)
+
+
+def _single_result(
+    provider_id: str,
+    providers_path: Path,
+    user_request: UserRequest,
+    outcome: NegotiationOutcome,
+    tool_log: list[dict],
+    transcript: list,
+) -> tuple[NegotiationOutcome, list[RankedSlot], list[dict], list]:
     outcome.transcript = transcript
-    by_id = get_providers_by_id(providers_path)
+    by_id = get_providers_by_id(providers_path, ids=[provider_id])
     preferences = user_request.preferences or PreferenceWeights()
     shortlist = rank_outcomes([outcome], by_id, preferences)
     if not shortlist and provider_id in by_id:
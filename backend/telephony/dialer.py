@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+from app.config import get_settings
+from core.schemas import OutboundCallState, OutboundCallStatus
+
+logger = logging.getLogger(__name__)
+
+
+class _RateLimiter:
+    """Token bucket: at most `rate` acquisitions per second, bursting up to `rate`."""
+
+    def __init__(self, rate: float) -> None:
+        self.rate = max(0.001, float(rate))
+        self.capacity = max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+
+class OutboundDialer:
+    """
+    Places outbound calls concurrently over one pooled httpx.AsyncClient.
+    Enforces calls-per-second and max in-flight limits and keeps the latest
+    OutboundCallState per provider_id.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[str] = None,
+        calls_per_second: Optional[float] = None,
+        max_concurrent: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+    ) -> None:
+        s = get_settings()
+        self.backend = (backend or getattr(s, "outbound_backend", None) or "elevenlabs").lower()
+        self.calls_per_second = calls_per_second or getattr(s, "outbound_calls_per_second", 5.0)
+        self.max_concurrent = max_concurrent or getattr(s, "outbound_max_concurrent", 50)
+        self.timeout_seconds = timeout_seconds or getattr(s, "outbound_request_timeout_seconds", 15.0)
+        self.calls: dict[str, OutboundCallState] = {}
+        self._client: Any = None
+        self._limiter: Optional[_RateLimiter] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _ensure_started(self) -> None:
+        if self._client is not None:
+            return
+        import httpx
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrent,
+                max_keepalive_connections=self.max_concurrent,
+            ),
+        )
+        self._limiter = _RateLimiter(self.calls_per_second)
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+    @property
+    def client(self) -> Any:
+        self._ensure_started()
+        return self._client
+
+    async def _place(self, to_number: str) -> dict[str, Any]:
+        if self.backend == "twilio":
+            from telephony.twilio_stub import initiate_outbound_call_async
+            callback_url = getattr(get_settings(), "twilio_twiml_url", None) or ""
+            return await initiate_outbound_call_async(to_number, callback_url, self._client)
+        from integrations.elevenlabs_phone import start_outbound_call_async
+        return await start_outbound_call_async(to_number, self._client)
+
+    async def dial(self, provider_id: str, to_number: str) -> OutboundCallState:
+        self._ensure_started()
+        state = OutboundCallState(provider_id=provider_id, to_number=to_number, backend=self.backend)
+        self.calls[provider_id] = state
+        async with self._semaphore:
+            await self._limiter.acquire()
+            state.status = OutboundCallStatus.DIALING
+            state.dialed_at = datetime.utcnow()
+            started = time.perf_counter()
+            try:
+                result = await self._place(to_number)
+            except Exception as e:
+                logger.warning("Outbound call to %s failed: %s", provider_id, e)
+                result = {"success": False, "message": str(e)}
+            state.latency_ms = round((time.perf_counter() - started) * 1000.0, 2)
+        state.call_sid = result.get("callSid")
+        state.conversation_id = result.get("conversation_id")
+        state.message = result.get("message")
+        state.status = OutboundCallStatus.INITIATED if result.get("success") else OutboundCallStatus.FAILED
+        return state
+
+    async def dial_many(self, targets: Iterable[tuple[str, str]]) -> list[OutboundCallState]:
+        """Dial every (provider_id, to_number) pair concurrently within the configured limits."""
+        targets = list(targets)
+        for pid, number in targets:
+            self.calls[pid] = OutboundCallState(provider_id=pid, to_number=number, backend=self.backend)
+        return list(await asyncio.gather(*[self.dial(pid, number) for pid, number in targets]))
+
+    def get_call(self, provider_id: str) -> Optional[OutboundCallState]:
+        return self.calls.get(provider_id)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_dialer: Optional[OutboundDialer] = None
+
+
+def get_dialer() -> OutboundDialer:
+    global _dialer
+    if _dialer is None:
+        _dialer = OutboundDialer()
+    return _dialer
+
+
+async def close_dialer() -> None:
+    global _dialer
+    if _dialer is not None:
+        await _dialer.aclose()
+        _dialer = None
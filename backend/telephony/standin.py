@@ -0,0 +1,65 @@
+"""
+Local HTTP stand-in for the ElevenLabs outbound-call and Twilio Calls endpoints.
+
+    uvicorn telephony.standin:app --port 5055
+    ELEVENLABS_API_BASE_URL=http://127.0.0.1:5055 TWILIO_API_BASE_URL=http://127.0.0.1:5055
+
+STANDIN_LATENCY_MS adds a fixed delay per request; STANDIN_FAILURE_EVERY=N fails every Nth call.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import os
+import uuid
+from urllib.parse import parse_qs
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI(title="CallPilot telephony stand-in")
+
+_counter = itertools.count(1)
+_calls: dict[str, dict] = {}
+
+
+async def _simulate() -> int:
+    n = next(_counter)
+    latency_ms = float(os.environ.get("STANDIN_LATENCY_MS", "50"))
+    if latency_ms > 0:
+        await asyncio.sleep(latency_ms / 1000.0)
+    fail_every = int(os.environ.get("STANDIN_FAILURE_EVERY", "0"))
+    return 0 if fail_every and n % fail_every == 0 else n
+
+
+@app.post("/v1/convai/twilio/outbound-call")
+async def elevenlabs_outbound_call(request: Request) -> JSONResponse:
+    body = await request.json()
+    if not await _simulate():
+        return JSONResponse(status_code=503, content={"detail": "Stand-in simulated failure"})
+    call_sid = "CA" + uuid.uuid4().hex
+    conversation_id = "conv_" + uuid.uuid4().hex[:20]
+    _calls[call_sid] = {"to": body.get("to_number"), "conversation_id": conversation_id}
+    return JSONResponse(
+        content={
+            "success": True,
+            "message": "Call initiated (stand-in)",
+            "callSid": call_sid,
+            "conversation_id": conversation_id,
+        }
+    )
+
+
+@app.post("/2010-04-01/Accounts/{account_sid}/Calls.json")
+async def twilio_create_call(account_sid: str, request: Request) -> JSONResponse:
+    form = {k: v[0] for k, v in parse_qs((await request.body()).decode("utf-8")).items()}
+    if not await _simulate():
+        return JSONResponse(status_code=503, content={"message": "Stand-in simulated failure"})
+    call_sid = "CA" + uuid.uuid4().hex
+    _calls[call_sid] = {"to": form.get("To"), "account_sid": account_sid}
+    return JSONResponse(status_code=201, content={"sid": call_sid, "status": "queued", "to": form.get("To")})
+
+
+@app.get("/calls")
+async def list_calls() -> dict:
+    return {"count": len(_calls)}
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Any, Optional
 
 from app.config import get_settings
 
@@ -23,13 +23,66 @@ def get_simulation_recipient() -> Optional[str]:
     return get_settings().simulation_call_recipient
 
 
+def _calls_request(to_phone: str, callback_url: str) -> tuple[str, dict[str, str], tuple[str, str]]:
+    s = get_settings()
+    base_url = (getattr(s, "twilio_api_base_url", None) or "https://api.twilio.com").rstrip("/")
+    url = f"{base_url}/2010-04-01/Accounts/{s.twilio_account_sid}/Calls.json"
+    form = {"To": to_phone, "From": s.twilio_phone_number or "", "Url": callback_url}
+    return url, form, (s.twilio_account_sid or "", s.twilio_auth_token or "")
+
+
+def _parse_calls_response(status_code: int, data: Any) -> dict[str, Any]:
+    if not isinstance(data, dict):
+        data = {}
+    if status_code in (200, 201) and data.get("sid"):
+        return {"success": True, "message": data.get("status", "queued"), "callSid": data["sid"]}
+    return {
+        "success": False,
+        "message": str(data.get("message") or f"HTTP {status_code}"),
+        "callSid": None,
+    }
+
+
 def initiate_outbound_call(to_phone: Optional[str], callback_url: str) -> Optional[str]:
     if not is_twilio_configured():
         return None
     number = to_phone if to_phone is not None else get_simulation_recipient()
     if not number:
         return None
-    return None
+    try:
+        import httpx
+    except ImportError:
+        return None
+    url, form, auth = _calls_request(number, callback_url)
+    try:
+        with httpx.Client(timeout=15.0) as client:
+            resp = client.post(url, data=form, auth=auth)
+        data = resp.json()
+    except Exception:
+        return None
+    return _parse_calls_response(resp.status_code, data).get("callSid")
+
+
+async def initiate_outbound_call_async(
+    to_phone: Optional[str],
+    callback_url: str,
+    client: Any,
+) -> dict[str, Any]:
+    if not is_twilio_configured():
+        return {"success": False, "message": "Twilio not configured", "callSid": None}
+    number = to_phone if to_phone is not None else get_simulation_recipient()
+    if not number:
+        return {"success": False, "message": "No destination number", "callSid": None}
+    url, form, auth = _calls_request(number, callback_url)
+    try:
+        resp = await client.post(url, data=form, auth=auth)
+    except Exception as e:
+        return {"success": False, "message": str(e), "callSid": None}
+    try:
+        data = resp.json()
+    except Exception:
+        data = {}
+    return _parse_calls_response(resp.status_code, data)
 
 
 def initiate_simulation_call(callback_url: str) -> Optional[str]:
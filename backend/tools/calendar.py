@@ -74,6 +74,12 @@ def get_busy_windows(
         if tool_log and task_id:
             tool_log(task_id, "get_busy_windows", params, out)
         return out
+    provider_ids = params.get("provider_ids") or []
+    if provider_ids:
+        out = provider_busy_windows(provider_ids, providers_path, start, end)
+        if tool_log and task_id:
+            tool_log(task_id, "get_busy_windows", params, out)
+        return out
     try:
         from integrations.google_calendar import is_google_calendar_configured, get_freebusy
         if is_google_calendar_configured():
@@ -86,3 +92,54 @@ def get_busy_windows(
     if tool_log and task_id:
         tool_log(task_id, "get_busy_windows", params, out)
     return out
+
+
+def _provider_calendars(provider_ids: list[str], providers_path: Any) -> tuple[dict[str, Any], dict[str, str]]:
+    from core.providers_loader import get_providers_by_id
+    by_id = get_providers_by_id(providers_path, ids=provider_ids)
+    return by_id, {pid: p.calendar_id for pid, p in by_id.items() if p.calendar_id}
+
+
+def _shape_provider_busy(
+    provider_ids: list[str],
+    by_id: dict[str, Any],
+    calendar_of: dict[str, str],
+    fb: dict[str, Any],
+) -> dict[str, Any]:
+    providers: dict[str, Any] = {}
+    for pid in provider_ids:
+        if pid not in by_id:
+            providers[pid] = {"busy": [], "error": "Provider not found"}
+        elif pid not in calendar_of:
+            providers[pid] = {"busy": [], "calendar_id": None}
+        else:
+            providers[pid] = {"calendar_id": calendar_of[pid], **fb["calendars"].get(calendar_of[pid], {"busy": []})}
+    return {"ok": fb.get("ok", True), "providers": providers, "message": fb.get("message", "Google Calendar")}
+
+
+def provider_busy_windows(
+    provider_ids: list[str],
+    providers_path: Any,
+    start: datetime,
+    end: datetime,
+) -> dict[str, Any]:
+    """Busy windows for each provider's own calendar, fetched in one batched freebusy round trip."""
+    from integrations.freebusy import get_freebusy_many
+
+    by_id, calendar_of = _provider_calendars(provider_ids, providers_path)
+    fb = get_freebusy_many(calendar_of.values(), start, end)
+    return _shape_provider_busy(provider_ids, by_id, calendar_of, fb)
+
+
+async def provider_busy_windows_async(
+    provider_ids: list[str],
+    providers_path: Any,
+    start: datetime,
+    end: datetime,
+    timeout: Optional[float] = None,
+) -> dict[str, Any]:
+    from integrations.freebusy import get_freebusy_many_async
+
+    by_id, calendar_of = _provider_calendars(provider_ids, providers_path)
+    fb = await get_freebusy_many_async(calendar_of.values(), start, end, timeout=timeout)
+    return _shape_provider_busy(provider_ids, by_id, calendar_of, fb)
@@ -3,11 +3,26 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any, Callable, Optional
 
-from core.providers_loader import get_provider, get_providers_by_id
-from core.schemas import Provider
+from core.providers_loader import get_provider, query_providers
 
 ToolCallLogger = Optional[Callable[[str, str, dict[str, Any], Any], None]]
 
+LIST_DEFAULT_LIMIT = 50
+LIST_MAX_LIMIT = 200
+
+
+def _optional_float(value: Any) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+def _flag(value: Any) -> bool:
+    """Agents send booleans as strings too; bool("false") would be True."""
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    return bool(value)
+
 
 def provider_lookup(
     params: dict[str, Any],
@@ -33,6 +48,7 @@ def provider_lookup(
         "name": prov.name,
         "rating": prov.rating,
         "distance_km": prov.distance_km,
+        "region": prov.region,
         "receptionist_style": prov.receptionist_style,
     }
     if tool_log and task_id:
@@ -46,13 +62,37 @@ def list_providers(
     tool_log: ToolCallLogger = None,
     task_id: Optional[str] = None,
 ) -> dict[str, Any]:
-    by_id = get_providers_by_id(providers_path)
+    """
+    One page of providers. Optional params: min_rating, region, max_distance_km,
+    sort_by (rating, distance_km, name, id), descending, limit (max 200), offset.
+    """
+    try:
+        limit = min(LIST_MAX_LIMIT, max(1, int(params.get("limit") or LIST_DEFAULT_LIMIT)))
+        offset = max(0, int(params.get("offset") or 0))
+        min_rating = _optional_float(params.get("min_rating"))
+        max_distance_km = _optional_float(params.get("max_distance_km"))
+    except (TypeError, ValueError):
+        out = {"ok": False, "error": "limit, offset, min_rating and max_distance_km must be numbers"}
+        if tool_log and task_id:
+            tool_log(task_id, "list_providers", params, out)
+        return out
+    page, total = query_providers(
+        providers_path,
+        min_rating=min_rating,
+        region=params.get("region") or None,
+        max_distance_km=max_distance_km,
+        sort_by=params.get("sort_by") or None,
+        descending=_flag(params.get("descending", False)),
+        limit=limit,
+        offset=offset,
+    )
+    next_offset = offset + len(page)
     out = {
         "ok": True,
-        "providers": [
-            {"provider_id": p.id, "name": p.name, "rating": p.rating, "distance_km": p.distance_km}
-            for p in by_id.values()
-        ],
+        "providers": [r.summary() for r in page],
+        "total": total,
+        "offset": offset,
+        "next_offset": next_offset if next_offset < total else None,
     }
     if tool_log and task_id:
         tool_log(task_id, "list_providers", params, out)
@@ -3,6 +3,7 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any, Callable, Optional
 
+from core import profiling, tracing
 from tools import calendar, distance, provider, slots
 
 
@@ -18,10 +19,19 @@ def build_tool_registry(
     providers_path: Path,
     task_id: Optional[str] = None,
     tool_calls_log: Optional[list] = None,
+    on_tool_call: Optional[Callable[[dict], None]] = None,
+    recorded: Optional[Callable[[str, dict], dict]] = None,
 ) -> dict[str, Callable[..., dict[str, Any]]]:
+    """
+    Client tools bound to a registry and task. With `recorded` (call replays),
+    every tool answers with `recorded(name, params)` instead of running; calls
+    are logged as usual.
+    """
     def append_log(entry: dict) -> None:
         if tool_calls_log is not None:
             tool_calls_log.append(entry)
+        if on_tool_call is not None:
+            on_tool_call(entry)
 
     tool_log = _tool_log_callback(task_id, append_log)
 
@@ -46,7 +56,7 @@ def build_tool_registry(
     def confirm_slot(params: dict) -> dict:
         return slots.confirm_slot(params, providers_path, tool_log, task_id)
 
-    return {
+    registry = {
         "check_availability": check_availability,
         "get_busy_windows": get_busy_windows,
         "provider_lookup": provider_lookup,
@@ -55,6 +65,35 @@ def build_tool_registry(
         "validate_slot": validate_slot,
         "confirm_slot": confirm_slot,
     }
+    if recorded is not None:
+        registry = {name: _recorded_tool(name, recorded, tool_log, task_id) for name in registry}
+    if tracing.current_tracer() is None and profiling.current_profile() is None:
+        return registry
+    return {name: _traced_tool(name, fn) for name, fn in registry.items()}
+
+
+def _recorded_tool(
+    name: str,
+    recorded: Callable[[str, dict], dict],
+    tool_log: Optional[Callable[[str, str, dict, Any], None]],
+    task_id: Optional[str],
+) -> Callable[[dict], dict]:
+    def answer(params: dict) -> dict:
+        result = recorded(name, params)
+        if tool_log:
+            tool_log(task_id, name, params, result)
+        return result
+    return answer
+
+
+def _traced_tool(name: str, fn: Callable[[dict], dict]) -> Callable[[dict], dict]:
+    def traced(params: dict) -> dict:
+        with tracing.span(f"tool:{name}", "tool") as args:
+            out = fn(params)
+            if isinstance(out, dict):
+                args["ok"] = out.get("ok")
+            return out
+    return tracing.bind(traced)
 
 
 def register_client_tools(
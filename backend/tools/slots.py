@@ -1,14 +1,21 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Callable, Optional
 
+from core.ledger import BOOKING, get_ledger
 from core.providers_loader import get_provider
+from core.slot_index import note_slot
 
 ToolCallLogger = Optional[Callable[[str, str, dict[str, Any], Any], None]]
 
 
+def _booked(provider_id: str, slot: datetime, duration_minutes: int) -> bool:
+    end = slot + timedelta(minutes=duration_minutes)
+    return any(r.kind == BOOKING for r in get_ledger().reservations(provider_id, slot, end))
+
+
 def validate_slot(
     params: dict[str, Any],
     providers_path: Path,
@@ -36,8 +43,13 @@ def validate_slot(
         if tool_log and task_id:
             tool_log(task_id, "validate_slot", params, out)
         return out
-    from simulation.availability import is_slot_available
-    valid = is_slot_available(prov, slot, duration_minutes)
+    from simulation.availability import is_slot_available, profile_allows_slot
+    valid = is_slot_available(prov, slot, duration_minutes, holder=task_id)
+    if valid:
+        note_slot(providers_path, pid, slot, True)
+    elif not profile_allows_slot(prov, slot, duration_minutes) or _booked(pid, slot, duration_minutes):
+        # Another task's hold is transient and not indexed; only a booking or the profile closes the bin.
+        note_slot(providers_path, pid, slot, False)
     out = {
         "ok": True,
         "valid": valid,
@@ -63,6 +75,18 @@ def confirm_slot(
         if tool_log and task_id:
             tool_log(task_id, "confirm_slot", params, out)
         return out
+    if task_id:
+        # Hold the slot for this task until the user confirms (or the hold expires).
+        try:
+            slot = datetime.fromisoformat(slot_iso.replace("Z", "+00:00"))
+        except (ValueError, TypeError):
+            slot = None
+        duration_minutes = int(params.get("duration_minutes", 30))
+        if slot is not None and get_ledger().hold(pid, slot, task_id, duration_minutes) is None:
+            out = {"ok": False, "provider_id": pid, "slot_iso": slot_iso, "error": "Slot already taken"}
+            if tool_log:
+                tool_log(task_id, "confirm_slot", params, out)
+            return out
     out = {
         "ok": True,
         "provider_id": pid,
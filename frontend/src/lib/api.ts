@@ -4,7 +4,11 @@ import type {
   TaskState,
   ConfirmAppointmentRequest,
   ConfirmAppointmentResponse,
+  CalendarSyncState,
+  SendMessageRequest,
+  SendMessageResponse,
 } from "@/types/task";
+import type { ProviderListParams, ProviderListResponse } from "@/types/provider";
 
 const BASE_URL =
   (import.meta as any).env?.VITE_API_BASE_URL ?? "http://localhost:5001";
@@ -55,6 +59,13 @@ export async function getTaskStatus(taskId: string): Promise<TaskState> {
   return request(`/api/v1/tasks/${taskId}`);
 }
 
+export async function sendMessage(body: SendMessageRequest): Promise<SendMessageResponse> {
+  return request("/api/v1/messages/", {
+    method: "POST",
+    body: JSON.stringify(body),
+  });
+}
+
 export async function confirmAppointment(
   body: ConfirmAppointmentRequest
 ): Promise<ConfirmAppointmentResponse> {
@@ -63,3 +74,17 @@ export async function confirmAppointment(
     body: JSON.stringify(body),
   });
 }
+
+export async function getCalendarSync(taskId: string): Promise<CalendarSyncState> {
+  return request(`/api/v1/appointments/${taskId}/calendar`);
+}
+
+export async function listProviders(params: ProviderListParams = {}): Promise<ProviderListResponse> {
+  const query = new URLSearchParams();
+  for (const [key, value] of Object.entries(params)) {
+    if (value === undefined || value === null || value === "") continue;
+    query.set(key, Array.isArray(value) ? value.join(",") : String(value));
+  }
+  const qs = query.toString();
+  return request(`/api/v1/providers/${qs ? `?${qs}` : ""}`);
+}
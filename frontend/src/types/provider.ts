@@ -0,0 +1,48 @@
+export type ProviderSortKey = "id" | "name" | "rating" | "distance_km";
+
+export type ProviderField =
+  | "id"
+  | "name"
+  | "rating"
+  | "distance_km"
+  | "region"
+  | "receptionist_style"
+  | "address"
+  | "phone_number"
+  | "weekday_hours"
+  | "weekend_enabled"
+  | "slot_duration_minutes";
+
+export interface ProviderListParams {
+  min_rating?: number;
+  max_distance_km?: number;
+  region?: string;
+  receptionist_style?: string;
+  open_on?: string;
+  open_at?: string;
+  sort_by?: ProviderSortKey;
+  descending?: boolean;
+  limit?: number;
+  cursor?: string;
+  fields?: ProviderField[];
+}
+
+export interface ProviderSummary {
+  id?: string;
+  name?: string;
+  rating?: number;
+  distance_km?: number;
+  region?: string | null;
+  receptionist_style?: string;
+  address?: string | null;
+  phone_number?: string | null;
+  weekday_hours?: [string, string];
+  weekend_enabled?: boolean;
+  slot_duration_minutes?: number;
+}
+
+export interface ProviderListResponse {
+  total: number;
+  providers: ProviderSummary[];
+  next_cursor: string | null;
+}
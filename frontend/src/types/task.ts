@@ -1,4 +1,4 @@
-export type TaskMode = "single" | "swarm";
+export type TaskMode = "single" | "swarm" | "first_acceptable";
 export type TaskUrgency = "asap" | "flexible" | "specific";
 
 export interface TaskInput {
@@ -41,14 +41,23 @@ export interface PreferenceWeights {
   distance_weight: number;
 }
 
+export interface AcceptanceCriteria {
+  latest_slot?: string | null;
+  min_rating?: number | null;
+  max_distance_km?: number | null;
+}
+
 export interface UserRequest {
   message: string;
   mode: TaskMode;
   preferences?: PreferenceWeights;
+  acceptance?: AcceptanceCriteria;
 }
 
 export interface TaskCreateRequest {
   user_request: UserRequest;
+  tier?: string;
+  profile?: boolean;
 }
 
 export interface TaskCreateResponse {
@@ -62,10 +71,19 @@ export interface TranscriptTurn {
   text: string;
 }
 
+export type SlotSource = "offered" | "validated" | "confirmed";
+
+export interface OfferedSlot {
+  slot: string;
+  confidence: number;
+  source: SlotSource;
+}
+
 export interface NegotiationOutcome {
   provider_id: string;
   proposed_slot: string | null;
   confidence_score: number;
+  offered_slots?: OfferedSlot[];
   rejection_reasons: string[];
   raw_metadata: Record<string, unknown>;
   transcript: TranscriptTurn[];
@@ -77,8 +95,12 @@ export interface RankedSlot {
   slot: string;
   score: number;
   rank: number;
+  /** Held in the ledger for this task (best validated slot per provider). */
+  held?: boolean;
 }
 
+export type CalendarSyncStatus = "not_configured" | "pending" | "retrying" | "synced" | "failed";
+
 export interface BookedAppointment {
   task_id: string;
   provider_id: string;
@@ -86,6 +108,19 @@ export interface BookedAppointment {
   booked_at: string;
   calendar_event_id: string | null;
   calendar_link: string | null;
+  calendar_sync_status: CalendarSyncStatus;
+  calendar_sync_attempts: number;
+  calendar_sync_error: string | null;
+  calendar_synced_at: string | null;
+}
+
+export interface CalendarSyncState {
+  task_id: string;
+  status: CalendarSyncStatus;
+  calendar_event_id: string | null;
+  calendar_link: string | null;
+  attempts: number;
+  error: string | null;
 }
 
 export interface ToolCallLogEntry {
@@ -94,6 +129,22 @@ export interface ToolCallLogEntry {
   result?: unknown;
 }
 
+export type HedgeAction =
+  | "hedge"
+  | "budget_exhausted"
+  | "no_candidates"
+  | "cancel_redundant"
+  | "cancel_target_reached";
+
+export interface HedgeDecision {
+  action: HedgeAction;
+  provider_id: string;
+  hedge_provider_id: string | null;
+  elapsed_seconds: number;
+  threshold_seconds: number | null;
+  at: string;
+}
+
 export interface TaskState {
   task_id: string;
   status: TaskStatus;
@@ -107,6 +158,30 @@ export interface TaskState {
   shortlist: RankedSlot[];
   confirmed_appointment: BookedAppointment | null;
   transcript: TranscriptTurn[];
+  priority_class?: string | null;
+  queue_position?: number | null;
+  estimated_start_at?: string | null;
+  hedge_decisions?: HedgeDecision[];
+  time_to_result_seconds?: number | null;
+  profile_id?: string | null;
+}
+
+export interface SendMessageRequest {
+  task_id: string;
+  message: string;
+  provider_id?: string;
+  wait_seconds?: number;
+}
+
+export interface SendMessageResponse {
+  ok: boolean;
+  message: string;
+  message_id: string | null;
+  acknowledged: boolean;
+  /** Provider id -> seconds from receipt to delivery into that call. */
+  delivered: Record<string, number>;
+  pending: string[];
+  undelivered: string[];
 }
 
 export interface ConfirmAppointmentRequest {